@@ -0,0 +1,64 @@
+"""Funzioni di supporto condivise dai micro-benchmark."""
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+PACKAGE_DIR = ROOT / "custom_components" / "modbus_sniffer"
+PACKET_LOG = ROOT / "packets_log.csv"
+# Nome del package registrato senza eseguire ``__init__.py``, che richiede Home Assistant.
+PACKAGE_NAME = "modbus_sniffer"
+
+
+def load_module(name: str, path: Path) -> ModuleType:
+    """Carica un modulo dal percorso senza importare il package Home Assistant."""
+    cached = sys.modules.get(name)
+    if cached is not None:
+        return cached
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec and spec.loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_package_module(name: str) -> ModuleType:
+    """Carica un modulo del package che usa import relativi (``from .registers import ...``)."""
+    if PACKAGE_NAME not in sys.modules:
+        package = ModuleType(PACKAGE_NAME)
+        package.__path__ = [str(PACKAGE_DIR)]  # type: ignore[attr-defined]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
+
+
+def load_parser() -> ModuleType:
+    return load_module("modbus_sniffer_parser", PACKAGE_DIR / "parser.py")
+
+
+def load_dashboard() -> ModuleType:
+    return load_module("udp_web_server", ROOT / "udp_web_server.py")
+
+
+def load_capture(path: Optional[Path] = None) -> List[Tuple[str, bytes]]:
+    """Legge il file CSV (timestamp,payload_hex) prodotto dal dashboard."""
+    entries: List[Tuple[str, bytes]] = []
+    source = path or PACKET_LOG
+    with source.open("r", encoding="ascii", errors="ignore") as fh:
+        for line in fh:
+            if "," not in line:
+                continue
+            timestamp, hex_payload = line.rstrip("\n").split(",", 1)
+            payload_clean = "".join(hex_payload.split())
+            if not payload_clean:
+                continue
+            try:
+                entries.append((timestamp, bytes.fromhex(payload_clean)))
+            except ValueError:
+                continue
+    return entries
@@ -0,0 +1,87 @@
+"""Conta le allocazioni per risposta FC03 con tracemalloc.
+
+Confronta il parser originale (slice + ``int.from_bytes`` per registro) con la
+decodifica in blocco su memoryview, sia sulle risposte di packets_log.csv sia
+su risposte sintetiche da 50 e 125 registri.
+"""
+from __future__ import annotations
+
+import struct
+import tracemalloc
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from _common import load_capture, load_parser
+
+parser = load_parser()
+
+
+def legacy_parse_fc03_response(frame: bytes) -> Optional[Tuple[int, Sequence[int]]]:
+    if len(frame) < 5:
+        return None
+    unit = frame[0]
+    func = frame[1]
+    if func & 0x7F != 3 or func & 0x80:
+        return None
+    payload = frame[2:-2]
+    if not payload:
+        return None
+    byte_count = payload[0]
+    data_bytes = payload[1 : 1 + byte_count]
+    values: List[int] = []
+    for idx in range(0, len(data_bytes), 2):
+        chunk = data_bytes[idx : idx + 2]
+        if len(chunk) == 2:
+            values.append(int.from_bytes(chunk, "big"))
+    if not values:
+        return None
+    return unit, values
+
+
+def synthetic_response(registers: int) -> bytes:
+    body = bytes([0x0B, 0x03, 2 * registers]) + b"".join(
+        struct.pack(">H", 1000 + idx * 37) for idx in range(registers)
+    )
+    crc = parser.compute_crc(body)
+    return body + crc.to_bytes(2, "little")
+
+
+def count_allocations(parse: Callable[[bytes], object], frames: List[bytes]) -> Tuple[float, float]:
+    """Restituisce (blocchi allocati per frame, byte di picco per frame)."""
+    results: List[object] = []
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    for frame in frames:
+        results.append(parse(frame))
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats if stat.count_diff > 0)
+    return blocks / len(frames), peak / len(frames)
+
+
+def main() -> None:
+    captured = [
+        frame
+        for _, data in load_capture()
+        for frame in parser.split_modbus_frames(data)[0]
+        if frame[1] == 3 and len(frame) != 8
+    ]
+    datasets = {
+        "packets_log.csv": captured,
+        "sintetico 50 reg": [synthetic_response(50)] * 2000,
+        "sintetico 125 reg": [synthetic_response(125)] * 2000,
+    }
+    for label, frames in datasets.items():
+        legacy_blocks, legacy_peak = count_allocations(legacy_parse_fc03_response, frames)
+        new_blocks, new_peak = count_allocations(parser.parse_fc03_response, frames)
+        print(
+            f"{label:18s} ({len(frames)} frame): originale {legacy_blocks:6.1f} blocchi/frame "
+            f"{legacy_peak:8.0f} B/frame | memoryview {new_blocks:6.1f} blocchi/frame "
+            f"{new_peak:8.0f} B/frame"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Split e verifica in blocco dei CRC (NumPy) rispetto al percorso frame per frame."""
+from __future__ import annotations
+
+import argparse
+import time
+
+from _common import load_capture, load_parser
+
+parser = load_parser()
+
+
+def main() -> None:
+    cli = argparse.ArgumentParser(description=__doc__)
+    cli.add_argument("--repeat", type=int, default=20, help="Copie del log da elaborare")
+    args = cli.parse_args()
+
+    datagrams = [data for _, data in load_capture()] * args.repeat
+    backend = "NumPy" if parser._numpy_backend() is not None else "puro Python"
+
+    start = time.perf_counter()
+    scalar = [parser.split_modbus_frames(data)[0] for data in datagrams]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = parser.split_frames_batch(datagrams)
+    batch_time = time.perf_counter() - start
+
+    frames = [frame for split in scalar for frame in split]
+    assert sum(map(len, batch)) == len(frames)
+    megabytes = sum(map(len, datagrams)) / 1e6
+    print(f"Datagrammi: {len(datagrams)}, frame: {len(frames)}")
+    print(f"Split frame per frame : {scalar_time:6.3f}s ({megabytes / scalar_time:5.2f} MB/s)")
+    print(f"Split in blocco ({backend}): {batch_time:6.3f}s ({megabytes / batch_time:5.2f} MB/s)")
+
+    start = time.perf_counter()
+    checks = [parser._crc_ok(frame) for frame in frames]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_checks = parser.validate_frames_batch(frames)
+    batch_time = time.perf_counter() - start
+
+    assert list(batch_checks) == checks
+    print(f"CRC frame per frame   : {scalar_time:6.3f}s ({len(frames) / scalar_time / 1e6:5.2f} M frame/s)")
+    print(f"CRC in blocco ({backend}): {batch_time:6.3f}s ({len(frames) / batch_time / 1e6:5.2f} M frame/s)")
+
+
+if __name__ == "__main__":
+    main()
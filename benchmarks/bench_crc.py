@@ -0,0 +1,48 @@
+"""Confronta il CRC bit a bit con il motore a tabella sul traffico di packets_log.csv."""
+from __future__ import annotations
+
+import timeit
+
+from _common import load_capture, load_parser
+
+
+def compute_crc_bitwise(data: bytes) -> int:
+    """Implementazione di riferimento (8 iterazioni per byte)."""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+    return crc & 0xFFFF
+
+
+def main() -> None:
+    parser = load_parser()
+    payloads = [data for _, data in load_capture()]
+    total_bytes = sum(len(data) for data in payloads)
+
+    for data in payloads:
+        assert parser.compute_crc(data) == compute_crc_bitwise(data)
+        state = parser.CrcState()
+        for byte in data:
+            state.update_byte(byte)
+        assert state.value == compute_crc_bitwise(data)
+
+    def run(func) -> float:
+        return min(
+            timeit.repeat(lambda: [func(data) for data in payloads], number=5, repeat=5)
+        ) / 5
+
+    bitwise = run(compute_crc_bitwise)
+    table = run(parser.compute_crc)
+    print(f"Datagrammi: {len(payloads)}  byte totali: {total_bytes}")
+    print(f"CRC bit a bit : {bitwise * 1e3:8.2f} ms  ({total_bytes / bitwise / 1e6:6.2f} MB/s)")
+    print(f"CRC a tabella : {table * 1e3:8.2f} ms  ({total_bytes / table / 1e6:6.2f} MB/s)")
+    print(f"Speedup       : {bitwise / table:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Throughput dello splitter guidato dall'header rispetto alla ricerca a forza bruta.
+
+Il traffico di packets_log.csv viene sporcato con byte casuali per simulare una
+linea rumorosa; entrambi gli splitter usano lo stesso CRC a tabella, così il
+confronto misura solo il costo della ricerca delle lunghezze. La seconda parte
+confronta la verifica dei candidati con CRC completo e con CRC progressivo su
+blocchi di stream più lunghi, dove prevale la scansione delle funzioni sconosciute.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from functools import partial
+from typing import Callable, List, Optional, Tuple
+
+from _common import load_capture, load_parser
+
+parser = load_parser()
+
+
+def _legacy_candidate_frame_lengths(function_code: Optional[int], max_len: int) -> List[int]:
+    lengths: set[int] = set()
+    if function_code is None:
+        return list(range(4, max_len + 1))
+    fc = function_code & 0x7F
+    if fc in (1, 2):
+        lengths.add(8)
+        for byte_count in range(1, min(252, max_len - 4)):
+            lengths.add(5 + byte_count)
+    elif fc in (3, 4):
+        lengths.add(8)
+        for byte_count in range(2, min(2 * 125, max_len - 5) + 1, 2):
+            lengths.add(5 + byte_count)
+    elif fc in (5, 6):
+        lengths.add(8)
+    elif fc == 15:
+        lengths.add(8)
+        for byte_count in range(1, min(246, max_len - 9) + 1):
+            lengths.add(9 + byte_count)
+    elif fc == 16:
+        lengths.add(8)
+        for byte_count in range(2, min(2 * 123, max_len - 9) + 1, 2):
+            lengths.add(9 + byte_count)
+    elif function_code & 0x80:
+        lengths.add(5)
+    if not lengths:
+        lengths.update(range(4, max_len + 1))
+    return sorted(length for length in lengths if 4 <= length <= max_len)
+
+
+def legacy_split_modbus_frames(data: bytes) -> Tuple[List[bytes], bytes]:
+    """Splitter originale: prova tutte le lunghezze candidate con un CRC completo."""
+    frames: List[bytes] = []
+    idx = 0
+    n = len(data)
+    while idx + 4 <= n:
+        func = data[idx + 1]
+        max_len = min(256, n - idx)
+        for length in _legacy_candidate_frame_lengths(func, max_len):
+            frame = data[idx : idx + length]
+            if parser.compute_crc(frame[:-2]) == int.from_bytes(frame[-2:], "little"):
+                frames.append(frame)
+                idx += length
+                break
+        else:
+            idx += 1
+    return frames, data[idx:]
+
+
+def make_noisy(payloads: List[bytes], noise: float, seed: int) -> List[bytes]:
+    rnd = random.Random(seed)
+    noisy: List[bytes] = []
+    for data in payloads:
+        out = bytearray()
+        for byte in data:
+            if rnd.random() < noise:
+                out.append(rnd.randrange(256))
+            out.append(byte)
+        noisy.append(bytes(out))
+    return noisy
+
+
+def measure(split: Callable[[bytes], Tuple[List[bytes], bytes]], payloads: List[bytes]) -> Tuple[float, int]:
+    start = time.perf_counter()
+    found = 0
+    for data in payloads:
+        frames, _ = split(data)
+        found += len(frames)
+    return time.perf_counter() - start, found
+
+
+def main() -> None:
+    cli = argparse.ArgumentParser(description=__doc__)
+    cli.add_argument("--datagrams", type=int, default=2000)
+    cli.add_argument("--seed", type=int, default=1)
+    cli.add_argument("--chunk", type=int, default=1024)
+    args = cli.parse_args()
+
+    payloads = [data for _, data in load_capture()][: args.datagrams]
+    for noise in (0.0, 0.01, 0.05):
+        noisy = make_noisy(payloads, noise, args.seed)
+        total = sum(len(data) for data in noisy)
+        before, frames_before = measure(legacy_split_modbus_frames, noisy)
+        after, frames_after = measure(parser.split_modbus_frames, noisy)
+        print(
+            f"rumore {noise:4.0%}: {total} byte | forza bruta {total / before / 1e3:8.1f} kB/s "
+            f"({frames_before} frame) | header {total / after / 1e3:8.1f} kB/s "
+            f"({frames_after} frame) | speedup {before / after:5.1f}x"
+        )
+
+    stream = b"".join(make_noisy(payloads, 0.05, args.seed))
+    chunks = [stream[idx : idx + args.chunk] for idx in range(0, len(stream), args.chunk)]
+    each, frames_each = measure(partial(parser.split_modbus_frames, rolling=False), chunks)
+    rolling, frames_rolling = measure(parser.split_modbus_frames, chunks)
+    assert frames_each == frames_rolling
+    print(
+        f"stream {len(stream)} byte a blocchi di {args.chunk}: CRC per candidato "
+        f"{len(stream) / each / 1e3:8.1f} kB/s | CRC progressivo "
+        f"{len(stream) / rolling / 1e3:8.1f} kB/s | speedup {each / rolling:5.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Tempo di blocco del loop asyncio con decodifica inline o nel thread dedicato."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List, Optional, Tuple
+
+from _common import PACKAGE_DIR, load_capture, load_module, load_parser
+
+parser = load_parser()
+worker_mod = load_module("modbus_sniffer_worker", PACKAGE_DIR / "worker.py")
+
+TICK = 0.001
+
+_HANDLED = {
+    (3, parser.FRAME_READ_RESPONSE),
+    (6, parser.FRAME_WRITE_SINGLE),
+    (16, parser.FRAME_WRITE_REQUEST),
+}
+
+
+class _Source:
+    def __init__(self) -> None:
+        self.bus = parser.BusState()
+        self.reassembler = parser.FrameReassembler(bus=self.bus)
+        self.dedup = parser.FrameDeduplicator()
+        self.frames = 0
+
+    def reset(self) -> None:
+        self.bus.reset()
+        self.reassembler.reset()
+        self.dedup.reset()
+
+
+def decode_block(frame: bytes, source: _Source, now: float) -> Optional[Tuple[int, int, tuple]]:
+    """Stessa estrazione di ``ModbusSnifferHub._decode_block``, deduplica compresa, senza Home Assistant."""
+    decoded = parser.decode_frame(frame)
+    request = source.bus.observe(frame, now, decoded)
+    if source.dedup.check(frame, now, decoded=decoded, request=request) is not None:
+        return None
+    if decoded is None or (decoded.function, decoded.kind) not in _HANDLED:
+        return None
+    if decoded.kind == parser.FRAME_READ_RESPONSE:
+        start = request.start_addr if request else 0
+    else:
+        start = decoded.address or 0
+    return decoded.unit_id, start, decoded.values
+
+
+class _Meter:
+    """Somma la durata dei callback eseguiti nel loop per conto del decoder."""
+
+    def __init__(self) -> None:
+        self.busy = 0.0
+        self.longest = 0.0
+
+    def add(self, elapsed: float) -> None:
+        self.busy += elapsed
+        if elapsed > self.longest:
+            self.longest = elapsed
+
+
+async def run(datagrams: List[bytes], rate: float, duration: float, offload: bool) -> Dict[str, float]:
+    loop = asyncio.get_running_loop()
+    meter = _Meter()
+    values: Dict[Tuple[int, int], int] = {}
+    source = _Source()
+
+    def store(blocks) -> None:
+        start = time.perf_counter()
+        for unit_id, first, block in blocks:
+            for register, value in enumerate(block, first):
+                values[(unit_id, register)] = value
+        meter.add(time.perf_counter() - start)
+
+    worker = None
+    if offload:
+        worker = worker_mod.DecodeWorker(loop, decode_block, store, max_pending=len(datagrams))
+        worker.start()
+
+    frames_per_datagram = sum(len(parser.split_modbus_frames(d)[0]) for d in datagrams) / len(datagrams)
+    per_second = rate / frames_per_datagram
+    lags: List[float] = []
+    sent = 0
+    began = loop.time()
+    while True:
+        expected = loop.time() + TICK
+        await asyncio.sleep(TICK)
+        now = loop.time()
+        lags.append(now - expected)
+        if now - began >= duration:
+            break
+        due = int((now - began) * per_second)
+        start = time.perf_counter()
+        while sent < due:
+            data = datagrams[sent % len(datagrams)]
+            sent += 1
+            if worker is not None:
+                worker.submit(source, data, now)
+                continue
+            blocks = []
+            for frame in source.reassembler.feed(data, now):
+                block = decode_block(frame, source, now)
+                if block is not None:
+                    blocks.append(block)
+            store(blocks)
+        meter.add(time.perf_counter() - start)
+
+    if worker is not None:
+        while worker.pending:
+            await asyncio.sleep(TICK)
+        await loop.run_in_executor(None, worker.stop)
+        await asyncio.sleep(0)
+    lags.sort()
+    return {
+        "busy": meter.busy / duration,
+        "longest": meter.longest,
+        "lag_p99": lags[int(len(lags) * 0.99) - 1],
+        "lag_mean": statistics.fmean(lags),
+    }
+
+
+def main() -> None:
+    cli = argparse.ArgumentParser(description=__doc__)
+    cli.add_argument("--duration", type=float, default=3.0, help="Secondi di traffico per misura")
+    cli.add_argument(
+        "--rates", type=int, nargs="+", default=[1000, 5000, 20000], help="Frame al secondo simulati"
+    )
+    args = cli.parse_args()
+
+    datagrams = [data for _, data in load_capture()]
+    print(f"{'frame/s':>8} {'modalità':>8} {'loop occupato':>14} {'callback max':>13} {'ritardo p99':>12}")
+    for rate in args.rates:
+        for offload in (False, True):
+            result = asyncio.run(run(datagrams, rate, args.duration, offload))
+            print(
+                f"{rate:>8} {'thread' if offload else 'inline':>8} "
+                f"{result['busy'] * 100:13.1f}% "
+                f"{result['longest'] * 1e3:11.2f}ms "
+                f"{result['lag_p99'] * 1e3:10.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Dispatch degli aggiornamenti registro: trasformazione per sensore o tabella compilata.
+
+I blocchi di registri estratti da packets_log.csv vengono inoltrati in due
+modi. Nel primo ogni sensore è iscritto da solo a un indice ``(unit,
+registro) -> callback``, cercato registro per registro, e applica scala,
+offset, arrotondamento e state map a ogni aggiornamento. Nel secondo la
+``TransformTable`` riceve un blocco per frame come dal hub, estrae i registri
+dei sensori con l'indice ordinato e calcola ogni trasformazione distinta una
+volta.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from _common import load_capture, load_package_module, load_parser
+
+parser = load_parser()
+transforms = load_package_module("transforms")
+
+# (scale, offset, precision, state_map) tipici dei template IMMERGAS.
+PRESETS: List[Tuple[float, float, Optional[int], Optional[Dict[int, str]]]] = [
+    (0.1, 0.0, 1, None),
+    (1.0, 0.0, None, None),
+    (0.01, 0.0, 2, None),
+    (0.1, -50.0, 1, None),
+    (1.0, 0.0, None, {0: "Spento", 1: "Acceso", 2: "Errore"}),
+]
+
+
+class _Index:
+    """Iscrizioni per registro, cercate una per una a ogni valore del blocco."""
+
+    def __init__(self) -> None:
+        self.subscribers: Dict[Tuple[int, int], List[Callable[[int, int, int], None]]] = {}
+
+    def subscribe(self, unit_id, register, callback) -> Callable[[], None]:
+        bucket = self.subscribers.setdefault((unit_id, register), [])
+        bucket.append(callback)
+        return lambda: bucket.remove(callback)
+
+    def dispatch(self, blocks) -> None:
+        subscribers = self.subscribers
+        for unit_id, start, values in blocks:
+            for register, value in enumerate(values, start):
+                bucket = subscribers.get((unit_id, register))
+                if bucket:
+                    for callback in bucket:
+                        callback(unit_id, register, value)
+
+
+class _Blocks:
+    """Consegna dei blocchi con la stessa forma di ``ModbusSnifferHub``."""
+
+    def __init__(self) -> None:
+        self.subscribers: List[Callable] = []
+
+    def subscribe(self, deliver) -> Callable[[], None]:
+        self.subscribers.append(deliver)
+        return lambda: self.subscribers.remove(deliver)
+
+    def dispatch(self, blocks) -> None:
+        subscribers = self.subscribers
+        for unit_id, start, values in blocks:
+            for deliver in subscribers:
+                deliver(unit_id, start, values, None)
+
+
+class _LegacySensor:
+    """Trasformazione attributo per attributo, come prima della tabella."""
+
+    def __init__(self, scale, offset, precision, state_map) -> None:
+        self._scale = scale
+        self._offset = offset
+        self._precision = precision
+        self._state_map = state_map or {}
+        self.native_value: Any = None
+
+    def update(self, unit_id: int, register: int, raw_value: int) -> None:
+        if self._state_map:
+            self.native_value = self._state_map.get(raw_value, str(raw_value))
+        else:
+            scaled = raw_value * self._scale + self._offset
+            if self._precision is not None:
+                scaled = round(scaled, self._precision)
+            self.native_value = scaled
+
+
+class _TableSensor:
+    def __init__(self) -> None:
+        self.native_value: Any = None
+
+    def update(self, raw_value: int, native_value: Any) -> None:
+        self.native_value = native_value
+
+
+def extract_blocks() -> List[Tuple[int, int, Tuple[int, ...]]]:
+    bus = parser.BusState()
+    reassembler = parser.FrameReassembler(bus=bus)
+    blocks = []
+    for index, (_, data) in enumerate(load_capture()):
+        for frame in reassembler.feed(data):
+            decoded = parser.decode_frame(frame)
+            request = bus.observe(frame, float(index), decoded)
+            if decoded is None or not decoded.values:
+                continue
+            if decoded.kind == parser.FRAME_READ_RESPONSE:
+                start = request.start_addr if request else 0
+            else:
+                start = decoded.address or 0
+            blocks.append((decoded.unit_id, start, decoded.values))
+    return blocks
+
+
+def main() -> None:
+    cli = argparse.ArgumentParser(description=__doc__)
+    cli.add_argument("--sensors", type=int, default=500, help="Numero di sensori configurati")
+    cli.add_argument("--repeat", type=int, default=5, help="Ripetizioni del traffico registrato")
+    args = cli.parse_args()
+
+    blocks = extract_blocks()
+    seen = sorted(
+        {(unit_id, register) for unit_id, start, values in blocks for register in range(start, start + len(values))}
+    )
+    rng = random.Random(1)
+    configs = [(seen[i % len(seen)], rng.choice(PRESETS)) for i in range(args.sensors)]
+
+    legacy_index = _Index()
+    legacy = []
+    for (unit_id, register), preset in configs:
+        sensor = _LegacySensor(*preset)
+        legacy.append(sensor)
+        legacy_index.subscribe(unit_id, register, sensor.update)
+
+    table_blocks = _Blocks()
+    table = transforms.TransformTable(table_blocks.subscribe)
+    compiled = []
+    for (unit_id, register), (scale, offset, precision, state_map) in configs:
+        sensor = _TableSensor()
+        compiled.append(sensor)
+        table.add(
+            unit_id,
+            register,
+            sensor.update,
+            scale=scale,
+            offset=offset,
+            precision=precision,
+            state_map=state_map,
+        )
+
+    stream = blocks * args.repeat
+
+    start = time.perf_counter()
+    legacy_index.dispatch(stream)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table_blocks.dispatch(stream)
+    table_time = time.perf_counter() - start
+
+    assert [s.native_value for s in legacy] == [s.native_value for s in compiled]
+    print(f"Sensori: {args.sensors} su {len(seen)} registri, blocchi inoltrati: {len(stream)}")
+    print(f"Iscrizioni all'indice: {args.sensors} per sensore, {len(table)} voci nella tabella")
+    print(f"Per sensore       : {legacy_time:6.3f}s")
+    print(f"Tabella compilata : {table_time:6.3f}s ({legacy_time / table_time:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,148 @@
 """Inizializzazione dell'integrazione Modbus Sniffer."""
 from __future__ import annotations
 
+from typing import Any, Dict, Tuple
+
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.typing import ConfigType
 
 from .const import (
+    CONF_BAUDRATE,
+    CONF_CHANGE_ONLY,
     CONF_CONNECTION_MODE,
+    CONF_DECODE_OFFLOAD,
+    CONF_DEDUP_WINDOW,
     CONF_DEVICE_TYPE,
+    CONF_DRAIN_BUDGET,
+    CONF_HEARTBEAT,
+    CONF_OVERFLOW_POLICY,
+    CONF_QUEUE_SIZE,
     CONF_SOURCE_HOST,
+    CONF_TCP_BUFFER_SIZE,
+    CONF_TCP_HOST,
+    CONF_TCP_PORT,
     CONF_UDP_PORT,
-    DATA_HUB,
-    DATA_LISTENERS,
+    DEFAULT_BAUDRATE,
+    DEFAULT_CHANGE_ONLY,
     DEFAULT_CONNECTION_MODE,
+    DEFAULT_DECODE_OFFLOAD,
+    DEFAULT_DEDUP_WINDOW,
     DEFAULT_DEVICE_TYPE,
+    DEFAULT_DRAIN_BUDGET,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_OVERFLOW_POLICY,
+    DEFAULT_QUEUE_SIZE,
     DEFAULT_SOURCE_HOST,
+    DEFAULT_TCP_BUFFER_SIZE,
+    DEFAULT_TCP_PORT,
     DEFAULT_UDP_PORT,
+    DEVICE_TYPE_LABELS,
     DOMAIN,
+    MODE_TCP,
+    MODE_UDP,
+    OVERFLOW_DROP_NEWEST,
+    OVERFLOW_DROP_OLDEST,
+)
+from .hub import ensure_component_data
+
+PLATFORMS: list[str] = ["sensor", "binary_sensor"]
+
+
+def coerce_register(value: Any) -> int:
+    """Valida un indirizzo di registro, decimale o esadecimale (``0x``)."""
+    if isinstance(value, str):
+        raw = value.strip()
+        base = 16 if raw.lower().startswith("0x") else 10
+        try:
+            value = int(raw, base)
+        except ValueError as err:
+            raise vol.Invalid(f"Valore registro non valido: {value}") from err
+    if not isinstance(value, int):
+        raise vol.Invalid(f"Tipo registro non supportato: {type(value)}")
+    if not 0 <= value <= 0xFFFF:
+        raise vol.Invalid("Il registro deve essere compreso fra 0 e 0xFFFF")
+    return value
+
+
+def coerce_unit_id(value: Any) -> int:
+    """Valida uno unit ID Modbus, decimale o esadecimale (``0x``)."""
+    if isinstance(value, str):
+        raw = value.strip()
+        base = 16 if raw.lower().startswith("0x") else 10
+        try:
+            value = int(raw, base)
+        except ValueError as err:
+            raise vol.Invalid(f"Unit ID non valido: {value}") from err
+    if not isinstance(value, int):
+        raise vol.Invalid("Unit ID deve essere un intero")
+    if not 0 <= value <= 0xFF:
+        raise vol.Invalid("Unit ID deve essere nell'intervallo 0-255")
+    return value
+
+
+def _coerce_identifiers(value: Any) -> Tuple[Tuple[str, str], ...]:
+    identifiers = cv.ensure_list(value)
+    result = []
+    for item in identifiers:
+        if not isinstance(item, str):
+            raise vol.Invalid("Gli identificatori devono essere stringhe")
+        result.append((DOMAIN, item))
+    return tuple(result)
+
+
+DEVICE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("identifiers"): _coerce_identifiers,
+        vol.Optional("manufacturer"): cv.string,
+        vol.Optional("model"): cv.string,
+        vol.Optional("name"): cv.string,
+        vol.Optional("sw_version"): cv.string,
+        vol.Optional("via_device"): cv.string,
+    }
 )
-
-PLATFORMS: list[str] = ["sensor"]
 
 
-def _ensure_domain_data(hass: HomeAssistant) -> dict:
-    data = hass.data.setdefault(DOMAIN, {})
-    data.setdefault(DATA_HUB, {})
-    data.setdefault(DATA_LISTENERS, {})
-    return data
+# Opzioni del listener comuni alle piattaforme YAML dell'integrazione.
+LISTENER_SCHEMA: Dict[Any, Any] = {
+    vol.Optional(CONF_CONNECTION_MODE, default=DEFAULT_CONNECTION_MODE): vol.In(
+        [MODE_UDP, MODE_TCP]
+    ),
+    vol.Optional(CONF_SOURCE_HOST, default=DEFAULT_SOURCE_HOST): cv.string,
+    vol.Optional(CONF_UDP_PORT, default=DEFAULT_UDP_PORT): cv.port,
+    vol.Optional(CONF_TCP_HOST, default=""): cv.string,
+    vol.Optional(CONF_TCP_PORT, default=DEFAULT_TCP_PORT): cv.port,
+    vol.Optional(CONF_BAUDRATE, default=DEFAULT_BAUDRATE): cv.positive_int,
+    vol.Optional(CONF_TCP_BUFFER_SIZE, default=DEFAULT_TCP_BUFFER_SIZE): vol.All(
+        vol.Coerce(int), vol.Range(min=256)
+    ),
+    vol.Optional(CONF_QUEUE_SIZE, default=DEFAULT_QUEUE_SIZE): vol.All(
+        vol.Coerce(int), vol.Range(min=1)
+    ),
+    vol.Optional(CONF_OVERFLOW_POLICY, default=DEFAULT_OVERFLOW_POLICY): vol.In(
+        [OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST]
+    ),
+    vol.Optional(CONF_DRAIN_BUDGET, default=DEFAULT_DRAIN_BUDGET): vol.All(
+        vol.Coerce(float), vol.Range(min=0.1)
+    ),
+    vol.Optional(CONF_DECODE_OFFLOAD, default=DEFAULT_DECODE_OFFLOAD): cv.boolean,
+    vol.Optional(CONF_DEDUP_WINDOW, default=DEFAULT_DEDUP_WINDOW): vol.All(
+        vol.Coerce(float), vol.Range(min=0)
+    ),
+    vol.Optional(CONF_CHANGE_ONLY, default=DEFAULT_CHANGE_ONLY): cv.boolean,
+    vol.Optional(CONF_HEARTBEAT, default=DEFAULT_HEARTBEAT): cv.positive_int,
+    vol.Optional(CONF_DEVICE_TYPE, default=DEFAULT_DEVICE_TYPE): vol.In(list(DEVICE_TYPE_LABELS)),
+    vol.Optional(CONF_NAME, default=""): cv.string,
+}
 
 
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Configurazione dell'integrazione via YAML."""
-    _ensure_domain_data(hass)
+    ensure_component_data(hass)
     return True
 
 
@@ -55,7 +165,7 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Configura un'istanza tramite interfaccia UI."""
-    _ensure_domain_data(hass)
+    ensure_component_data(hass)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
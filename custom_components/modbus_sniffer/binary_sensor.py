@@ -0,0 +1,280 @@
+"""Piattaforma binary_sensor: singoli bit o maschere dei registri di stato."""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import voluptuous as vol
+
+from homeassistant.components.binary_sensor import PLATFORM_SCHEMA, BinarySensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+
+from .const import (
+    ATTR_MASK,
+    ATTR_REGISTER,
+    ATTR_UNIT_ID,
+    CONF_BINARY_SENSORS,
+    CONF_BIT,
+    CONF_DEVICE,
+    CONF_DEVICE_CLASS,
+    CONF_DEVICE_TYPE,
+    CONF_ICON,
+    CONF_MASK,
+    CONF_REGISTER,
+    CONF_UNIT_ID,
+    DATA_LISTENERS,
+    DEFAULT_DEVICE_TYPE,
+    MODE_TCP,
+)
+from . import DEVICE_SCHEMA, LISTENER_SCHEMA, coerce_register, coerce_unit_id
+from .hub import (
+    ModbusSnifferHub,
+    async_acquire_hub,
+    async_release_hub,
+    ensure_component_data,
+    hub_device_info,
+    listener_config,
+    unique_id_prefix,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _bit_to_mask(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalizza ``bit`` in ``mask``: l'entità lavora sempre su una maschera."""
+    if CONF_BIT in config:
+        config = dict(config)
+        config[CONF_MASK] = 1 << config.pop(CONF_BIT)
+    return config
+
+
+BINARY_SENSOR_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required(CONF_NAME): cv.string,
+            vol.Required(CONF_REGISTER): coerce_register,
+            vol.Optional(CONF_UNIT_ID): coerce_unit_id,
+            vol.Exclusive(CONF_BIT, "bit_or_mask"): vol.All(vol.Coerce(int), vol.Range(min=0, max=15)),
+            vol.Exclusive(CONF_MASK, "bit_or_mask"): vol.All(
+                coerce_register, vol.Range(min=1)
+            ),
+            vol.Optional(CONF_DEVICE_CLASS): cv.string,
+            vol.Optional(CONF_ICON): cv.string,
+            vol.Optional(CONF_DEVICE): DEVICE_SCHEMA,
+        }
+    ),
+    cv.has_at_least_one_key(CONF_BIT, CONF_MASK),
+    _bit_to_mask,
+)
+
+
+PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
+    {
+        **LISTENER_SCHEMA,
+        vol.Required(CONF_BINARY_SENSORS): vol.All(cv.ensure_list, [BINARY_SENSOR_SCHEMA]),
+    }
+)
+
+
+async def async_setup_platform(
+    hass: HomeAssistant,
+    config: ConfigType,
+    async_add_entities,
+    discovery_info=None,
+):
+    """Configura i binary_sensor Modbus Sniffer via YAML."""
+    component_data = ensure_component_data(hass)
+    mode, host, port, hub_options = listener_config(config)
+    if mode == MODE_TCP and not host:
+        _LOGGER.error(
+            "Configurazione Modbus Sniffer YAML: host TCP mancante per la modalità TCP"
+        )
+        return
+    await _async_setup_binary_sensors(
+        hass,
+        mode,
+        host,
+        port,
+        config[CONF_BINARY_SENSORS],
+        component_data,
+        async_add_entities,
+        instance_name=(config.get(CONF_NAME) or "").strip() or None,
+        device_type=config.get(CONF_DEVICE_TYPE, DEFAULT_DEVICE_TYPE),
+        hub_options=hub_options,
+    )
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities,
+):
+    """Configura i binary_sensor definiti nelle opzioni della config entry."""
+    sensors_conf: Iterable[dict] = entry.options.get(CONF_BINARY_SENSORS, [])
+    if not sensors_conf:
+        return
+    component_data = ensure_component_data(hass)
+    mode, host, port, hub_options = listener_config(entry.data)
+    if mode == MODE_TCP and not host:
+        _LOGGER.error(
+            "Config entry Modbus Sniffer %s: host TCP mancante in modalità TCP",
+            entry.title,
+        )
+        return
+    await _async_setup_binary_sensors(
+        hass,
+        mode,
+        host,
+        port,
+        sensors_conf,
+        component_data,
+        async_add_entities,
+        instance_name=(entry.data.get(CONF_NAME) or "").strip() or None,
+        device_type=entry.data.get(CONF_DEVICE_TYPE, DEFAULT_DEVICE_TYPE),
+        entry_id=entry.entry_id,
+        hub_options=hub_options,
+    )
+
+
+async def _async_setup_binary_sensors(
+    hass: HomeAssistant,
+    mode: str,
+    host: str,
+    port: int,
+    sensors_conf: Iterable[dict],
+    component_data: Dict[str, Any],
+    async_add_entities,
+    *,
+    instance_name: Optional[str] = None,
+    device_type: Optional[str] = None,
+    entry_id: Optional[str] = None,
+    hub_options: Dict[str, Any],
+) -> None:
+    hub, hub_key = await async_acquire_hub(hass, component_data, mode, host, port, hub_options)
+    listeners: Dict[Tuple[str, str, int], int] = component_data[DATA_LISTENERS]
+
+    entities: List[ModbusSnifferBinarySensor] = []
+    for sensor_conf in sensors_conf:
+        try:
+            validated = BINARY_SENSOR_SCHEMA(sensor_conf)
+        except vol.Invalid as err:
+            _LOGGER.error(
+                "Configurazione binary_sensor non valida per %s:%s -> %s", host, port, err
+            )
+            continue
+        entities.append(
+            ModbusSnifferBinarySensor(
+                hub,
+                hub_key,
+                component_data,
+                validated,
+                instance_name=instance_name,
+                device_type=device_type,
+                entry_id=entry_id,
+            )
+        )
+
+    if not entities:
+        _LOGGER.warning("Nessun binary_sensor valido configurato per %s:%s", host, port)
+        return
+
+    listeners[hub_key] = listeners.get(hub_key, 0) + len(entities)
+    async_add_entities(entities)
+
+
+class ModbusSnifferBinarySensor(BinarySensorEntity):
+    """Bit (o maschera) di un registro osservato dal Modbus Sniffer."""
+
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        hub: ModbusSnifferHub,
+        hub_key: Tuple[str, str, int],
+        component_data: Dict[str, Any],
+        config: dict,
+        *,
+        instance_name: Optional[str] = None,
+        device_type: Optional[str] = None,
+        entry_id: Optional[str] = None,
+    ) -> None:
+        self._hub = hub
+        self._hub_key = hub_key
+        self._component_data = component_data
+        base_name = config[CONF_NAME]
+        self._name = f"{instance_name} {base_name}" if instance_name else base_name
+        self._register = config[CONF_REGISTER]
+        self._unit_id = config.get(CONF_UNIT_ID)
+        self._mask = config[CONF_MASK]
+        self._device_class = config.get(CONF_DEVICE_CLASS)
+        self._icon = config.get(CONF_ICON)
+        self._is_on: Optional[bool] = None
+        self._unsubscribe = None
+        self._device_info = hub_device_info(
+            config,
+            hub_key,
+            instance_name=instance_name,
+            device_type=device_type,
+            entry_id=entry_id,
+        )
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def unique_id(self) -> str:
+        uid_part = f"{self._unit_id:02X}" if self._unit_id is not None else "any"
+        return f"{unique_id_prefix(self._hub_key)}_{uid_part}_{self._register:04X}_{self._mask:04X}"
+
+    @property
+    def device_info(self) -> dict:
+        return self._device_info
+
+    @property
+    def device_class(self) -> Optional[str]:
+        return self._device_class
+
+    @property
+    def icon(self) -> Optional[str]:
+        return self._icon
+
+    @property
+    def is_on(self) -> Optional[bool]:
+        return self._is_on
+
+    @property
+    def extra_state_attributes(self) -> dict:
+        attrs = {
+            ATTR_REGISTER: f"0x{self._register:04X}",
+            ATTR_MASK: f"0x{self._mask:04X}",
+        }
+        if self._unit_id is not None:
+            attrs[ATTR_UNIT_ID] = self._unit_id
+        return attrs
+
+    async def async_added_to_hass(self) -> None:
+        # Il hub confronta la maschera nel percorso di dispatch e richiama
+        # l'entità solo quando il suo stato cambia.
+        self._unsubscribe = self._hub.async_subscribe_bits(
+            self._unit_id, self._register, self._mask, self._handle_bit_update
+        )
+        existing = self._hub.get_sample(self._unit_id, self._register)
+        if existing is not None:
+            self._is_on = bool(existing.value & self._mask)
+            self.async_write_ha_state()
+
+    async def async_will_remove_from_hass(self) -> None:
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        await async_release_hub(self._component_data, self._hub_key)
+
+    @callback
+    def _handle_bit_update(self, is_on: bool) -> None:
+        self._is_on = is_on
+        self.async_write_ha_state()
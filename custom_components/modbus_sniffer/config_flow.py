@@ -13,12 +13,25 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.const import CONF_NAME
 
 from .const import (
+    CONF_BAUDRATE,
+    CONF_BINARY_SENSORS,
+    CONF_BIT,
+    CONF_BYTE_ORDER,
+    CONF_CHANGE_ONLY,
     CONF_CONNECTION_MODE,
+    CONF_DATA_TYPE,
+    CONF_DEADBAND,
+    CONF_DEADBAND_PERCENT,
+    CONF_DECODE_OFFLOAD,
+    CONF_DEDUP_WINDOW,
     CONF_DEVICE_CLASS,
     CONF_DEVICE_TYPE,
     CONF_FORCE_UPDATE,
+    CONF_HEARTBEAT,
     CONF_ICON,
     CONF_INCLUDE_DEFAULTS,
+    CONF_MASK,
+    CONF_MIN_INTERVAL,
     CONF_OFFSET,
     CONF_PRECISION,
     CONF_REGISTER,
@@ -27,25 +40,41 @@ from .const import (
     CONF_SOURCE_HOST,
     CONF_STATE_CLASS,
     CONF_STATE_MAP,
+    CONF_TCP_BUFFER_SIZE,
     CONF_TCP_HOST,
     CONF_TCP_PORT,
+    CONF_UDP_PORT,
     CONF_UNIT,
     CONF_UNIT_ID,
-    CONF_UDP_PORT,
+    CONF_WORD_ORDER,
+    DEFAULT_BAUDRATE,
+    DEFAULT_BYTE_ORDER,
+    DEFAULT_CHANGE_ONLY,
     DEFAULT_CONNECTION_MODE,
+    DEFAULT_DATA_TYPE,
+    DEFAULT_DEADBAND,
+    DEFAULT_DEADBAND_PERCENT,
+    DEFAULT_DECODE_OFFLOAD,
+    DEFAULT_DEDUP_WINDOW,
     DEFAULT_DEVICE_TYPE,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_MIN_INTERVAL,
     DEFAULT_OFFSET,
     DEFAULT_PRECISION,
     DEFAULT_SCALE,
     DEFAULT_SENSOR_TEMPLATES_BY_DEVICE,
     DEFAULT_SOURCE_HOST,
+    DEFAULT_TCP_BUFFER_SIZE,
     DEFAULT_TCP_PORT,
     DEFAULT_UDP_PORT,
+    DEFAULT_WORD_ORDER,
     DEVICE_TYPE_LABELS,
     DOMAIN,
     MODE_TCP,
     MODE_UDP,
 )
+from .binary_sensor import BINARY_SENSOR_SCHEMA
+from .parser import LAYOUT_DATA_TYPES, ORDER_BIG, ORDER_LITTLE
 from .sensor import SENSOR_SCHEMA
 
 
@@ -77,6 +106,8 @@ class ModbusSnifferConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             conn_host: str | None = None
             conn_port: int | None = None
+            baudrate = DEFAULT_BAUDRATE
+            tcp_buffer_size = DEFAULT_TCP_BUFFER_SIZE
 
             if not errors:
                 if mode == MODE_TCP:
@@ -95,6 +126,22 @@ class ModbusSnifferConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             errors[CONF_TCP_PORT] = "invalid_port"
                         else:
                             conn_port = tcp_port
+                    try:
+                        baudrate = int(user_input.get(CONF_BAUDRATE, DEFAULT_BAUDRATE))
+                    except (TypeError, ValueError):
+                        errors[CONF_BAUDRATE] = "invalid_baudrate"
+                    else:
+                        if baudrate < 0:
+                            errors[CONF_BAUDRATE] = "invalid_baudrate"
+                    try:
+                        tcp_buffer_size = int(
+                            user_input.get(CONF_TCP_BUFFER_SIZE, DEFAULT_TCP_BUFFER_SIZE)
+                        )
+                    except (TypeError, ValueError):
+                        errors[CONF_TCP_BUFFER_SIZE] = "invalid_buffer_size"
+                    else:
+                        if tcp_buffer_size < 256:
+                            errors[CONF_TCP_BUFFER_SIZE] = "invalid_buffer_size"
                 else:
                     source_host_raw = user_input.get(CONF_SOURCE_HOST, DEFAULT_SOURCE_HOST)
                     source_host = (
@@ -132,10 +179,20 @@ class ModbusSnifferConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_DEVICE_TYPE: device_type,
                     CONF_CONNECTION_MODE: mode,
                     CONF_SENSORS: sensors,
+                    CONF_CHANGE_ONLY: bool(user_input.get(CONF_CHANGE_ONLY, DEFAULT_CHANGE_ONLY)),
+                    CONF_HEARTBEAT: int(user_input.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT)),
+                    CONF_DECODE_OFFLOAD: bool(
+                        user_input.get(CONF_DECODE_OFFLOAD, DEFAULT_DECODE_OFFLOAD)
+                    ),
+                    CONF_DEDUP_WINDOW: float(
+                        user_input.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW)
+                    ),
                 }
                 if mode == MODE_TCP:
                     data[CONF_TCP_HOST] = conn_host
                     data[CONF_TCP_PORT] = conn_port
+                    data[CONF_BAUDRATE] = baudrate
+                    data[CONF_TCP_BUFFER_SIZE] = tcp_buffer_size
                 else:
                     data[CONF_SOURCE_HOST] = conn_host
                     data[CONF_UDP_PORT] = conn_port
@@ -169,6 +226,14 @@ class ModbusSnifferConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_TCP_PORT,
                         default=user_input.get(CONF_TCP_PORT, DEFAULT_TCP_PORT),
                     ): vol.All(vol.Coerce(int), vol.Range(min=1, max=65535)),
+                    vol.Optional(
+                        CONF_BAUDRATE,
+                        default=user_input.get(CONF_BAUDRATE, DEFAULT_BAUDRATE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_TCP_BUFFER_SIZE,
+                        default=user_input.get(CONF_TCP_BUFFER_SIZE, DEFAULT_TCP_BUFFER_SIZE),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=256)),
                 }
             )
         else:
@@ -186,6 +251,24 @@ class ModbusSnifferConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
 
         schema_dict[vol.Optional(CONF_INCLUDE_DEFAULTS, default=user_input.get(CONF_INCLUDE_DEFAULTS, True))] = bool
+        schema_dict[
+            vol.Optional(CONF_CHANGE_ONLY, default=user_input.get(CONF_CHANGE_ONLY, DEFAULT_CHANGE_ONLY))
+        ] = bool
+        schema_dict[
+            vol.Optional(CONF_HEARTBEAT, default=user_input.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT))
+        ] = vol.All(vol.Coerce(int), vol.Range(min=1))
+        schema_dict[
+            vol.Optional(
+                CONF_DECODE_OFFLOAD,
+                default=user_input.get(CONF_DECODE_OFFLOAD, DEFAULT_DECODE_OFFLOAD),
+            )
+        ] = bool
+        schema_dict[
+            vol.Optional(
+                CONF_DEDUP_WINDOW,
+                default=user_input.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW),
+            )
+        ] = vol.All(vol.Coerce(float), vol.Range(min=0))
 
         schema = vol.Schema(schema_dict)
         return self.async_show_form(
@@ -209,26 +292,35 @@ class ModbusSnifferOptionsFlowHandler(config_entries.OptionsFlow):
         if base is None:
             base = config_entry.data.get(CONF_SENSORS, [])
         self._sensors: List[dict] = [dict(sensor) for sensor in base]
+        self._binary_sensors: List[dict] = [
+            dict(sensor) for sensor in config_entry.options.get(CONF_BINARY_SENSORS, [])
+        ]
 
     async def async_step_init(self, user_input: Dict[str, Any] | None = None) -> FlowResult:
         if user_input is not None:
             action = user_input["action"]
             if action == "add":
                 return await self.async_step_add()
+            if action == "add_binary":
+                return await self.async_step_add_binary()
             if action == "remove":
                 return await self.async_step_remove()
             if action == "clear":
                 self._sensors.clear()
+                self._binary_sensors.clear()
                 return await self._async_save()
             if action == "finish":
                 return await self._async_save()
 
-        actions = ["finish", "add", "remove", "clear"]
+        actions = ["finish", "add", "add_binary", "remove", "clear"]
         schema = vol.Schema({vol.Required("action", default="finish"): vol.In(actions)})
         return self.async_show_form(
             step_id="init",
             data_schema=schema,
-            description_placeholders={"sensor_count": str(len(self._sensors))},
+            description_placeholders={
+                "sensor_count": str(len(self._sensors)),
+                "binary_sensor_count": str(len(self._binary_sensors)),
+            },
         )
 
     async def async_step_add(self, user_input: Dict[str, Any] | None = None) -> FlowResult:
@@ -255,11 +347,27 @@ class ModbusSnifferOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional(CONF_SCALE, default=DEFAULT_SCALE): vol.Coerce(float),
                 vol.Optional(CONF_OFFSET, default=DEFAULT_OFFSET): vol.Coerce(float),
                 vol.Optional(CONF_PRECISION, default=""): str,
+                vol.Optional(CONF_DATA_TYPE, default=DEFAULT_DATA_TYPE): vol.In(LAYOUT_DATA_TYPES),
+                vol.Optional(CONF_WORD_ORDER, default=DEFAULT_WORD_ORDER): vol.In(
+                    [ORDER_BIG, ORDER_LITTLE]
+                ),
+                vol.Optional(CONF_BYTE_ORDER, default=DEFAULT_BYTE_ORDER): vol.In(
+                    [ORDER_BIG, ORDER_LITTLE]
+                ),
+                vol.Optional(CONF_DEADBAND, default=DEFAULT_DEADBAND): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
+                vol.Optional(CONF_DEADBAND_PERCENT, default=DEFAULT_DEADBAND_PERCENT): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
                 vol.Optional(CONF_UNIT, default=""): str,
                 vol.Optional(CONF_DEVICE_CLASS, default=""): str,
                 vol.Optional(CONF_STATE_CLASS, default=""): str,
                 vol.Optional(CONF_ICON, default=""): str,
                 vol.Optional(CONF_FORCE_UPDATE, default=False): bool,
+                vol.Optional(CONF_MIN_INTERVAL, default=DEFAULT_MIN_INTERVAL): vol.All(
+                    vol.Coerce(float), vol.Range(min=0)
+                ),
                 vol.Optional(CONF_STATE_MAP, default=""): str,
             }
         )
@@ -269,8 +377,47 @@ class ModbusSnifferOptionsFlowHandler(config_entries.OptionsFlow):
             errors=errors,
         )
 
+    async def async_step_add_binary(self, user_input: Dict[str, Any] | None = None) -> FlowResult:
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            sensor_data: Dict[str, Any] = {
+                CONF_NAME: user_input[CONF_NAME],
+                CONF_REGISTER: user_input[CONF_REGISTER],
+            }
+            for key in (CONF_UNIT_ID, CONF_MASK, CONF_DEVICE_CLASS, CONF_ICON):
+                value = user_input.get(key, "").strip()
+                if value:
+                    sensor_data[key] = value
+            bit = user_input.get(CONF_BIT)
+            if CONF_MASK not in sensor_data and bit is not None:
+                sensor_data[CONF_BIT] = bit
+            try:
+                validated = BINARY_SENSOR_SCHEMA(sensor_data)
+            except vol.Invalid:
+                errors["base"] = "invalid_sensor"
+            else:
+                self._binary_sensors.append(dict(validated))
+                return await self._async_save()
+
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_NAME): str,
+                vol.Required(CONF_REGISTER): str,
+                vol.Optional(CONF_UNIT_ID, default=""): str,
+                vol.Optional(CONF_BIT, default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=15)),
+                vol.Optional(CONF_MASK, default=""): str,
+                vol.Optional(CONF_DEVICE_CLASS, default=""): str,
+                vol.Optional(CONF_ICON, default=""): str,
+            }
+        )
+        return self.async_show_form(
+            step_id="add_binary",
+            data_schema=schema,
+            errors=errors,
+        )
+
     async def async_step_remove(self, user_input: Dict[str, Any] | None = None) -> FlowResult:
-        if not self._sensors:
+        if not self._sensors and not self._binary_sensors:
             return self.async_show_form(
                 step_id="remove",
                 data_schema=vol.Schema({}),
@@ -279,13 +426,22 @@ class ModbusSnifferOptionsFlowHandler(config_entries.OptionsFlow):
 
         errors: Dict[str, str] = {}
         if user_input is not None:
-            index = int(user_input["sensor_index"])
-            if 0 <= index < len(self._sensors):
-                self._sensors.pop(index)
+            selection = user_input["sensor_index"]
+            # I binary_sensor sono elencati con il prefisso "b".
+            target = self._binary_sensors if selection.startswith("b") else self._sensors
+            index = int(selection.lstrip("b"))
+            if 0 <= index < len(target):
+                target.pop(index)
                 return await self._async_save()
             errors["base"] = "invalid_selection"
 
         options = {str(idx): sensor.get("name", f"Registro {sensor.get('register')}") for idx, sensor in enumerate(self._sensors)}
+        options.update(
+            {
+                f"b{idx}": sensor.get("name", f"Registro {sensor.get('register')}")
+                for idx, sensor in enumerate(self._binary_sensors)
+            }
+        )
         schema = vol.Schema(
             {
                 vol.Required("sensor_index"): vol.In(list(options.keys()))
@@ -299,7 +455,10 @@ class ModbusSnifferOptionsFlowHandler(config_entries.OptionsFlow):
         )
 
     async def _async_save(self) -> FlowResult:
-        return self.async_create_entry(title="", data={CONF_SENSORS: self._sensors})
+        return self.async_create_entry(
+            title="",
+            data={CONF_SENSORS: self._sensors, CONF_BINARY_SENSORS: self._binary_sensors},
+        )
 
     def _normalize_sensor_input(self, user_input: Mapping[str, Any]) -> Dict[str, Any]:
         sensor: Dict[str, Any] = {
@@ -307,7 +466,13 @@ class ModbusSnifferOptionsFlowHandler(config_entries.OptionsFlow):
             CONF_REGISTER: user_input[CONF_REGISTER],
             CONF_SCALE: user_input.get(CONF_SCALE, DEFAULT_SCALE),
             CONF_OFFSET: user_input.get(CONF_OFFSET, DEFAULT_OFFSET),
+            CONF_DATA_TYPE: user_input.get(CONF_DATA_TYPE, DEFAULT_DATA_TYPE),
+            CONF_WORD_ORDER: user_input.get(CONF_WORD_ORDER, DEFAULT_WORD_ORDER),
+            CONF_BYTE_ORDER: user_input.get(CONF_BYTE_ORDER, DEFAULT_BYTE_ORDER),
+            CONF_DEADBAND: user_input.get(CONF_DEADBAND, DEFAULT_DEADBAND),
+            CONF_DEADBAND_PERCENT: user_input.get(CONF_DEADBAND_PERCENT, DEFAULT_DEADBAND_PERCENT),
             CONF_FORCE_UPDATE: user_input.get(CONF_FORCE_UPDATE, False),
+            CONF_MIN_INTERVAL: user_input.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
         }
         unit_id_raw = user_input.get(CONF_UNIT_ID)
         if unit_id_raw:
@@ -5,6 +5,7 @@ from homeassistant.const import CONF_NAME
 DOMAIN = "modbus_sniffer"
 DATA_HUB = "hub"
 DATA_LISTENERS = "listeners"
+DATA_TRANSFORMS = "transforms"
 
 CONF_SENSORS = "sensors"
 CONF_REGISTER = "register"
@@ -19,6 +20,15 @@ CONF_DEVICE_CLASS = "device_class"
 CONF_STATE_CLASS = "state_class"
 CONF_ICON = "icon"
 CONF_FORCE_UPDATE = "force_update"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_DEADBAND = "deadband"
+CONF_DEADBAND_PERCENT = "deadband_percent"
+CONF_DATA_TYPE = "data_type"
+CONF_WORD_ORDER = "word_order"
+CONF_BYTE_ORDER = "byte_order"
+CONF_BINARY_SENSORS = "binary_sensors"
+CONF_BIT = "bit"
+CONF_MASK = "mask"
 CONF_DEVICE = "device"
 CONF_UNIT_ID = "unit_id"
 CONF_INCLUDE_DEFAULTS = "include_defaults"
@@ -26,10 +36,22 @@ CONF_CONNECTION_MODE = "connection_mode"
 CONF_TCP_HOST = "tcp_host"
 CONF_TCP_PORT = "tcp_port"
 CONF_DEVICE_TYPE = "device_type"
+CONF_BAUDRATE = "baudrate"
+CONF_CHANGE_ONLY = "change_only"
+CONF_HEARTBEAT = "heartbeat"
+CONF_TCP_BUFFER_SIZE = "tcp_buffer_size"
+CONF_QUEUE_SIZE = "queue_size"
+CONF_OVERFLOW_POLICY = "overflow_policy"
+CONF_DRAIN_BUDGET = "drain_budget"
+CONF_DECODE_OFFLOAD = "decode_offload"
+CONF_DEDUP_WINDOW = "dedup_window"
 
 MODE_UDP = "udp"
 MODE_TCP = "tcp"
 
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+
 DEVICE_TYPE_IMMERGAS_AUDAX_12 = "immergas_audax_12"
 
 DEVICE_TYPE_LABELS = {
@@ -39,18 +61,44 @@ DEVICE_TYPE_LABELS = {
 DEFAULT_SOURCE_HOST = "0.0.0.0"
 DEFAULT_UDP_PORT = 7777
 DEFAULT_TCP_PORT = 502
+DEFAULT_TCP_BUFFER_SIZE = 4096
+DEFAULT_QUEUE_SIZE = 1024
+DEFAULT_OVERFLOW_POLICY = OVERFLOW_DROP_OLDEST
+# Millisecondi di elaborazione della coda UDP prima di restituire il controllo al loop.
+DEFAULT_DRAIN_BUDGET = 5
 DEFAULT_SCALE = 1.0
+# Secondi minimi fra due scritture di stato dello stesso sensore (0 = nessun limite).
+DEFAULT_MIN_INTERVAL = 0.0
+# Variazione minima del valore scalato (assoluta e in percentuale) per cambiare stato.
+DEFAULT_DEADBAND = 0.0
+DEFAULT_DEADBAND_PERCENT = 0.0
+# Tipo di dato del registro e ordine di parole/byte per i valori su più registri.
+DEFAULT_DATA_TYPE = "uint16"
+DEFAULT_WORD_ORDER = "big"
+DEFAULT_BYTE_ORDER = "big"
 DEFAULT_OFFSET = 0.0
 DEFAULT_PRECISION = None
 DEFAULT_CONNECTION_MODE = MODE_UDP
 DEFAULT_DEVICE_TYPE = DEVICE_TYPE_IMMERGAS_AUDAX_12
+# 0 disattiva il framing basato sulle pause del bus RTU.
+DEFAULT_BAUDRATE = 0
+DEFAULT_CHANGE_ONLY = False
+DEFAULT_DECODE_OFFLOAD = False
+# Secondi entro cui un frame identico (es. l'eco di una FC06) viene inoltrato una sola volta.
+DEFAULT_DEDUP_WINDOW = 0.5
+# Secondi dopo i quali un valore invariato viene comunque inoltrato ai sensori.
+DEFAULT_HEARTBEAT = 300
 
-SIGNAL_REGISTER_UPDATE = f"{DOMAIN}_register_update"
+STORAGE_VERSION = 1
+# Secondi di attesa prima di salvare su disco lo snapshot dei registri.
+SNAPSHOT_SAVE_DELAY = 60
 
 ATTR_REGISTER = "register"
 ATTR_RAW_VALUE = "raw_value"
 ATTR_UNIT_ID = "unit_id"
 ATTR_LAST_UPDATE = "last_update"
+ATTR_SNAPSHOT_AGE = "snapshot_age"
+ATTR_MASK = "mask"
 
 DEFAULT_SENSOR_TEMPLATES_BY_DEVICE = {
     DEVICE_TYPE_IMMERGAS_AUDAX_12: [
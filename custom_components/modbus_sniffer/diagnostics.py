@@ -0,0 +1,34 @@
+"""Diagnostica delle config entry Modbus Sniffer."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_HUB, DOMAIN
+from .hub import listener_config
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> Dict[str, Any]:
+    """Restituisce i contatori del hub usato dalla config entry."""
+    mode, host, port, hub_options = listener_config(entry.data)
+    hub = hass.data.get(DOMAIN, {}).get(DATA_HUB, {}).get((mode, host, port))
+    diagnostics: Dict[str, Any] = {
+        "listener": {"mode": mode, "host": host, "port": port, **hub_options},
+        "running": hub is not None,
+    }
+    if hub is None:
+        return diagnostics
+    diagnostics.update(
+        {
+            "queue": hub.queue_statistics,
+            "sources": hub.source_statistics,
+            "tcp": hub.tcp_statistics,
+            "updates": hub.update_statistics,
+            "suppressed_frames": hub.suppressed_frames,
+        }
+    )
+    return diagnostics
@@ -2,34 +2,93 @@
 from __future__ import annotations
 
 import asyncio
+import heapq
 import logging
-from collections import defaultdict, deque
+import math
+import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Deque, Dict, Optional, Tuple
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.helpers.dispatcher import async_dispatcher_send
-from homeassistant.util import dt as dt_util
+from homeassistant.exceptions import PlatformNotReady
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
 
 from .const import (
     ATTR_LAST_UPDATE,
     ATTR_RAW_VALUE,
     ATTR_REGISTER,
     ATTR_UNIT_ID,
+    CONF_BAUDRATE,
+    CONF_CHANGE_ONLY,
+    CONF_CONNECTION_MODE,
+    CONF_DECODE_OFFLOAD,
+    CONF_DEDUP_WINDOW,
+    CONF_DEVICE,
+    CONF_DRAIN_BUDGET,
+    CONF_HEARTBEAT,
+    CONF_OVERFLOW_POLICY,
+    CONF_QUEUE_SIZE,
+    CONF_SOURCE_HOST,
+    CONF_TCP_BUFFER_SIZE,
+    CONF_TCP_HOST,
+    CONF_TCP_PORT,
+    CONF_UDP_PORT,
+    DATA_HUB,
+    DATA_LISTENERS,
+    DATA_TRANSFORMS,
+    DEFAULT_BAUDRATE,
+    DEFAULT_CHANGE_ONLY,
+    DEFAULT_CONNECTION_MODE,
+    DEFAULT_DECODE_OFFLOAD,
+    DEFAULT_DEDUP_WINDOW,
+    DEFAULT_DRAIN_BUDGET,
+    DEFAULT_HEARTBEAT,
+    DEFAULT_OVERFLOW_POLICY,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_SOURCE_HOST,
+    DEFAULT_TCP_BUFFER_SIZE,
+    DEFAULT_TCP_PORT,
+    DEFAULT_UDP_PORT,
+    DEVICE_TYPE_LABELS,
+    DOMAIN,
     MODE_TCP,
     MODE_UDP,
-    SIGNAL_REGISTER_UPDATE,
+    OVERFLOW_DROP_NEWEST,
+    OVERFLOW_DROP_OLDEST,
+    SNAPSHOT_SAVE_DELAY,
+    STORAGE_VERSION,
 )
 from .parser import (
-    parse_fc03_request,
-    parse_fc03_response,
-    parse_fc06,
-    parse_fc16_request,
-    split_modbus_frames,
+    FRAME_READ_RESPONSE,
+    FRAME_WRITE_REQUEST,
+    FRAME_WRITE_SINGLE,
+    BusState,
+    DecodedFrame,
+    FrameBuffer,
+    FrameDeduplicator,
+    FrameReassembler,
+    PendingRequest,
+    RegisterLayout,
+    decode_frame,
+    rtu_silence,
 )
+from .registers import (
+    REGISTER_COUNT,
+    BlockCallback,
+    RegisterIndex,
+    RegisterStore,
+    UnitRegisters,
+)
+from .transforms import TransformTable
+from .worker import DecodeWorker, RegisterBlock
 
 _LOGGER = logging.getLogger(__name__)
 
+# Callback invocata con il nuovo stato quando i bit osservati cambiano.
+BitCallback = Callable[[bool], None]
+
 
 @dataclass
 class RegisterValue:
@@ -37,8 +96,9 @@ class RegisterValue:
 
     unit_id: int
     register: int
-    value: int
+    value: Union[int, float]
     updated_at: float
+    restored: bool = False
 
     @property
     def as_dict(self) -> dict:
@@ -50,6 +110,60 @@ class RegisterValue:
         }
 
 
+class _BitWatch:
+    """Maschera di bit osservata su un registro, con l'ultimo stato notificato."""
+
+    __slots__ = ("unit_id", "mask", "state", "callback")
+
+    def __init__(
+        self,
+        unit_id: Optional[int],
+        mask: int,
+        state: Optional[bool],
+        update_callback: BitCallback,
+    ) -> None:
+        self.unit_id = unit_id
+        self.mask = mask
+        self.state = state
+        self.callback = update_callback
+
+
+@dataclass
+class _Source:
+    """Stato di ricezione di un gateway: riassemblaggio, richieste pendenti e contatori."""
+
+    name: str
+    bus: BusState
+    reassembler: FrameReassembler
+    # Le ripetizioni si riconoscono solo fra frame dello stesso gateway.
+    dedup: FrameDeduplicator
+    reads: int = 0
+    bytes: int = 0
+    frames: int = 0
+    last_seen: float = 0.0
+
+    @property
+    def statistics(self) -> Dict[str, int]:
+        return {
+            "reads": self.reads,
+            "bytes": self.bytes,
+            "frames": self.frames,
+            "discarded": self.reassembler.discarded,
+            "pending": self.reassembler.pending,
+            "echoes": self.dedup.echoes,
+            "duplicates": self.dedup.duplicates,
+        }
+
+    def reset(self) -> None:
+        self.reassembler.reset()
+        self.bus.reset()
+        self.dedup.reset()
+
+
+# Oltre questo numero di sorgenti UDP viene dimenticata quella inattiva da più tempo.
+MAX_SOURCES = 32
+
+
 class _UDPProtocol(asyncio.DatagramProtocol):
     """Protocollo asincrono per ricevere datagrammi UDP."""
 
@@ -63,21 +177,116 @@ class _UDPProtocol(asyncio.DatagramProtocol):
         _LOGGER.error("Errore dal socket UDP Modbus Sniffer: %s", exc)
 
 
+class _TCPProtocol(asyncio.BufferedProtocol):
+    """Protocollo TCP che riceve direttamente in un buffer preallocato.
+
+    Ogni lettura viene consegnata subito al riassemblatore del hub, quindi la
+    stessa area viene riutilizzata per tutte le letture senza allocare oggetti
+    ``bytes``.
+    """
+
+    def __init__(self, hub: "ModbusSnifferHub", buffer_size: int) -> None:
+        self._hub = hub
+        self._view = memoryview(bytearray(buffer_size))
+        self.closed: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def get_buffer(self, sizehint: int) -> memoryview:  # type: ignore[override]
+        return self._view
+
+    def buffer_updated(self, nbytes: int) -> None:  # type: ignore[override]
+        self._hub.handle_stream(self._view[:nbytes])
+
+    def eof_received(self) -> Optional[bool]:  # type: ignore[override]
+        return False
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:  # type: ignore[override]
+        if not self.closed.done():
+            self.closed.set_result(exc)
+
+
 class ModbusSnifferHub:
     """Gestisce il binding di rete e converte i frame in aggiornamenti registro."""
 
-    def __init__(self, hass: HomeAssistant, mode: str, host: str, port: int) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        mode: str,
+        host: str,
+        port: int,
+        *,
+        baudrate: int = 0,
+        change_only: bool = False,
+        heartbeat: float = DEFAULT_HEARTBEAT,
+        tcp_buffer_size: int = DEFAULT_TCP_BUFFER_SIZE,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        overflow_policy: str = DEFAULT_OVERFLOW_POLICY,
+        drain_budget: float = DEFAULT_DRAIN_BUDGET,
+        decode_offload: bool = False,
+        dedup_window: float = DEFAULT_DEDUP_WINDOW,
+    ) -> None:
         self._hass = hass
         self._mode = mode
         self._host = host
         self._port = port
         self._transport: Optional[asyncio.BaseTransport] = None
         self._tcp_task: Optional[asyncio.Task] = None
-        self._tcp_writer: Optional[asyncio.StreamWriter] = None
+        self._tcp_transport: Optional[asyncio.BaseTransport] = None
+        self._tcp_buffer_size = tcp_buffer_size
         self._stop_requested = False
-        self._buffer = b""
-        self._pending_reads: Dict[int, Deque[Tuple[int, int, float]]] = defaultdict(deque)
-        self._values: Dict[Tuple[int, int], RegisterValue] = {}
+        # Coda limitata fra socket UDP e decoder, svuotata a blocchi di
+        # ``drain_budget`` millisecondi per non bloccare il loop di HA.
+        self._queue: Deque[Tuple[str, bytes, float]] = deque()
+        self._queue_size = queue_size
+        self._overflow_policy = overflow_policy
+        self._drain_budget = drain_budget / 1000
+        self._drain_handle: Optional[asyncio.Handle] = None
+        self._dropped_datagrams = 0
+        self._queue_peak = 0
+        # Con ``decode_offload`` riassemblaggio e decodifica girano in un thread
+        # dedicato; il loop riceve solo i blocchi di registri già estratti.
+        self._decode_offload = decode_offload
+        self._worker: Optional[DecodeWorker] = None
+        # Ogni gateway ha il proprio riassemblatore e la propria coda di richieste:
+        # i datagrammi di sniffer diversi sulla stessa porta non si mescolano.
+        self._sources: Dict[str, _Source] = {}
+        # Lo stream TCP conserva i tempi di arrivo: con il baudrate del bus le
+        # pause fra le letture delimitano i frame.
+        self._silence = rtu_silence(baudrate) if mode == MODE_TCP and baudrate else None
+        self._dedup_window = dedup_window
+        # Frame soppressi dalle sorgenti già dimenticate: (echi, duplicati).
+        self._retired_repeats = (0, 0)
+        self._values = RegisterStore(track_forwarded=change_only)
+        # Consumatori dei blocchi: ognuno riceve una chiamata per frame.
+        self._block_subscribers: List[BlockCallback] = []
+        # Bit di stato: registro -> maschere osservate dai binary_sensor.
+        self._bit_watches: RegisterIndex[_BitWatch] = RegisterIndex()
+        self._unsubscribe_bits: Optional[Callable[[], None]] = None
+        self._change_only = change_only
+        self._heartbeat = heartbeat
+        self._forwarded_updates = 0
+        self._suppressed_updates = 0
+        # Scritture di stato evitate dalla banda morta dei sensori.
+        self._deadband_skipped = 0
+        self._store: Store = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{slugify(f'{mode}_{host}_{port}')}"
+        )
+        self._save_pending = False
+        # Istante (orologio del loop) del ripristino: i valori più vecchi vengono dallo snapshot.
+        self._restored_until: Optional[float] = None
+        self._frame_handlers: Dict[
+            Tuple[int, str],
+            Callable[[DecodedFrame, Optional[PendingRequest]], Optional[RegisterBlock]],
+        ] = {
+            (3, FRAME_READ_RESPONSE): self._handle_holding_read,
+            (6, FRAME_WRITE_SINGLE): self._handle_holding_write,
+            (16, FRAME_WRITE_REQUEST): self._handle_holding_write,
+        }
+        # Consegne differite dei sensori con intervallo minimo: un solo timer per
+        # hub, armato sulla scadenza più vicina.
+        self._deliveries: Dict[Callable[[], None], float] = {}
+        self._delivery_heap: List[Tuple[float, int, Callable[[], None]]] = []
+        self._delivery_seq = 0
+        self._delivery_timer: Optional[asyncio.TimerHandle] = None
         self._lock = asyncio.Lock()
 
     @property
@@ -88,9 +297,23 @@ class ModbusSnifferHub:
     def mode(self) -> str:
         return self._mode
 
+    @property
+    def suppressed_frames(self) -> Dict[str, int]:
+        """Conteggio dei frame ripetuti non inoltrati ai sensori, su tutte le sorgenti."""
+        echoes, duplicates = self._retired_repeats
+        for source in tuple(self._sources.values()):
+            echoes += source.dedup.echoes
+            duplicates += source.dedup.duplicates
+        return {
+            "echoes": echoes,
+            "duplicates": duplicates,
+        }
+
     async def async_start(self) -> None:
         """Avvia l'ascolto in base alla modalità configurata."""
         async with self._lock:
+            if self._restored_until is None:
+                await self._async_restore()
             if self._mode == MODE_UDP:
                 if self._transport is not None:
                     return
@@ -110,13 +333,28 @@ class ModbusSnifferHub:
                     )
                     raise
                 self._transport = transport
+                self._start_worker()
             else:
                 if self._tcp_task and not self._tcp_task.done():
                     return
                 loop = asyncio.get_running_loop()
+                self._start_worker()
                 self._stop_requested = False
                 self._tcp_task = loop.create_task(self._tcp_run())
 
+    def _start_worker(self) -> None:
+        """Avvia il thread di decodifica, solo dopo che il listener è attivo."""
+        if not self._decode_offload or self._worker is not None:
+            return
+        self._worker = DecodeWorker(
+            asyncio.get_running_loop(),
+            self._decode_block,
+            self._store_blocks,
+            max_pending=self._queue_size,
+            drop_oldest=self._overflow_policy == OVERFLOW_DROP_OLDEST,
+        )
+        self._worker.start()
+
     async def async_stop(self) -> None:
         """Ferma l'ascolto."""
         async with self._lock:
@@ -124,6 +362,15 @@ class ModbusSnifferHub:
                 _LOGGER.debug("Arresto listener UDP Modbus Sniffer su %s:%s", self._host, self._port)
                 self._transport.close()
                 self._transport = None
+            if self._drain_handle is not None:
+                self._drain_handle.cancel()
+                self._drain_handle = None
+            self._queue.clear()
+            if self._delivery_timer is not None:
+                self._delivery_timer.cancel()
+                self._delivery_timer = None
+            self._deliveries.clear()
+            self._delivery_heap.clear()
             if self._tcp_task:
                 _LOGGER.debug("Arresto listener TCP Modbus Sniffer verso %s:%s", self._host, self._port)
                 self._stop_requested = True
@@ -134,44 +381,330 @@ class ModbusSnifferHub:
                 except asyncio.CancelledError:
                     pass
                 self._tcp_task = None
-            if self._tcp_writer:
-                self._tcp_writer.close()
-                try:
-                    await self._tcp_writer.wait_closed()
-                except Exception:
-                    pass
-                self._tcp_writer = None
-            self._buffer = b""
-            self._pending_reads.clear()
+            if self._tcp_transport:
+                self._tcp_transport.close()
+                self._tcp_transport = None
+            if self._worker is not None:
+                worker = self._worker
+                self._worker = None
+                await asyncio.get_running_loop().run_in_executor(None, worker.stop)
+                if worker.running:
+                    # Le sorgenti appartengono ancora al thread: un riavvio parte da sorgenti nuove.
+                    self._sources = {}
+            for source in self._sources.values():
+                source.reset()
+            if self._save_pending:
+                await self._store.async_save(self._snapshot_data())
+
+    async def _async_restore(self) -> None:
+        """Ricarica l'ultimo snapshot dei registri salvato su disco."""
+        now = asyncio.get_running_loop().time()
+        self._restored_until = now
+        try:
+            data = await self._store.async_load()
+        except Exception as exc:  # pylint: disable=broad-except
+            _LOGGER.warning(
+                "Snapshot registri Modbus Sniffer %s:%s non leggibile: %s",
+                self._host,
+                self._port,
+                exc,
+            )
+            return
+        if not data:
+            return
+        units = data.get("units")
+        if not isinstance(units, dict):
+            units = {}
+        # Lo snapshot usa l'ora di sistema, l'archivio l'orologio monotono del loop.
+        offset = now - time.time()
+        restored = 0
+        skipped = 0
+        for unit_key, entries in units.items():
+            unit_id = _snapshot_unit_id(unit_key)
+            if unit_id is None or not isinstance(entries, list):
+                skipped += len(entries) if isinstance(entries, list) else 1
+                continue
+            unit: Optional[UnitRegisters] = None
+            for entry in entries:
+                if not _valid_snapshot_entry(entry):
+                    skipped += 1
+                    continue
+                register, value, timestamp = entry
+                if unit is None:
+                    unit = self._values.unit(unit_id)
+                # I valori ripristinati non risultano mai inoltrati: con change_only
+                # la prima lettura dal bus arriva ai sensori anche se è uguale.
+                updated_at = timestamp + offset
+                unit.set(register, value, updated_at)
+                latest = self._values.latest(register)
+                latest_at = None if latest is None else latest.updated_at(register)
+                if latest_at is None or latest_at <= updated_at:
+                    self._values.latest_unit[register] = unit.unit_id
+                restored += 1
+        if skipped:
+            _LOGGER.warning(
+                "Snapshot registri Modbus Sniffer %s:%s: ignorate %d voci non valide",
+                self._host,
+                self._port,
+                skipped,
+            )
+        _LOGGER.debug(
+            "Ripristinati %d registri Modbus Sniffer per %s:%s", restored, self._host, self._port
+        )
+
+    @callback
+    def _snapshot_data(self) -> dict:
+        self._save_pending = False
+        offset = time.time() - self._hass.loop.time()
+        return {
+            "units": {
+                str(unit.unit_id): [
+                    [register, value, round(updated_at + offset, 3)]
+                    for register, (value, updated_at) in unit.snapshot().items()
+                ]
+                for unit in self._values
+            }
+        }
+
+    @callback
+    def _schedule_save(self) -> None:
+        # async_delay_save riparte da zero a ogni chiamata: con traffico continuo
+        # non scriverebbe mai, quindi si pianifica un solo salvataggio alla volta.
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._snapshot_data, SNAPSHOT_SAVE_DELAY)
+
+    @property
+    def tcp_statistics(self) -> Dict[str, int]:
+        """Letture e byte ricevuti dallo stream TCP."""
+        source = self._sources.get(self._tcp_source_name)
+        return {
+            "reads": source.reads if source else 0,
+            "bytes": source.bytes if source else 0,
+        }
+
+    @property
+    def queue_statistics(self) -> Dict[str, int]:
+        """Stato della coda UDP: datagrammi in attesa, picco e scartati per overflow."""
+        worker = self._worker
+        return {
+            "queued": len(self._queue),
+            "peak": self._queue_peak,
+            "dropped": self._dropped_datagrams + (worker.dropped if worker else 0),
+            "decoder_pending": worker.pending if worker else 0,
+        }
+
+    @property
+    def source_statistics(self) -> Dict[str, Dict[str, int]]:
+        """Contatori per sorgente: letture, byte, frame, byte scartati e in attesa."""
+        return {name: source.statistics for name, source in self._sources.items()}
+
+    @property
+    def _tcp_source_name(self) -> str:
+        return f"tcp://{self._host}:{self._port}"
+
+    def _source(self, name: str, now: float) -> _Source:
+        source = self._sources.get(name)
+        if source is None:
+            if len(self._sources) >= MAX_SOURCES:
+                idle = min(self._sources.values(), key=lambda item: item.last_seen)
+                _LOGGER.debug("Sorgente Modbus Sniffer %s inattiva, rimossa", idle.name)
+                del self._sources[idle.name]
+                echoes, duplicates = self._retired_repeats
+                self._retired_repeats = (
+                    echoes + idle.dedup.echoes,
+                    duplicates + idle.dedup.duplicates,
+                )
+            bus = BusState()
+            silence = self._silence if name == self._tcp_source_name else None
+            source = _Source(
+                name,
+                bus,
+                FrameReassembler(bus=bus, silence=silence),
+                FrameDeduplicator(self._dedup_window),
+            )
+            self._sources[name] = source
+            _LOGGER.debug("Nuova sorgente Modbus Sniffer: %s", name)
+        source.last_seen = now
+        return source
+
+    @property
+    def update_statistics(self) -> Dict[str, int]:
+        """Aggiornamenti registro inoltrati, soppressi da change_only e fermati dalla banda morta."""
+        return {
+            "forwarded": self._forwarded_updates,
+            "suppressed": self._suppressed_updates,
+            "deadband_skipped": self._deadband_skipped,
+        }
+
+    @callback
+    def record_deadband_skip(self) -> None:
+        """Conta un nuovo valore che un sensore non scrive perché resta nella banda morta."""
+        self._deadband_skipped += 1
+
+    @callback
+    def async_subscribe_blocks(self, deliver: BlockCallback) -> Callable[[], None]:
+        """Registra ``deliver`` per i blocchi di registri e restituisce la funzione di disiscrizione.
+
+        ``deliver`` riceve una sola chiamata per frame con i registri
+        consecutivi appena memorizzati: il consumatore estrae quelli che gli
+        interessano con ``values[register - start]``.
+        """
+        self._block_subscribers.append(deliver)
+
+        @callback
+        def _unsubscribe() -> None:
+            if deliver in self._block_subscribers:
+                self._block_subscribers.remove(deliver)
+
+        return _unsubscribe
+
+    @callback
+    def async_subscribe_bits(
+        self,
+        unit_id: Optional[int],
+        register: int,
+        mask: int,
+        update_callback: BitCallback,
+    ) -> Callable[[], None]:
+        """Invoca ``update_callback`` solo quando ``value & mask`` passa da zero a non zero o viceversa.
+
+        Lo stato iniziale è quello del valore già in archivio, così la prima
+        lettura identica non genera notifiche.
+        """
+        sample = self.get_sample(unit_id, register)
+        watch = _BitWatch(
+            unit_id, mask, None if sample is None else bool(sample.value & mask), update_callback
+        )
+        if self._unsubscribe_bits is None:
+            self._unsubscribe_bits = self.async_subscribe_blocks(self._notify_bits)
+        self._bit_watches.add(register, watch)
+
+        @callback
+        def _unsubscribe() -> None:
+            if not self._bit_watches.remove(register, watch) or self._bit_watches:
+                return
+            if self._unsubscribe_bits is not None:
+                self._unsubscribe_bits()
+                self._unsubscribe_bits = None
+
+        return _unsubscribe
+
+    @callback
+    def async_schedule_delivery(self, deliver: Callable[[], None], when: float) -> None:
+        """Invoca ``deliver`` all'istante ``when`` (orologio del loop).
+
+        Tutte le consegne condividono un timer: ``deliver`` già pianificata
+        mantiene la scadenza originale.
+        """
+        if deliver in self._deliveries:
+            return
+        self._deliveries[deliver] = when
+        self._delivery_seq += 1
+        heapq.heappush(self._delivery_heap, (when, self._delivery_seq, deliver))
+        if self._delivery_heap[0][2] is deliver:
+            self._arm_delivery_timer()
+
+    @callback
+    def async_cancel_delivery(self, deliver: Callable[[], None]) -> None:
+        # L'elemento resta nello heap e viene scartato alla scadenza.
+        self._deliveries.pop(deliver, None)
+
+    def _arm_delivery_timer(self) -> None:
+        if self._delivery_timer is not None:
+            self._delivery_timer.cancel()
+            self._delivery_timer = None
+        if self._delivery_heap:
+            self._delivery_timer = asyncio.get_running_loop().call_at(
+                self._delivery_heap[0][0], self._run_deliveries
+            )
+
+    def _run_deliveries(self) -> None:
+        self._delivery_timer = None
+        now = asyncio.get_running_loop().time()
+        heap = self._delivery_heap
+        while heap and heap[0][0] <= now:
+            when, _, deliver = heapq.heappop(heap)
+            if self._deliveries.get(deliver) != when:
+                continue
+            del self._deliveries[deliver]
+            try:
+                deliver()
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Errore nella consegna differita di un sensore")
+        self._arm_delivery_timer()
 
     def handle_datagram(self, data: bytes, addr: Tuple[str, int]) -> None:
-        """Elabora un datagramma UDP proveniente dallo sniffer."""
-        self._process_bytes(data, source=f"udp://{addr[0]}:{addr[1]}")
+        """Accoda un datagramma UDP proveniente dallo sniffer."""
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        if len(queue) >= self._queue_size:
+            self._dropped_datagrams += 1
+            if self._overflow_policy == OVERFLOW_DROP_NEWEST:
+                return
+            queue.popleft()
+        queue.append((addr[0], data, loop.time()))
+        if len(queue) > self._queue_peak:
+            self._queue_peak = len(queue)
+        if self._drain_handle is None:
+            self._drain_handle = loop.call_soon(self._drain_queue)
+
+    def _drain_queue(self) -> None:
+        self._drain_handle = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._drain_budget
+        queue = self._queue
+        while queue:
+            host, data, arrival = queue.popleft()
+            self._process_bytes(data, self._source(f"udp://{host}", arrival), arrival)
+            if loop.time() >= deadline:
+                break
+        if queue:
+            # Budget esaurito: si riprende dopo gli altri callback in attesa nel loop.
+            self._drain_handle = loop.call_soon(self._drain_queue)
 
-    def _process_bytes(self, data: bytes, *, source: Optional[str] = None) -> None:
+    def handle_stream(self, data: memoryview) -> None:
+        """Elabora una lettura dallo stream TCP, ricevuta nel buffer del protocollo."""
+        now = asyncio.get_running_loop().time()
+        self._process_bytes(data, self._source(self._tcp_source_name, now), now)
+
+    def _process_bytes(self, data: FrameBuffer, source: _Source, now: float) -> None:
         if not data:
             return
-        payload = self._buffer + data
-        frames, leftover = split_modbus_frames(payload)
-        self._buffer = leftover
-        if leftover:
-            origin = source or f"{self._host}:{self._port}"
+        source.reads += 1
+        source.bytes += len(data)
+        if self._worker is not None:
+            # Il buffer TCP viene riutilizzato: al thread serve una copia.
+            self._worker.submit(source, bytes(data), now)
+            return
+        reassembler = source.reassembler
+        for frame in reassembler.feed(data, now):
+            source.frames += 1
+            block = self._decode_block(frame, source, now)
+            if block is not None:
+                self._store_block(*block)
+        pending = reassembler.pending
+        if pending:
             _LOGGER.debug(
                 "Frame incompleto da %s (%d byte mantenuti)",
-                origin,
-                len(leftover),
+                source.name,
+                pending,
             )
-        for frame in frames:
-            self._handle_frame(frame)
 
     async def _tcp_run(self) -> None:
         backoff = 1
+        loop = asyncio.get_running_loop()
         while not self._stop_requested:
             try:
                 _LOGGER.debug(
                     "Connessione TCP Modbus Sniffer verso %s:%s in corso", self._host, self._port
                 )
-                reader, writer = await asyncio.open_connection(self._host, self._port)
+                transport, protocol = await loop.create_connection(
+                    lambda: _TCPProtocol(self, self._tcp_buffer_size),
+                    self._host,
+                    self._port,
+                )
             except asyncio.CancelledError:
                 raise
             except OSError as exc:
@@ -187,7 +720,7 @@ class ModbusSnifferHub:
                 backoff = min(backoff * 2, 30)
                 continue
 
-            self._tcp_writer = writer
+            self._tcp_transport = transport
             backoff = 1
             _LOGGER.info(
                 "Connessione TCP Modbus Sniffer attiva verso %s:%s",
@@ -195,114 +728,334 @@ class ModbusSnifferHub:
                 self._port,
             )
             try:
-                while not self._stop_requested:
-                    data = await reader.read(1024)
-                    if not data:
-                        _LOGGER.warning(
-                            "Connessione TCP Modbus Sniffer chiusa dal server %s:%s",
-                            self._host,
-                            self._port,
-                        )
-                        break
-                    self._process_bytes(data, source=f"tcp://{self._host}:{self._port}")
-            except asyncio.CancelledError:
-                raise
-            except Exception as exc:  # pylint: disable=broad-except
+                exc = await protocol.closed
                 if self._stop_requested:
                     break
-                _LOGGER.exception(
-                    "Errore durante l'ascolto TCP Modbus Sniffer %s:%s: %s",
-                    self._host,
-                    self._port,
-                    exc,
-                )
+                if exc is None:
+                    _LOGGER.warning(
+                        "Connessione TCP Modbus Sniffer chiusa dal server %s:%s",
+                        self._host,
+                        self._port,
+                    )
+                else:
+                    _LOGGER.error(
+                        "Errore durante l'ascolto TCP Modbus Sniffer %s:%s: %s",
+                        self._host,
+                        self._port,
+                        exc,
+                    )
             finally:
-                if self._tcp_writer is writer:
-                    writer.close()
-                    try:
-                        await writer.wait_closed()
-                    except Exception:  # pylint: disable=broad-except
-                        pass
-                    self._tcp_writer = None
-                self._buffer = b""
+                if self._tcp_transport is transport:
+                    transport.close()
+                    self._tcp_transport = None
+                source = self._sources.get(self._tcp_source_name)
+                if source is not None:
+                    if self._worker is not None:
+                        self._worker.reset(source)
+                    else:
+                        source.reset()
             if self._stop_requested:
                 break
             await asyncio.sleep(backoff)
             backoff = min(backoff * 2, 30)
 
-    def _handle_frame(self, frame: bytes) -> None:
-        unit = frame[0]
-        func = frame[1]
-        fc = func & 0x7F
-        now_monotonic = asyncio.get_running_loop().time()
-
-        if fc == 3:
-            request = parse_fc03_request(frame)
-            if request:
-                _, start_addr, quantity = request
-                self._pending_reads[unit].append((start_addr, quantity, now_monotonic))
-                self._purge_old_requests(unit, now_monotonic)
-                return
-            response = parse_fc03_response(frame)
-            if response:
-                _, values = response
-                start_addr = self._pop_matching_request(unit, len(values), now_monotonic)
-                if start_addr is None:
-                    start_addr = 0
-                for offset, value in enumerate(values):
-                    register = start_addr + offset
-                    self._store_register(unit, register, value)
-                return
-        elif fc == 6:
-            parsed = parse_fc06(frame)
-            if parsed:
-                _, register, value = parsed
-                self._store_register(unit, register, value)
-                return
-        elif fc == 16:
-            write_multi = parse_fc16_request(frame)
-            if write_multi:
-                _, start_addr, values = write_multi
-                for offset, value in enumerate(values):
-                    register = start_addr + offset
-                    self._store_register(unit, register, value)
-                return
-        else:
-            # Altre funzioni non gestite ma potrebbe essere utile loggare in debug
-            _LOGGER.debug("Frame Modbus non gestito: func=0x%02X len=%d", func, len(frame))
-
-    def _purge_old_requests(self, unit: int, now: float) -> None:
-        queue = self._pending_reads[unit]
-        while queue and now - queue[0][2] > 5.0:
-            queue.popleft()
+    def _decode_block(self, frame: bytes, source: _Source, now: float) -> Optional[RegisterBlock]:
+        """Decodifica un frame e ne estrae il blocco di registri da memorizzare.
 
-    def _pop_matching_request(self, unit: int, values_len: int, now: float) -> Optional[int]:
-        queue = self._pending_reads[unit]
-        self._purge_old_requests(unit, now)
-        if not queue:
+        Non tocca l'archivio dei registri né i sensori: con ``decode_offload``
+        viene eseguito nel thread di decodifica.
+        """
+        decoded = decode_frame(frame)
+        # Il bus vede anche le ripetizioni: l'eco di una FC06 chiude la richiesta pendente.
+        request = source.bus.observe(frame, now, decoded)
+        repeated = source.dedup.check(frame, now, decoded=decoded, request=request)
+        if repeated is not None:
+            _LOGGER.debug(
+                "Frame ripetuto soppresso (%s): func=0x%02X len=%d", repeated, frame[1], len(frame)
+            )
+            return None
+        if decoded is None:
+            _LOGGER.debug("Frame Modbus non gestito: func=0x%02X len=%d", frame[1], len(frame))
+            return None
+        handler = self._frame_handlers.get((decoded.function, decoded.kind))
+        if handler is None:
             return None
-        start_addr, quantity, _ = queue.popleft()
-        if quantity and quantity < values_len:
-            return start_addr
-        return start_addr
+        return handler(decoded, request)
+
+    def _handle_holding_read(
+        self, decoded: DecodedFrame, request: Optional[PendingRequest]
+    ) -> Optional[RegisterBlock]:
+        start_addr = request.start_addr if request else 0
+        return decoded.unit_id, start_addr, decoded.values
+
+    def _handle_holding_write(
+        self, decoded: DecodedFrame, request: Optional[PendingRequest]
+    ) -> Optional[RegisterBlock]:
+        start_addr = decoded.address or 0
+        return decoded.unit_id, start_addr, decoded.values
+
+    def _store_blocks(self, blocks: List[RegisterBlock]) -> None:
+        """Applica un lotto di blocchi consegnato dal thread di decodifica."""
+        for unit_id, start, values in blocks:
+            self._store_block(unit_id, start, values)
 
-    def _store_register(self, unit_id: int, register: int, value: int) -> None:
-        key = (unit_id, register)
+    def _store_block(self, unit_id: int, start: int, values: Sequence[int]) -> None:
+        """Memorizza i registri consecutivi di un frame e li consegna in un solo blocco."""
+        if not values:
+            return
+        if start + len(values) > REGISTER_COUNT:
+            values = values[: REGISTER_COUNT - start]
         updated_at = asyncio.get_running_loop().time()
-        self._values[key] = RegisterValue(unit_id, register, value, updated_at)
+        unit = self._values.unit(unit_id)
+        latest_unit = self._values.latest_unit
+        forwarded: Optional[List[bool]] = [] if self._change_only else None
+        for register, value in zip(range(start, start + len(values)), values):
+            if forwarded is None:
+                unit.set(register, value, updated_at)
+            else:
+                forward = self._should_forward(unit, register, value, updated_at)
+                forwarded.append(forward)
+                unit.set(register, value, updated_at, forwarded=forward)
+            latest_unit[register] = unit_id
+        if forwarded is None:
+            self._forwarded_updates += len(values)
+        else:
+            count = sum(forwarded)
+            self._forwarded_updates += count
+            self._suppressed_updates += len(values) - count
         _LOGGER.debug(
-            "Aggiornamento registro unit=0x%02X reg=0x%04X val=%d",
+            "Aggiornamento registri unit=0x%02X reg=0x%04X-0x%04X",
             unit_id,
-            register,
-            value,
+            start,
+            start + len(values) - 1,
         )
-        async_dispatcher_send(self._hass, SIGNAL_REGISTER_UPDATE, unit_id, register, value)
+        for deliver in tuple(self._block_subscribers):
+            try:
+                deliver(unit_id, start, values, forwarded)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception(
+                    "Errore nella consegna del blocco unit=0x%02X reg=0x%04X",
+                    unit_id,
+                    start,
+                )
+        self._schedule_save()
+
+    def _should_forward(
+        self, unit: UnitRegisters, register: int, value: int, updated_at: float
+    ) -> bool:
+        """Filtro change_only: ``True`` se il valore cambia o l'heartbeat è scaduto."""
+        return (
+            unit.get(register) != value
+            or updated_at - unit.forwarded_at(register) >= self._heartbeat
+        )
+
+    def _notify_bits(
+        self,
+        unit_id: int,
+        start: int,
+        values: Sequence[int],
+        forwarded: Optional[Sequence[bool]],
+    ) -> None:
+        # I bit si confrontano con l'ultimo stato notificato: il filtro
+        # change_only non serve e non si applica.
+        for register, watches in self._bit_watches.span(start, len(values)):
+            value = values[register - start]
+            for watch in tuple(watches):
+                if watch.unit_id is not None and watch.unit_id != unit_id:
+                    continue
+                state = (value & watch.mask) != 0
+                if state is watch.state:
+                    continue
+                watch.state = state
+                try:
+                    watch.callback(state)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception(
+                        "Errore nella callback dei bit unit=0x%02X reg=0x%04X mask=0x%04X",
+                        unit_id,
+                        register,
+                        watch.mask,
+                    )
 
     def get_register(self, unit_id: Optional[int], register: int) -> Optional[int]:
+        sample = self.get_sample(unit_id, register)
+        return sample.value if sample else None
+
+    def get_sample(
+        self,
+        unit_id: Optional[int],
+        register: int,
+        layout: Optional[RegisterLayout] = None,
+    ) -> Optional[RegisterValue]:
+        """Ultimo valore del registro; con ``unit_id`` a ``None`` quello più recente fra le unit.
+
+        Con ``layout`` restituisce il valore decodificato, se tutti i registri
+        che lo compongono provengono dallo stesso frame.
+        """
         if unit_id is not None:
-            sample = self._values.get((unit_id, register))
-            return sample.value if sample else None
-        for (uid, reg), sample in reversed(list(self._values.items())):
-            if reg == register:
-                return sample.value
+            unit = self._values.lookup(unit_id)
+        else:
+            unit = self._values.latest(register)
+        if unit is None:
+            return None
+        raw = unit.get(register)
+        updated_at = unit.updated_at(register)
+        if raw is None or updated_at is None:
+            return None
+        restored = self._restored_until is not None and updated_at < self._restored_until
+        value: Union[int, float] = raw
+        if layout is not None:
+            end = register + layout.count
+            if end > REGISTER_COUNT or any(
+                unit.updated_at(other) != updated_at for other in range(register + 1, end)
+            ):
+                return None
+            # Stesso istante di aggiornamento: tutti i registri sono presenti.
+            value = layout.decode([unit.get(other) for other in range(register, end)], 0)
+        return RegisterValue(unit.unit_id, register, value, updated_at, restored)
+
+
+def _snapshot_unit_id(key: Any) -> Optional[int]:
+    """Unit id di una chiave dello snapshot (stringa decimale 0-255), altrimenti ``None``."""
+    try:
+        unit_id = int(key)
+    except (TypeError, ValueError):
         return None
+    return unit_id if 0 <= unit_id <= 0xFF else None
+
+
+def _is_uint16(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and 0 <= value <= 0xFFFF
+
+
+def _valid_snapshot_entry(entry: Any) -> bool:
+    """``[registro, valore, istante]`` con registro e valore a 16 bit e istante finito."""
+    if not isinstance(entry, list) or len(entry) != 3:
+        return False
+    register, value, timestamp = entry
+    return (
+        _is_uint16(register)
+        and _is_uint16(value)
+        and isinstance(timestamp, (int, float))
+        and not isinstance(timestamp, bool)
+        and math.isfinite(timestamp)
+    )
+
+
+def ensure_component_data(hass: HomeAssistant) -> Dict[str, Any]:
+    """Dati condivisi dalle piattaforme: hub, contatori delle entità e tabelle di trasformazione."""
+    data = hass.data.setdefault(DOMAIN, {})
+    data.setdefault(DATA_HUB, {})
+    data.setdefault(DATA_LISTENERS, {})
+    data.setdefault(DATA_TRANSFORMS, {})
+    return data
+
+
+def listener_config(data: Mapping[str, Any]) -> Tuple[str, str, int, Dict[str, Any]]:
+    """Estrae modalità, host, porta e opzioni del hub da YAML o dati della config entry."""
+    mode = data.get(CONF_CONNECTION_MODE, DEFAULT_CONNECTION_MODE)
+    if mode == MODE_TCP:
+        host = data.get(CONF_TCP_HOST, "").strip()
+        port = data.get(CONF_TCP_PORT, DEFAULT_TCP_PORT)
+    else:
+        host = data.get(CONF_SOURCE_HOST, DEFAULT_SOURCE_HOST).strip()
+        port = data.get(CONF_UDP_PORT, DEFAULT_UDP_PORT)
+    hub_options = {
+        "baudrate": int(data.get(CONF_BAUDRATE, DEFAULT_BAUDRATE)),
+        "change_only": bool(data.get(CONF_CHANGE_ONLY, DEFAULT_CHANGE_ONLY)),
+        "heartbeat": float(data.get(CONF_HEARTBEAT, DEFAULT_HEARTBEAT)),
+        "tcp_buffer_size": int(data.get(CONF_TCP_BUFFER_SIZE, DEFAULT_TCP_BUFFER_SIZE)),
+        "queue_size": int(data.get(CONF_QUEUE_SIZE, DEFAULT_QUEUE_SIZE)),
+        "overflow_policy": data.get(CONF_OVERFLOW_POLICY, DEFAULT_OVERFLOW_POLICY),
+        "drain_budget": float(data.get(CONF_DRAIN_BUDGET, DEFAULT_DRAIN_BUDGET)),
+        "decode_offload": bool(data.get(CONF_DECODE_OFFLOAD, DEFAULT_DECODE_OFFLOAD)),
+        "dedup_window": float(data.get(CONF_DEDUP_WINDOW, DEFAULT_DEDUP_WINDOW)),
+    }
+    return mode, host, int(port), hub_options
+
+
+async def async_acquire_hub(
+    hass: HomeAssistant,
+    component_data: Dict[str, Any],
+    mode: str,
+    host: str,
+    port: int,
+    hub_options: Mapping[str, Any],
+) -> Tuple[ModbusSnifferHub, Tuple[str, str, int]]:
+    """Restituisce il hub del listener, avviandolo alla prima piattaforma che lo usa."""
+    hubs: Dict[Tuple[str, str, int], ModbusSnifferHub] = component_data[DATA_HUB]
+    listeners: Dict[Tuple[str, str, int], int] = component_data[DATA_LISTENERS]
+    tables: Dict[Tuple[str, str, int], TransformTable] = component_data[DATA_TRANSFORMS]
+    hub_key = (mode, host, int(port))
+
+    hub = hubs.get(hub_key)
+    if hub is None:
+        hub = ModbusSnifferHub(hass, mode, host, int(port), **hub_options)
+        try:
+            await hub.async_start()
+        except OSError as exc:
+            raise PlatformNotReady(
+                f"Impossibile avviare Modbus Sniffer {mode.upper()} su {host}:{port}"
+            ) from exc
+        hubs[hub_key] = hub
+        listeners[hub_key] = 0
+        tables[hub_key] = TransformTable(hub.async_subscribe_blocks)
+        if mode == MODE_UDP:
+            _LOGGER.info("Listener UDP Modbus Sniffer attivo su %s:%s", host, port)
+        else:
+            _LOGGER.info("Listener TCP Modbus Sniffer verso %s:%s avviato", host, port)
+    return hub, hub_key
+
+
+async def async_release_hub(component_data: Dict[str, Any], hub_key: Tuple[str, str, int]) -> None:
+    """Rilascia un'entità del hub e lo ferma quando non ne restano altre."""
+    listeners: Dict[Tuple[str, str, int], int] = component_data.get(DATA_LISTENERS, {})
+    hubs: Dict[Tuple[str, str, int], ModbusSnifferHub] = component_data.get(DATA_HUB, {})
+    count = listeners.get(hub_key)
+    if count is None:
+        return
+    count -= 1
+    if count <= 0:
+        listeners.pop(hub_key, None)
+        component_data.get(DATA_TRANSFORMS, {}).pop(hub_key, None)
+        hub = hubs.pop(hub_key, None)
+        if hub:
+            await hub.async_stop()
+    else:
+        listeners[hub_key] = count
+
+
+def hub_device_info(
+    config: Mapping[str, Any],
+    hub_key: Tuple[str, str, int],
+    *,
+    instance_name: Optional[str],
+    device_type: Optional[str],
+    entry_id: Optional[str],
+) -> dict:
+    """Informazioni sul dispositivo delle entità di un hub, da ``device`` o dal listener."""
+    mode, host, port = hub_key
+    device_conf = config.get(CONF_DEVICE) or {}
+    identifiers = device_conf.get("identifiers")
+    if identifiers:
+        ident_set = set(identifiers)
+    else:
+        default_identifier = entry_id or f"{mode}:{host}:{port}"
+        ident_set = {(DOMAIN, default_identifier)}
+    device_info = {"identifiers": ident_set}
+    for key in ("manufacturer", "model", "name", "sw_version", "via_device"):
+        if key in device_conf:
+            device_info[key] = device_conf[key]
+    if "name" not in device_info and instance_name:
+        device_info["name"] = instance_name
+    if "model" not in device_info and device_type:
+        device_info["model"] = DEVICE_TYPE_LABELS.get(device_type, device_type)
+    return device_info
+
+
+def unique_id_prefix(hub_key: Tuple[str, str, int]) -> str:
+    """Prefisso degli unique_id delle entità di un hub."""
+    mode, host, port = hub_key
+    if mode == MODE_UDP:
+        return f"{DOMAIN}_{host}_{port}"
+    return f"{DOMAIN}_{mode}_{host}_{port}"
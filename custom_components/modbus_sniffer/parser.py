@@ -1,137 +1,604 @@
 """Utility per l'analisi dei frame Modbus provenienti dallo sniffer UDP."""
 from __future__ import annotations
 
-from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+import struct
+import sys
+import time
+from array import array
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+# Qualsiasi oggetto bytes-like: i parser non copiano il frame ricevuto.
+FrameBuffer = Union[bytes, bytearray, memoryview]
 
-def compute_crc(data: bytes) -> int:
-    """Calcola il CRC Modbus RTU del blocco dati."""
-    crc = 0xFFFF
-    for byte in data:
-        crc ^= byte
+_U16_PAIR = struct.Struct(">HH")
+_SWAP_REGISTERS = sys.byteorder == "little"
+
+
+def _build_crc_table() -> Tuple[int, ...]:
+    """Precalcola la tabella CRC-16/Modbus (polinomio riflesso 0xA001)."""
+    table: List[int] = []
+    for byte in range(256):
+        crc = byte
         for _ in range(8):
             if crc & 1:
                 crc = (crc >> 1) ^ 0xA001
             else:
                 crc >>= 1
-    return crc & 0xFFFF
-
-
-def _candidate_frame_lengths(function_code: Optional[int], max_len: int) -> List[int]:
-    """Restituisce le possibili lunghezze per un frame Modbus con CRC valido."""
-    lengths: set[int] = set()
-    if function_code is None:
-        return list(range(4, max_len + 1))
-
-    fc = function_code & 0x7F
-
-    if fc in (1, 2):
-        lengths.add(8)
-        for byte_count in range(1, min(252, max_len - 4)):
-            candidate = 5 + byte_count
-            if candidate <= max_len:
-                lengths.add(candidate)
-    elif fc in (3, 4):
-        lengths.add(8)
-        max_bc = min(2 * 125, max_len - 5)
-        for byte_count in range(2, max_bc + 1, 2):
-            candidate = 5 + byte_count
-            if candidate <= max_len:
-                lengths.add(candidate)
-    elif fc in (5, 6):
-        lengths.add(8)
-    elif fc == 15:
-        lengths.add(8)
-        max_bc = min(246, max_len - 9)
-        for byte_count in range(1, max_bc + 1):
-            candidate = 9 + byte_count
-            if candidate <= max_len:
-                lengths.add(candidate)
-    elif fc == 16:
-        lengths.add(8)
-        max_bc = min(2 * 123, max_len - 9)
-        for byte_count in range(2, max_bc + 1, 2):
-            candidate = 9 + byte_count
-            if candidate <= max_len:
-                lengths.add(candidate)
-    elif function_code & 0x80:
-        lengths.add(5)
-
-    if not lengths:
-        lengths.update(range(4, max_len + 1))
-
-    return sorted(length for length in lengths if 4 <= length <= max_len)
-
-
-def split_modbus_frames(data: bytes) -> Tuple[List[bytes], bytes]:
-    """Divide un pacchetto grezzo in frame Modbus validi e resto non riconosciuto."""
+        table.append(crc)
+    return tuple(table)
+
+
+CRC_TABLE: Tuple[int, ...] = _build_crc_table()
+
+
+class CrcState:
+    """Stato CRC Modbus riprendibile, estendibile un byte alla volta."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: int = 0xFFFF) -> None:
+        self.value = value
+
+    def update_byte(self, byte: int) -> int:
+        """Aggiunge un singolo byte e restituisce il CRC corrente."""
+        crc = self.value
+        crc = (crc >> 8) ^ CRC_TABLE[(crc ^ byte) & 0xFF]
+        self.value = crc
+        return crc
+
+    def update(self, data: Iterable[int]) -> int:
+        """Aggiunge un blocco di byte e restituisce il CRC corrente."""
+        crc = self.value
+        table = CRC_TABLE
+        for byte in data:
+            crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+        self.value = crc
+        return crc
+
+    def copy(self) -> "CrcState":
+        return CrcState(self.value)
+
+    def matches(self, low: int, high: int) -> bool:
+        """Verifica se il CRC corrente coincide con i due byte (little endian) dati."""
+        return self.value == (low | (high << 8))
+
+
+def compute_crc(data: bytes) -> int:
+    """Calcola il CRC Modbus RTU del blocco dati."""
+    crc = 0xFFFF
+    table = CRC_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+MIN_RTU_FRAME_LENGTH = 4
+MAX_RTU_FRAME_LENGTH = 256
+# Secondi oltre i quali il riassemblatore smette di attendere il resto di un frame.
+DEFAULT_MAX_WAIT = 1.0
+
+
+def rtu_silence(baudrate: int, chars: float = 3.5) -> float:
+    """Durata in secondi del silenzio di ``chars`` caratteri che separa due frame RTU.
+
+    Ogni carattere RTU occupa 11 bit; oltre 19200 baud la specifica fissa il
+    silenzio di 3,5 caratteri a 1,75 ms.
+    """
+    if baudrate > 19200:
+        return 0.00175 * chars / 3.5
+    return chars * 11 / baudrate
+
+
+# Posizione del campo byte count all'interno del frame, per funzione.
+_BYTE_COUNT_OFFSETS: Dict[int, int] = {1: 2, 2: 2, 3: 2, 4: 2, 15: 6, 16: 6}
+_FIXED_FRAME_LENGTHS: Dict[int, Tuple[int, ...]] = {5: (8,), 6: (8,)}
+_EXCEPTION_FRAME_LENGTHS: Tuple[int, ...] = (5,)
+# Lunghezza delle richieste di lettura e delle risposte alle scritture.
+_SHORT_FRAME_LENGTH = 8
+
+
+def _build_length_table() -> Dict[Tuple[int, int], Tuple[int, ...]]:
+    """Precalcola le lunghezze plausibili per (funzione, byte count dichiarato)."""
+    table: Dict[Tuple[int, int], Tuple[int, ...]] = {}
+    for func, offset in _BYTE_COUNT_OFFSETS.items():
+        header = offset + 1
+        for byte_count in range(256):
+            lengths = {8}
+            if func in (1, 2, 15):
+                valid = byte_count >= 1
+            else:
+                valid = byte_count >= 2 and byte_count % 2 == 0
+            if valid and header + byte_count + 2 <= MAX_RTU_FRAME_LENGTH:
+                lengths.add(header + byte_count + 2)
+            table[(func, byte_count)] = tuple(sorted(lengths))
+    return table
+
+
+_LENGTH_TABLE = _build_length_table()
+# Lunghezze da provare per funzioni sconosciute, indicizzate per byte disponibili.
+_SCAN_LENGTHS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(range(MIN_RTU_FRAME_LENGTH, available + 1))
+    for available in range(MAX_RTU_FRAME_LENGTH + 1)
+)
+
+
+def _frame_lengths(data: Sequence[int], idx: int, available: int) -> Optional[Tuple[int, ...]]:
+    """Deriva dall'header le lunghezze plausibili del frame che inizia in ``idx``.
+
+    Restituisce al più due lunghezze (richiesta/risposta), eventualmente superiori
+    ai byte disponibili, oppure None se il codice funzione non è noto.
+    """
+    func = data[idx + 1]
+    if func & 0x80:
+        return _EXCEPTION_FRAME_LENGTHS
+    fixed = _FIXED_FRAME_LENGTHS.get(func)
+    if fixed is not None:
+        return fixed
+    offset = _BYTE_COUNT_OFFSETS.get(func)
+    if offset is None:
+        return None
+    if offset >= available:
+        # Byte count non ancora ricevuto: l'unica forma verificabile è quella corta.
+        return _FIXED_FRAME_LENGTHS[6]
+    return _LENGTH_TABLE[(func, data[idx + offset])]
+
+
+def _match_each(data: Sequence[int], idx: int, lengths: Sequence[int], available: int) -> int:
+    """Verifica ogni lunghezza candidata ricalcolando il CRC da capo."""
+    with memoryview(data) as view:  # type: ignore[arg-type]
+        for length in lengths:
+            if length > available:
+                break
+            end = idx + length
+            if compute_crc(view[idx : end - 2]) == data[end - 2] | (data[end - 1] << 8):
+                return length
+    return 0
+
+
+def _match_rolling(
+    data: Sequence[int],
+    idx: int,
+    lengths: Sequence[int],
+    available: int,
+    *,
+    checked: int = 0,
+    state: Optional[CrcState] = None,
+    folded: int = 0,
+) -> Tuple[int, int]:
+    """Verifica le lunghezze candidate avanzando un solo CRC lungo la finestra.
+
+    Il CRC dei primi ``folded`` byte può essere ripreso da ``state``. Restituisce
+    la lunghezza del frame trovato (0 se nessuna) e i byte accumulati nel CRC.
+    """
+    crc = state.value if state is not None else 0xFFFF
+    table = CRC_TABLE
+    pos = idx + folded
+    for length in lengths:
+        if length > available:
+            break
+        if length <= checked:
+            continue
+        end = idx + length - 2
+        while pos < end:
+            crc = (crc >> 8) ^ table[(crc ^ data[pos]) & 0xFF]
+            pos += 1
+        if crc == data[end] | (data[end + 1] << 8):
+            return length, pos - idx
+    if state is not None:
+        state.value = crc
+    return 0, pos - idx
+
+
+def _match_predicted(
+    data: Sequence[int],
+    idx: int,
+    available: int,
+    bus: Optional[BusState],
+    checked: int = 0,
+) -> Tuple[int, bool]:
+    """Verifica con un solo CRC la lunghezza attesa dal ``BusState``, se presente.
+
+    Restituisce la lunghezza del frame trovato (0 se nessuna) e se la lunghezza
+    attesa era interamente disponibile, cioè se la previsione è stata verificata.
+    """
+    if bus is None:
+        return 0, False
+    length = bus.expected_length(data[idx], data[idx + 1])
+    if length is None or length > available:
+        return 0, False
+    if length <= checked:
+        return 0, True
+    end = idx + length - 2
+    crc = 0xFFFF
+    table = CRC_TABLE
+    for pos in range(idx, end):
+        crc = (crc >> 8) ^ table[(crc ^ data[pos]) & 0xFF]
+    if crc == data[end] | (data[end + 1] << 8):
+        return length, True
+    return 0, True
+
+
+def _find_complete_frame(data: Sequence[int], start: int, end: int, limit: int) -> Tuple[int, int]:
+    """Cerca da ``start`` il primo frame già completo, con lunghezza dall'header e CRC valido.
+
+    Restituisce ``(offset, lunghezza)``, oppure ``(-1, 0)`` se non ce ne sono. Le
+    funzioni sconosciute non vengono provate: richiederebbero tutte le lunghezze.
+    """
+    idx = start
+    while idx + MIN_RTU_FRAME_LENGTH <= end:
+        available = min(limit, end - idx)
+        lengths = _frame_lengths(data, idx, available)
+        if lengths is not None:
+            length, _ = _match_rolling(data, idx, lengths, available)
+            if length:
+                return idx, length
+        idx += 1
+    return -1, 0
+
+
+def split_modbus_frames(
+    data: bytes, *, rolling: bool = True, bus: Optional[BusState] = None
+) -> Tuple[List[bytes], bytes]:
+    """Divide un pacchetto grezzo in frame Modbus validi e resto non riconosciuto.
+
+    Con ``rolling`` attivo tutte le lunghezze candidate di un offset vengono
+    verificate con un unico CRC progressivo invece di un CRC completo ciascuna.
+    Se viene passato un ``bus``, ogni frame trovato aggiorna lo stato del bus e la
+    lunghezza della risposta attesa viene provata per prima.
+    """
     frames: List[bytes] = []
     idx = 0
     n = len(data)
-    while idx + 4 <= n:
-        func = data[idx + 1] if idx + 1 < n else None
-        max_len = min(256, n - idx)
-        candidates = _candidate_frame_lengths(func, max_len)
-        found = False
-        for length in candidates:
-            if idx + length > n:
-                continue
-            frame = data[idx : idx + length]
-            if len(frame) < 4:
-                continue
-            calc_crc = compute_crc(frame[:-2])
-            frame_crc = int.from_bytes(frame[-2:], "little")
-            if calc_crc == frame_crc:
-                frames.append(frame)
-                idx += length
-                found = True
-                break
-        if not found:
+    while idx + MIN_RTU_FRAME_LENGTH <= n:
+        available = min(MAX_RTU_FRAME_LENGTH, n - idx)
+        matched, _ = _match_predicted(data, idx, available, bus)
+        if not matched:
+            lengths = _frame_lengths(data, idx, available)
+            if lengths is None:
+                lengths = _SCAN_LENGTHS[available]
+            if rolling:
+                matched, _ = _match_rolling(data, idx, lengths, available)
+            else:
+                matched = _match_each(data, idx, lengths, available)
+        if matched:
+            frame = bytes(data[idx : idx + matched])
+            frames.append(frame)
+            if bus is not None:
+                bus.observe(frame)
+            idx += matched
+        else:
             idx += 1
-    leftover = data[idx:]
+    leftover = bytes(data[idx:])
     return frames, leftover
 
 
-def parse_fc03_request(frame: bytes) -> Optional[Tuple[int, int, int]]:
+class FrameReassembler:
+    """Ricostruisce i frame Modbus RTU da uno stream di byte, mantenendo i frame parziali.
+
+    Il buffer interno conserva solo la coda non ancora riconosciuta: un frame
+    spezzato fra due letture resta in attesa finché non arrivano i byte mancanti
+    (al massimo ``max_frame_length``), mentre i byte che non possono iniziare
+    un frame valido vengono scartati e conteggiati in ``discarded``.
+
+    Il ``bus`` opzionale viene solo consultato per provare per prima la lunghezza
+    della risposta attesa: aggiornarlo con ``BusState.observe`` spetta al chiamante.
+
+    Con ``silence`` (secondi, vedi ``rtu_silence``) il framing usa anche i tempi di
+    arrivo passati a ``feed``: una pausa più lunga chiude il segmento in attesa,
+    che non viene mai unito ai byte successivi, e il CRC serve solo a confermare
+    il frame. Le funzioni di lunghezza non deducibile dall'header attendono la
+    pausa invece di provare tutte le lunghezze possibili.
+
+    L'attesa di un frame incompleto non trattiene quelli successivi: se dopo
+    l'header in attesa c'è già un frame completo con CRC valido, l'header era
+    rumore e lo stream si risincronizza su quel frame. L'attesa dura comunque al
+    più ``max_wait`` secondi fra gli istanti passati a ``feed``.
+    """
+
+    def __init__(
+        self,
+        max_frame_length: int = MAX_RTU_FRAME_LENGTH,
+        *,
+        bus: Optional[BusState] = None,
+        silence: Optional[float] = None,
+        max_wait: Optional[float] = DEFAULT_MAX_WAIT,
+    ) -> None:
+        self._max_frame_length = max_frame_length
+        self._max_wait = max_wait
+        # Istante in cui è iniziata l'attesa del frame incompleto in ``_pos``.
+        self._waiting_since: Optional[float] = None
+        self._now = 0.0
+        self._bus = bus
+        self._silence = silence
+        self._last_arrival: Optional[float] = None
+        self._buffer = bytearray()
+        self._pos = 0
+        self._checked = 0
+        self._crc = CrcState()
+        self._folded = 0
+        self.discarded = 0
+        self.boundaries = 0
+
+    @property
+    def pending(self) -> int:
+        """Numero di byte in attesa di completare un frame."""
+        return len(self._buffer) - self._pos
+
+    def feed(self, data: bytes, now: Optional[float] = None) -> Iterator[bytes]:
+        """Accoda i byte ricevuti e restituisce un generatore dei frame completi.
+
+        ``now`` è l'istante monotono di arrivo della lettura, usato dal framing a
+        tempo e dal limite di attesa (se omesso vale ``time.monotonic()``).
+        """
+        if now is None:
+            now = time.monotonic()
+        self._now = now
+        closed: List[bytes] = []
+        if self._silence is not None:
+            last = self._last_arrival
+            self._last_arrival = now
+            if last is not None and now - last > self._silence and self.pending:
+                closed = self._close_segment()
+        waiting_since = self._waiting_since
+        if (
+            waiting_since is not None
+            and self._max_wait is not None
+            and now - waiting_since > self._max_wait
+        ):
+            # Il resto del frame non è arrivato in tempo: come dopo una pausa sul
+            # bus, ciò che è in attesa viene chiuso senza aspettare altri byte.
+            closed.extend(self._flush())
+        self._compact()
+        self._buffer += data
+        if closed:
+            return chain(closed, self._drain())
+        return self._drain()
+
+    def reset(self) -> bytes:
+        """Svuota il buffer e restituisce i byte che erano in attesa."""
+        leftover = bytes(self._buffer[self._pos :])
+        self._buffer.clear()
+        self._pos = 0
+        self._last_arrival = None
+        self._restart_scan()
+        return leftover
+
+    def _close_segment(self) -> List[bytes]:
+        """Chiude il segmento in attesa: quello che non forma un frame viene scartato."""
+        self.boundaries += 1
+        return self._flush()
+
+    def _flush(self) -> List[bytes]:
+        """Estrae i frame completi in attesa e scarta il resto del buffer."""
+        frames: List[bytes] = []
+        while True:
+            frame = self._next_frame(final=True)
+            if frame is None:
+                break
+            frames.append(frame)
+        self._compact()
+        return frames
+
+    def _restart_scan(self) -> None:
+        self._checked = 0
+        self._crc.value = 0xFFFF
+        self._folded = 0
+        self._waiting_since = None
+
+    def _compact(self) -> None:
+        if self._pos:
+            del self._buffer[: self._pos]
+            self._pos = 0
+
+    def _drain(self) -> Iterator[bytes]:
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                break
+            yield frame
+        self._compact()
+
+    def _next_frame(self, final: bool = False) -> Optional[bytes]:
+        buf = self._buffer
+        n = len(buf)
+        idx = self._pos
+        limit = self._max_frame_length
+        timed = self._silence is not None
+        while idx + MIN_RTU_FRAME_LENGTH <= n:
+            available = min(limit, n - idx)
+            length, predicted = _match_predicted(buf, idx, available, self._bus, self._checked)
+            if length:
+                self._pos = idx + length
+                self._restart_scan()
+                return bytes(buf[idx : idx + length])
+            lengths = _frame_lengths(buf, idx, available)
+            if lengths is None and timed:
+                # La fine del frame la stabilisce la pausa sul bus.
+                if not final:
+                    self._pos = idx
+                    return None
+                if n - idx <= limit:
+                    frame = bytes(buf[idx:n])
+                    if _crc_ok(frame):
+                        self._pos = n
+                        self._restart_scan()
+                        return frame
+                idx += 1
+                self._restart_scan()
+                self.discarded += 1
+                continue
+            if lengths is None:
+                lengths = _SCAN_LENGTHS[available]
+                incomplete = False
+            else:
+                # Se la risposta attesa dal bus non torna, il byte count dell'header
+                # non è affidabile: si attende solo la forma corta di una richiesta.
+                wait_limit = _SHORT_FRAME_LENGTH if predicted else limit
+                incomplete = not final and any(
+                    available < length <= wait_limit for length in lengths
+                )
+            length, self._folded = _match_rolling(
+                buf,
+                idx,
+                lengths,
+                available,
+                checked=self._checked,
+                state=self._crc,
+                folded=self._folded,
+            )
+            if length:
+                self._pos = idx + length
+                self._restart_scan()
+                return bytes(buf[idx : idx + length])
+            if incomplete:
+                # Su un bus seriale i byte dopo un frame incompleto gli appartengono:
+                # un frame già completo più avanti vuol dire che l'header era rumore.
+                resync, length = _find_complete_frame(buf, idx + 1, n, limit)
+                if length:
+                    self.discarded += resync - idx
+                    self._pos = resync + length
+                    self._restart_scan()
+                    return bytes(buf[resync : resync + length])
+                # Il frame potrebbe essere ancora incompleto: si riprende da qui,
+                # conservando il CRC già accumulato.
+                self._pos = idx
+                self._checked = available
+                if self._waiting_since is None:
+                    self._waiting_since = self._now
+                return None
+            idx += 1
+            self._restart_scan()
+            self.discarded += 1
+        if final and idx < n:
+            self.discarded += n - idx
+            idx = n
+            self._restart_scan()
+        self._pos = idx
+        return None
+
+
+def decode_registers(frame: FrameBuffer, start: int, end: int) -> "array[int]":
+    """Decodifica in blocco i registri big endian compresi fra ``start`` ed ``end``.
+
+    I byte vengono copiati una sola volta nell'array risultante, senza oggetti
+    intermedi per ciascun registro; un eventuale byte dispari finale è ignorato.
+    """
+    end -= (end - start) & 1
+    values = array("H")
+    if end > start:
+        with memoryview(frame) as view:
+            values.frombytes(view[start:end])
+        if _SWAP_REGISTERS:
+            values.byteswap()
+    return values
+
+
+# Formato ``struct`` e numero di registri per ciascun tipo di dato.
+_LAYOUT_FORMATS: Dict[str, Tuple[str, int]] = {
+    "uint16": ("H", 1),
+    "int16": ("h", 1),
+    "uint32": ("I", 2),
+    "int32": ("i", 2),
+    "float32": ("f", 2),
+}
+LAYOUT_DATA_TYPES = tuple(_LAYOUT_FORMATS)
+ORDER_BIG = "big"
+ORDER_LITTLE = "little"
+
+
+class RegisterLayout:
+    """Decodifica precompilata di un valore distribuito su registri consecutivi.
+
+    I registri (già interi a 16 bit) vengono reimpaccati con l'ordine dei byte
+    richiesto e letti con il formato del tipo: due ``struct.Struct`` compilati
+    una sola volta per layout.
+    """
+
+    __slots__ = ("data_type", "word_order", "byte_order", "count", "_words", "_value", "_swap_words")
+
+    def __init__(self, data_type: str, word_order: str = ORDER_BIG, byte_order: str = ORDER_BIG) -> None:
+        fmt, count = _LAYOUT_FORMATS[data_type]
+        self.data_type = data_type
+        self.word_order = word_order
+        self.byte_order = byte_order
+        self.count = count
+        self._words = struct.Struct(("<" if byte_order == ORDER_LITTLE else ">") + "H" * count)
+        self._value = struct.Struct(">" + fmt)
+        self._swap_words = count > 1 and word_order == ORDER_LITTLE
+
+    def __repr__(self) -> str:
+        return f"RegisterLayout({self.data_type!r}, {self.word_order!r}, {self.byte_order!r})"
+
+    def decode(self, values: Sequence[int], offset: int = 0) -> Union[int, float]:
+        """Decodifica il valore che inizia a ``values[offset]``."""
+        words = values[offset : offset + self.count]
+        if self._swap_words:
+            words = words[::-1]
+        return self._value.unpack(self._words.pack(*words))[0]
+
+
+_LAYOUTS: Dict[Tuple[str, str, str], RegisterLayout] = {}
+
+
+def register_layout(
+    data_type: str, word_order: str = ORDER_BIG, byte_order: str = ORDER_BIG
+) -> RegisterLayout:
+    """Layout condiviso per la combinazione richiesta: la stessa istanza per tutti i sensori."""
+    if _LAYOUT_FORMATS[data_type][1] == 1:
+        word_order = ORDER_BIG
+    key = (data_type, word_order, byte_order)
+    layout = _LAYOUTS.get(key)
+    if layout is None:
+        layout = _LAYOUTS[key] = RegisterLayout(data_type, word_order, byte_order)
+    return layout
+
+
+def parse_fc03_request(frame: FrameBuffer) -> Optional[Tuple[int, int, int]]:
     """Estrae (unit_id, start_addr, quantity) da una richiesta FC03."""
-    if len(frame) < 8:
+    if len(frame) != 8:
         return None
     unit = frame[0]
     func = frame[1]
     if func & 0x7F != 3 or func & 0x80:
         return None
-    payload = frame[2:-2]
-    if len(payload) != 4:
-        return None
-    start_addr = int.from_bytes(payload[0:2], "big")
-    quantity = int.from_bytes(payload[2:4], "big")
+    start_addr, quantity = _U16_PAIR.unpack_from(frame, 2)
     return unit, start_addr, quantity
 
 
-def parse_fc03_response(frame: bytes) -> Optional[Tuple[int, Sequence[int]]]:
-    """Estrae (unit_id, lista valori) da una risposta FC03."""
-    if len(frame) < 5:
+def parse_fc03_response(frame: FrameBuffer) -> Optional[Tuple[int, Sequence[int]]]:
+    """Estrae (unit_id, valori) da una risposta FC03."""
+    length = len(frame)
+    if length < 5:
         return None
     unit = frame[0]
     func = frame[1]
     if func & 0x7F != 3 or func & 0x80:
         return None
-    payload = frame[2:-2]
-    if not payload:
-        return None
-    byte_count = payload[0]
-    data_bytes = payload[1 : 1 + byte_count]
-    values: List[int] = []
-    for idx in range(0, len(data_bytes), 2):
-        chunk = data_bytes[idx : idx + 2]
-        if len(chunk) == 2:
-            values.append(int.from_bytes(chunk, "big"))
+    byte_count = frame[2]
+    values = decode_registers(frame, 3, min(3 + byte_count, length - 2))
     if not values:
         return None
     return unit, values
 
 
-def parse_fc06(frame: bytes) -> Optional[Tuple[int, int, int]]:
+def parse_fc06(frame: FrameBuffer) -> Optional[Tuple[int, int, int]]:
     """Estrae (unit_id, register, value) da un frame FC06 valido."""
     if len(frame) < 8:
         return None
@@ -139,43 +606,568 @@ def parse_fc06(frame: bytes) -> Optional[Tuple[int, int, int]]:
     func = frame[1]
     if func & 0x7F != 6:
         return None
-    payload = frame[2:-2]
-    if len(payload) < 4:
-        return None
-    register = int.from_bytes(payload[0:2], "big")
-    value = int.from_bytes(payload[2:4], "big")
+    register, value = _U16_PAIR.unpack_from(frame, 2)
     return unit, register, value
 
 
-def parse_fc16_request(frame: bytes) -> Optional[Tuple[int, int, Sequence[int]]]:
+def parse_fc16_request(frame: FrameBuffer) -> Optional[Tuple[int, int, Sequence[int]]]:
     """Estrae (unit_id, start_addr, valori) da una richiesta FC16."""
-    if len(frame) < 9:
+    length = len(frame)
+    if length < 9:
         return None
     unit = frame[0]
     func = frame[1]
     if func & 0x7F != 16 or func & 0x80:
         return None
-    payload = frame[2:-2]
-    if len(payload) < 5:
-        return None
-    start_addr = int.from_bytes(payload[0:2], "big")
-    quantity = int.from_bytes(payload[2:4], "big")
-    byte_count = payload[4]
-    data_bytes = payload[5 : 5 + byte_count]
-    values: List[int] = []
-    for idx in range(0, len(data_bytes), 2):
-        chunk = data_bytes[idx : idx + 2]
-        if len(chunk) == 2:
-            values.append(int.from_bytes(chunk, "big"))
+    start_addr, quantity = _U16_PAIR.unpack_from(frame, 2)
+    byte_count = frame[6]
+    values = decode_registers(frame, 7, min(7 + byte_count, length - 2))
     if not values:
         return None
     if 0 < quantity < len(values):
-        values = values[:quantity]
+        del values[quantity:]
     return unit, start_addr, values
 
 
+FRAME_READ_REQUEST = "read_request"
+FRAME_READ_RESPONSE = "read_response"
+FRAME_WRITE_SINGLE = "write_single"
+FRAME_WRITE_REQUEST = "write_request"
+FRAME_WRITE_RESPONSE = "write_response"
+FRAME_READ_WRITE_REQUEST = "read_write_request"
+FRAME_EXCEPTION = "exception"
+
+
+@dataclass
+class DecodedFrame:
+    """Frame Modbus decodificato tramite il registro ``DECODERS``."""
+
+    unit_id: int
+    function: int
+    kind: str
+    address: Optional[int] = None
+    quantity: Optional[int] = None
+    values: Sequence[int] = ()
+    write_address: Optional[int] = None
+    exception_code: Optional[int] = None
+
+
+FrameDecoder = Callable[[FrameBuffer], Optional[DecodedFrame]]
+
+_HEADER = struct.Struct(">BBB")
+_ADDRESS_PAIR = struct.Struct(">BBHH")
+_WRITE_MULTIPLE = struct.Struct(">BBHHB")
+_READ_WRITE = struct.Struct(">BBHHHHB")
+
+
+def decode_bits(frame: FrameBuffer, start: int, end: int, quantity: Optional[int] = None) -> List[int]:
+    """Espande i bit (LSB first) dei byte compresi fra ``start`` ed ``end``."""
+    bits: List[int] = []
+    for pos in range(start, end):
+        byte = frame[pos]
+        for bit_idx in range(8):
+            bits.append((byte >> bit_idx) & 0x01)
+    if quantity is not None and 0 < quantity < len(bits):
+        del bits[quantity:]
+    return bits
+
+
+def _decode_bit_request(frame: FrameBuffer) -> DecodedFrame:
+    unit, func, address, quantity = _ADDRESS_PAIR.unpack_from(frame)
+    return DecodedFrame(unit, func, FRAME_READ_REQUEST, address, quantity)
+
+
+def _decode_bit_read(frame: FrameBuffer) -> Optional[DecodedFrame]:
+    length = len(frame)
+    unit, func, byte_count = _HEADER.unpack_from(frame)
+    # Una risposta di 8 byte (byte count 3) ha la stessa lunghezza di una
+    # richiesta: decide il byte count, poi ``BusState.observe`` se nessuna
+    # richiesta attende la risposta.
+    if length == 5 + byte_count:
+        return DecodedFrame(unit, func, FRAME_READ_RESPONSE, values=decode_bits(frame, 3, length - 2))
+    if length == _SHORT_FRAME_LENGTH:
+        return _decode_bit_request(frame)
+    return None
+
+
+def _decode_register_read(frame: FrameBuffer) -> Optional[DecodedFrame]:
+    length = len(frame)
+    if length == 8:
+        unit, func, address, quantity = _ADDRESS_PAIR.unpack_from(frame)
+        return DecodedFrame(unit, func, FRAME_READ_REQUEST, address, quantity)
+    unit, func, byte_count = _HEADER.unpack_from(frame)
+    values = decode_registers(frame, 3, min(3 + byte_count, length - 2))
+    if not values:
+        return None
+    return DecodedFrame(unit, func, FRAME_READ_RESPONSE, values=values)
+
+
+def _decode_write_single(frame: FrameBuffer) -> Optional[DecodedFrame]:
+    if len(frame) != 8:
+        return None
+    unit, func, address, value = _ADDRESS_PAIR.unpack_from(frame)
+    return DecodedFrame(unit, func, FRAME_WRITE_SINGLE, address, 1, (value,))
+
+
+def _decode_write_multiple(frame: FrameBuffer) -> Optional[DecodedFrame]:
+    length = len(frame)
+    if length == 8:
+        unit, func, address, quantity = _ADDRESS_PAIR.unpack_from(frame)
+        return DecodedFrame(unit, func, FRAME_WRITE_RESPONSE, address, quantity)
+    if length < 9:
+        return None
+    unit, func, address, quantity, byte_count = _WRITE_MULTIPLE.unpack_from(frame)
+    end = min(7 + byte_count, length - 2)
+    values: Sequence[int]
+    if func == 15:
+        values = decode_bits(frame, 7, end, quantity)
+    else:
+        values = decode_registers(frame, 7, end)
+        if 0 < quantity < len(values):
+            del values[quantity:]
+    if not values:
+        return None
+    return DecodedFrame(unit, func, FRAME_WRITE_REQUEST, address, quantity, values)
+
+
+def _decode_read_write(frame: FrameBuffer) -> Optional[DecodedFrame]:
+    length = len(frame)
+    unit, func, byte_count = _HEADER.unpack_from(frame)
+    if length == 5 + byte_count:
+        values = decode_registers(frame, 3, length - 2)
+        return DecodedFrame(unit, func, FRAME_READ_RESPONSE, values=values)
+    if length < 13:
+        return None
+    (
+        unit,
+        func,
+        read_address,
+        read_quantity,
+        write_address,
+        write_quantity,
+        byte_count,
+    ) = _READ_WRITE.unpack_from(frame)
+    values = decode_registers(frame, 11, min(11 + byte_count, length - 2))
+    if 0 < write_quantity < len(values):
+        del values[write_quantity:]
+    return DecodedFrame(
+        unit,
+        func,
+        FRAME_READ_WRITE_REQUEST,
+        read_address,
+        read_quantity,
+        values,
+        write_address=write_address,
+    )
+
+
+def _decode_exception(frame: FrameBuffer) -> Optional[DecodedFrame]:
+    if len(frame) != 5:
+        return None
+    unit, func, code = _HEADER.unpack_from(frame)
+    return DecodedFrame(unit, func & 0x7F, FRAME_EXCEPTION, exception_code=code)
+
+
+DECODERS: Dict[int, FrameDecoder] = {}
+
+
+def register_decoder(function: int, decoder: FrameDecoder) -> None:
+    """Registra il decoder di una funzione e, se assente, quello della sua eccezione."""
+    DECODERS[function] = decoder
+    DECODERS.setdefault(function | 0x80, _decode_exception)
+
+
+for _function, _decoder in (
+    (1, _decode_bit_read),
+    (2, _decode_bit_read),
+    (3, _decode_register_read),
+    (4, _decode_register_read),
+    (5, _decode_write_single),
+    (6, _decode_write_single),
+    (15, _decode_write_multiple),
+    (16, _decode_write_multiple),
+    (23, _decode_read_write),
+):
+    register_decoder(_function, _decoder)
+
+
+def decode_frame(frame: FrameBuffer) -> Optional[DecodedFrame]:
+    """Decodifica un frame (CRC già verificato) con una sola ricerca nel registro."""
+    if len(frame) < MIN_RTU_FRAME_LENGTH:
+        return None
+    decoder = DECODERS.get(frame[1])
+    if decoder is None:
+        return None
+    return decoder(frame)
+
+
+@dataclass
+class PendingRequest:
+    """Richiesta del master in attesa della risposta dello slave."""
+
+    unit_id: int
+    function: int
+    start_addr: int
+    quantity: int
+    response_length: int
+    created_at: float
+
+
+def _response_length(decoded: DecodedFrame) -> Optional[int]:
+    """Lunghezza della risposta attesa per una richiesta decodificata."""
+    kind = decoded.kind
+    quantity = decoded.quantity or 0
+    if kind == FRAME_READ_REQUEST:
+        if decoded.function in (1, 2):
+            return 5 + (quantity + 7) // 8
+        return 5 + 2 * quantity
+    if kind == FRAME_READ_WRITE_REQUEST:
+        return 5 + 2 * quantity
+    if kind in (FRAME_WRITE_SINGLE, FRAME_WRITE_REQUEST):
+        return 8
+    return None
+
+
+class BusState:
+    """Stato del bus RTU: abbina le risposte degli slave alle richieste del master.
+
+    Per ogni unit id viene mantenuta la coda delle richieste in attesa, da cui
+    si ricava la lunghezza esatta della prossima risposta.
+    """
+
+    def __init__(self, timeout: float = 5.0, max_pending: int = 16) -> None:
+        self._timeout = timeout
+        self._max_pending = max_pending
+        self._pending: Dict[int, Deque[PendingRequest]] = defaultdict(deque)
+
+    def reset(self) -> None:
+        self._pending.clear()
+
+    def expected_length(self, unit_id: int, function: int) -> Optional[int]:
+        """Lunghezza della risposta attesa da ``unit_id`` per la funzione indicata."""
+        queue = self._pending.get(unit_id)
+        if not queue:
+            return None
+        if function & 0x80:
+            return 5
+        for request in queue:
+            if request.function == function:
+                return request.response_length
+        return None
+
+    def observe(
+        self,
+        frame: bytes,
+        now: Optional[float] = None,
+        decoded: Optional[DecodedFrame] = None,
+    ) -> Optional[PendingRequest]:
+        """Aggiorna lo stato con un frame valido.
+
+        Le richieste vengono accodate; per una risposta (o un'eccezione) viene
+        restituita la richiesta abbinata, rimuovendola dalla coda. Se il frame è
+        già stato decodificato con ``decode_frame`` lo si può passare in ``decoded``.
+        """
+        if now is None:
+            now = time.monotonic()
+        unit = frame[0]
+        func = frame[1]
+        self._purge(unit, now)
+        matched = self._pop_response(unit, func, len(frame))
+        if matched is not None:
+            return matched
+        if func & 0x80:
+            return None
+        if decoded is None:
+            decoded = decode_frame(frame)
+            if decoded is None:
+                return None
+        if (
+            decoded.kind == FRAME_READ_RESPONSE
+            and decoded.function in (1, 2)
+            and len(frame) == _SHORT_FRAME_LENGTH
+        ):
+            # Nessuna richiesta attende una risposta di 8 byte: è una richiesta il
+            # cui indirizzo inizia con 0x03, scambiata per il byte count.
+            decoded = _decode_bit_request(frame)
+        response_length = _response_length(decoded)
+        if response_length is None or response_length > MAX_RTU_FRAME_LENGTH:
+            return None
+        queue = self._pending[unit]
+        if len(queue) >= self._max_pending:
+            queue.popleft()
+        queue.append(
+            PendingRequest(
+                unit,
+                func,
+                decoded.address or 0,
+                decoded.quantity or 0,
+                response_length,
+                now,
+            )
+        )
+        return None
+
+    def _pop_response(self, unit: int, func: int, length: int) -> Optional[PendingRequest]:
+        queue = self._pending.get(unit)
+        if not queue:
+            return None
+        function = func & 0x7F
+        for position, request in enumerate(queue):
+            if request.function != function:
+                continue
+            if not func & 0x80 and request.response_length != length:
+                continue
+            # Le richieste precedenti sono rimaste senza risposta.
+            for _ in range(position + 1):
+                queue.popleft()
+            return request
+        return None
+
+    def _purge(self, unit: int, now: float) -> None:
+        queue = self._pending.get(unit)
+        while queue and now - queue[0].created_at > self._timeout:
+            queue.popleft()
+
+
+DEFAULT_DEDUP_WINDOW = 0.5
+
+DEDUP_ECHO = "echo"
+DEDUP_DUPLICATE = "duplicate"
+
+# Funzioni per cui lo slave risponde ripetendo la richiesta byte per byte.
+_ECHO_FUNCTIONS = frozenset((5, 6))
+
+
+class FrameDeduplicator:
+    """Riconosce i frame identici ripetuti entro una finestra temporale.
+
+    La prima copia di un frame è un evento nuovo; una copia identica di una
+    scrittura singola (FC05/FC06) vista subito dopo è l'eco dello slave, ogni
+    altra ripetizione nella finestra è un duplicato. I conteggi delle copie
+    soppresse sono disponibili in ``echoes`` e ``duplicates``.
+
+    Le risposte di lettura non contengono l'indirizzo: la stessa risposta a due
+    richieste diverse riguarda registri diversi. Vengono quindi confrontate
+    insieme alla richiesta abbinata dal ``BusState`` (indirizzo e quantità) o,
+    se manca, al frame che le precede.
+    """
+
+    def __init__(self, window: float = DEFAULT_DEDUP_WINDOW, max_entries: int = 256) -> None:
+        self._window = window
+        self._max_entries = max_entries
+        self._seen: Dict[Hashable, Tuple[float, int]] = {}
+        self._previous = b""
+        self.echoes = 0
+        self.duplicates = 0
+
+    @property
+    def suppressed(self) -> int:
+        """Numero totale di frame soppressi."""
+        return self.echoes + self.duplicates
+
+    def reset(self) -> None:
+        self._seen.clear()
+        self._previous = b""
+
+    def check(
+        self,
+        frame: FrameBuffer,
+        now: Optional[float] = None,
+        *,
+        decoded: Optional[DecodedFrame] = None,
+        request: Optional[PendingRequest] = None,
+    ) -> Optional[str]:
+        """Restituisce ``None`` per un frame nuovo, altrimenti il tipo di ripetizione.
+
+        ``decoded`` evita di decodificare di nuovo il frame; ``request`` è la
+        richiesta restituita da ``BusState.observe`` per le risposte.
+        """
+        if self._window <= 0:
+            return None
+        if now is None:
+            now = time.monotonic()
+        self._purge(now)
+        data = bytes(frame)
+        preceding = self._previous
+        self._previous = data
+        if decoded is None:
+            decoded = decode_frame(data)
+        key: Hashable = data
+        if decoded is not None and decoded.kind == FRAME_READ_RESPONSE:
+            if request is not None:
+                key = (request.start_addr, request.quantity, data)
+            else:
+                key = (preceding, data)
+        previous = self._seen.pop(key, None)
+        if previous is None:
+            if len(self._seen) >= self._max_entries:
+                del self._seen[next(iter(self._seen))]
+            self._seen[key] = (now, 1)
+            return None
+        copies = previous[1] + 1
+        # Reinserito in coda: il dizionario resta ordinato per ultimo avvistamento.
+        self._seen[key] = (now, copies)
+        if copies == 2 and data[1] in _ECHO_FUNCTIONS:
+            self.echoes += 1
+            return DEDUP_ECHO
+        self.duplicates += 1
+        return DEDUP_DUPLICATE
+
+    def _purge(self, now: float) -> None:
+        seen = self._seen
+        while seen:
+            key = next(iter(seen))
+            if now - seen[key][0] <= self._window:
+                break
+            del seen[key]
+
+
+def _crc_ok(frame: FrameBuffer) -> bool:
+    length = len(frame)
+    if length < MIN_RTU_FRAME_LENGTH:
+        return False
+    with memoryview(frame) as view:
+        return compute_crc(view[:-2]) == frame[length - 2] | (frame[length - 1] << 8)
+
+
 def iter_frames(frames: Iterable[bytes]) -> Iterator[bytes]:
     """Iteratore che filtra i frame Modbus RTU validi."""
     for frame in frames:
-        if len(frame) >= 4 and compute_crc(frame[:-2]) == int.from_bytes(frame[-2:], "little"):
+        if _crc_ok(frame):
             yield frame
+
+
+@lru_cache(maxsize=None)
+def _numpy_backend() -> Optional[Tuple[Any, Any]]:
+    """NumPy e la sua tabella CRC, importati al primo uso; ``None`` se NumPy manca.
+
+    NumPy è opzionale e serve solo alle verifiche in blocco: l'integrazione non
+    lo importa mai.
+    """
+    try:
+        import numpy as np  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return np, np.array(CRC_TABLE, dtype=np.uint16)
+
+
+def _batch_crc_ok(np: Any, table: Any, data: Any, starts: Any, lengths: Any) -> Any:
+    """Verifica i CRC dei frame ``data[start : start + length]`` avanzando per colonne.
+
+    I candidati sono ordinati per lunghezza decrescente, così a ogni colonna
+    quelli ancora da estendere sono un prefisso dell'array.
+    """
+    order = np.argsort(-lengths, kind="stable")
+    starts = starts[order]
+    bodies = lengths[order] - 2
+    crc = np.full(len(starts), 0xFFFF, dtype=np.uint16)
+    # Per ogni colonna, i candidati con più di ``column`` byte da includere nel CRC.
+    columns = np.arange(int(bodies[0]))
+    active = len(bodies) - np.searchsorted(bodies[::-1], columns, side="right")
+    for column, count in enumerate(active.tolist()):
+        head = crc[:count]
+        crc[:count] = (head >> 8) ^ table[(head ^ data[starts[:count] + column]) & 0xFF]
+    ends = starts + bodies
+    received = data[ends].astype(np.uint16) | (data[ends + 1].astype(np.uint16) << 8)
+    result = np.empty(len(starts), dtype=bool)
+    result[order] = crc == received
+    return result
+
+
+def validate_frames_batch(frames: Sequence[FrameBuffer]) -> Sequence[bool]:
+    """Verifica in blocco il CRC di molti frame già delimitati.
+
+    Con NumPy il CRC a tabella viene calcolato colonna per colonna su tutti i
+    frame insieme, restituendo un array booleano; senza NumPy si ricade sul
+    controllo frame per frame.
+    """
+    backend = _numpy_backend()
+    if backend is None:
+        return [_crc_ok(frame) for frame in frames]
+    np, table = backend
+    lengths = np.fromiter((len(frame) for frame in frames), dtype=np.int64, count=len(frames))
+    result = np.zeros(len(frames), dtype=bool)
+    valid = lengths >= MIN_RTU_FRAME_LENGTH
+    if not valid.any():
+        return result
+    data = np.frombuffer(b"".join(frames), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    result[valid] = _batch_crc_ok(np, table, data, starts[valid], lengths[valid])
+    return result
+
+
+@lru_cache(maxsize=None)
+def _numpy_length_tables() -> Tuple[Any, Any]:
+    """``_frame_lengths`` in forma di tabelle NumPy.
+
+    Restituisce l'offset del byte count per funzione e le due lunghezze
+    candidate per (funzione, byte count), con 0 dove non ce ne sono.
+    """
+    np, _ = _numpy_backend()
+    count_offsets = np.zeros(256, dtype=np.int64)
+    lengths = np.zeros((2, 256, 256), dtype=np.int64)
+    for func in range(256):
+        if func & 0x80:
+            lengths[0, func, :] = _EXCEPTION_FRAME_LENGTHS[0]
+        elif func in _FIXED_FRAME_LENGTHS:
+            lengths[0, func, :] = _FIXED_FRAME_LENGTHS[func][0]
+    for (func, byte_count), candidates in _LENGTH_TABLE.items():
+        count_offsets[func] = _BYTE_COUNT_OFFSETS[func]
+        for slot, length in enumerate(candidates):
+            lengths[slot, func, byte_count] = length
+    return count_offsets, lengths
+
+
+def split_frames_batch(datagrams: Sequence[FrameBuffer]) -> List[List[bytes]]:
+    """Divide molti datagrammi in frame verificando tutti i candidati in blocco.
+
+    Ogni offset propone le lunghezze dedotte dall'header come in
+    ``split_modbus_frames``; i CRC di tutti i candidati di tutti i datagrammi
+    vengono verificati insieme con NumPy, poi i frame validi sono scelti da
+    sinistra a destra come nello split scalare. Gli offset con un codice
+    funzione sconosciuto non propongono candidati. Senza NumPy si ricade su
+    ``split_modbus_frames``.
+    """
+    backend = _numpy_backend()
+    if backend is None:
+        return [split_modbus_frames(data)[0] for data in datagrams]
+    np, table = backend
+    count_offsets, length_table = _numpy_length_tables()
+    joined = b"".join(datagrams)
+    total = len(joined)
+    # Byte nulli in coda: l'header degli ultimi offset si legge senza controlli.
+    data = np.frombuffer(joined + bytes(8), dtype=np.uint8)
+    sizes = np.fromiter((len(d) for d in datagrams), dtype=np.int64, count=len(datagrams))
+    ends = np.cumsum(sizes)
+    positions = np.arange(total)
+    available = np.minimum(np.repeat(ends, sizes) - positions, MAX_RTU_FRAME_LENGTH)
+    funcs = data[1 : total + 1]
+    byte_counts = data[positions + count_offsets[funcs]]
+    starts = np.concatenate((positions, positions))
+    lengths = np.concatenate((length_table[0, funcs, byte_counts], length_table[1, funcs, byte_counts]))
+    keep = (lengths >= MIN_RTU_FRAME_LENGTH) & (lengths <= np.concatenate((available, available)))
+    starts = starts[keep]
+    lengths = lengths[keep]
+    frames: List[List[bytes]] = [[] for _ in datagrams]
+    if not len(starts):
+        return frames
+    valid = _batch_crc_ok(np, table, data, starts, lengths)
+    starts = starts[valid]
+    lengths = lengths[valid]
+    order = np.lexsort((lengths, starts))
+    starts = starts[order]
+    lengths = lengths[order]
+    owners = np.searchsorted(ends, starts, side="right")
+    first = ends - sizes
+    current = -1
+    free = 0
+    for start, length, owner in zip(starts.tolist(), lengths.tolist(), owners.tolist()):
+        if owner != current:
+            current = owner
+            free = int(first[owner])
+        if start < free:
+            # Sovrapposto al frame già scelto (o più lungo di uno valido più corto).
+            continue
+        frames[owner].append(joined[start : start + length])
+        free = start + length
+    return frames
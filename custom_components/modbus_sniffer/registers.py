@@ -0,0 +1,239 @@
+"""Archivio compatto degli ultimi valori dei registri holding osservati."""
+from __future__ import annotations
+
+import math
+from array import array
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Generic, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+REGISTER_COUNT = 0x10000
+
+# Callback invocata una volta per frame con (unit_id, registro iniziale, valori,
+# inoltrati). ``inoltrati`` è ``None`` quando tutti i valori vanno inoltrati,
+# altrimenti indica per ogni valore se il filtro change_only lo lascia passare.
+BlockCallback = Callable[[int, int, Sequence[int], Optional[Sequence[bool]]], None]
+
+_T = TypeVar("_T")
+
+# Fino a questa lunghezza un blocco si scorre registro per registro: una ricerca
+# nel dizionario costa meno delle bisezioni (scritture singole, letture brevi).
+_PROBE_LIMIT = 8
+
+# I registri sono allocati a pagine di 256 solo quando una unit ne scrive uno:
+# una unit vista in un solo frame costa una pagina, non 65536 registri.
+_PAGE_SHIFT = 8
+_PAGE_SIZE = 1 << _PAGE_SHIFT
+_PAGE_MASK = _PAGE_SIZE - 1
+_PAGE_COUNT = REGISTER_COUNT >> _PAGE_SHIFT
+
+
+class _Page:
+    """Valori, istanti di aggiornamento e presenza di 256 registri consecutivi."""
+
+    __slots__ = ("values", "updated_at", "forwarded_at", "present")
+
+    def __init__(self, track_forwarded: bool) -> None:
+        self.values = array("H", bytes(2 * _PAGE_SIZE))
+        self.updated_at = array("d", bytes(8 * _PAGE_SIZE))
+        # -inf: mai inoltrato, anche dopo il ripristino di uno snapshot.
+        self.forwarded_at: Optional["array[float]"] = (
+            array("d", [-math.inf]) * _PAGE_SIZE if track_forwarded else None
+        )
+        self.present = bytearray(_PAGE_SIZE)
+
+
+class UnitRegisters:
+    """Valori e istanti di aggiornamento dei registri di una unit.
+
+    La memoria è allocata a pagine di 256 registri alla prima scrittura: un
+    ``array('H')`` per i valori, un ``array('d')`` per gli istanti di
+    aggiornamento e i flag di presenza. ``forwarded_at`` (istante dell'ultimo
+    valore inoltrato ai sensori) viene allocato solo se richiesto.
+    """
+
+    __slots__ = ("unit_id", "count", "_track_forwarded", "_pages")
+
+    def __init__(self, unit_id: int, *, track_forwarded: bool = False) -> None:
+        self.unit_id = unit_id
+        self.count = 0
+        self._track_forwarded = track_forwarded
+        self._pages: List[Optional[_Page]] = [None] * _PAGE_COUNT
+
+    @property
+    def pages(self) -> int:
+        """Pagine allocate."""
+        return sum(page is not None for page in self._pages)
+
+    def has(self, register: int) -> bool:
+        page = self._pages[register >> _PAGE_SHIFT]
+        return page is not None and bool(page.present[register & _PAGE_MASK])
+
+    def get(self, register: int) -> Optional[int]:
+        page = self._pages[register >> _PAGE_SHIFT]
+        if page is None or not page.present[register & _PAGE_MASK]:
+            return None
+        return page.values[register & _PAGE_MASK]
+
+    def updated_at(self, register: int) -> Optional[float]:
+        page = self._pages[register >> _PAGE_SHIFT]
+        if page is None or not page.present[register & _PAGE_MASK]:
+            return None
+        return page.updated_at[register & _PAGE_MASK]
+
+    def forwarded_at(self, register: int) -> float:
+        """Istante dell'ultimo inoltro ai sensori (-inf se mai inoltrato o non tracciato)."""
+        page = self._pages[register >> _PAGE_SHIFT]
+        if page is None or page.forwarded_at is None:
+            return -math.inf
+        return page.forwarded_at[register & _PAGE_MASK]
+
+    def set(self, register: int, value: int, now: float, *, forwarded: bool = False) -> None:
+        """Memorizza il valore; con ``forwarded`` registra anche l'istante di inoltro."""
+        page = self._pages[register >> _PAGE_SHIFT]
+        if page is None:
+            page = self._pages[register >> _PAGE_SHIFT] = _Page(self._track_forwarded)
+        index = register & _PAGE_MASK
+        if not page.present[index]:
+            page.present[index] = 1
+            self.count += 1
+        page.values[index] = value
+        page.updated_at[index] = now
+        if forwarded and page.forwarded_at is not None:
+            page.forwarded_at[index] = now
+
+    def registers(self) -> Iterator[int]:
+        """Registri presenti, in ordine crescente."""
+        for page_index, page in enumerate(self._pages):
+            if page is None:
+                continue
+            base = page_index << _PAGE_SHIFT
+            for index, present in enumerate(page.present):
+                if present:
+                    yield base + index
+
+    def snapshot(self) -> Dict[int, Tuple[int, float]]:
+        """Esporta ``register -> (value, updated_at)`` per i registri presenti."""
+        exported: Dict[int, Tuple[int, float]] = {}
+        for page_index, page in enumerate(self._pages):
+            if page is None:
+                continue
+            base = page_index << _PAGE_SHIFT
+            values = page.values
+            updated_at = page.updated_at
+            for index, present in enumerate(page.present):
+                if present:
+                    exported[base + index] = (values[index], updated_at[index])
+        return exported
+
+
+class RegisterStore:
+    """Archivio dei registri per unit id, con aggiornamento e lettura in O(1).
+
+    ``latest_unit`` indicizza per registro la unit che lo ha aggiornato per
+    ultima (-1 se mai visto): chi scrive nell'archivio deve mantenerlo.
+    """
+
+    def __init__(self, *, track_forwarded: bool = False) -> None:
+        self._track_forwarded = track_forwarded
+        self._units: Dict[int, UnitRegisters] = {}
+        self.latest_unit = array("h", [-1]) * REGISTER_COUNT
+
+    def __iter__(self) -> Iterator[UnitRegisters]:
+        return iter(self._units.values())
+
+    def __len__(self) -> int:
+        return sum(unit.count for unit in self._units.values())
+
+    def unit(self, unit_id: int) -> UnitRegisters:
+        """Restituisce l'archivio della unit, creandolo al primo utilizzo."""
+        unit = self._units.get(unit_id)
+        if unit is None:
+            unit = UnitRegisters(unit_id, track_forwarded=self._track_forwarded)
+            self._units[unit_id] = unit
+        return unit
+
+    def lookup(self, unit_id: int) -> Optional[UnitRegisters]:
+        """Archivio della unit se già presente, senza crearlo."""
+        return self._units.get(unit_id)
+
+    def get(self, unit_id: int, register: int) -> Optional[int]:
+        unit = self._units.get(unit_id)
+        if unit is None:
+            return None
+        return unit.get(register)
+
+    def latest(self, register: int) -> Optional[UnitRegisters]:
+        """Unit che ha aggiornato ``register`` per ultima."""
+        unit_id = self.latest_unit[register]
+        if unit_id < 0:
+            return None
+        return self._units.get(unit_id)
+
+    def clear(self) -> None:
+        self._units.clear()
+        self.latest_unit = array("h", [-1]) * REGISTER_COUNT
+
+    def snapshot(self) -> Dict[int, Dict[int, Tuple[int, float]]]:
+        """Esporta ``unit_id -> register -> (value, updated_at)``."""
+        return {unit_id: unit.snapshot() for unit_id, unit in self._units.items()}
+
+
+class RegisterIndex(Generic[_T]):
+    """Voci associate ai registri, da estrarre dai blocchi di registri consecutivi.
+
+    I registri con almeno una voce restano ordinati: quelli che cadono in un
+    blocco ``(start, count)`` si trovano con due bisezioni e il valore di ognuno
+    è ``values[register - start]``, senza cercare registro per registro. Le voci
+    di un registro sono tuple sostituite a ogni modifica, quindi si possono
+    scorrere senza copia anche se una callback ne aggiunge o rimuove.
+    """
+
+    def __init__(self) -> None:
+        self._registers: List[int] = []
+        self._entries: Dict[int, Tuple[_T, ...]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._registers)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def add(self, register: int, entry: _T) -> None:
+        entries = self._entries.get(register)
+        if entries is None:
+            insort(self._registers, register)
+            entries = ()
+        self._entries[register] = (*entries, entry)
+
+    def remove(self, register: int, entry: _T) -> bool:
+        """Rimuove ``entry``; ``False`` se non era associata al registro."""
+        entries = self._entries.get(register)
+        if entries is None or entry not in entries:
+            return False
+        remaining = tuple(item for item in entries if item is not entry)
+        if remaining:
+            self._entries[register] = remaining
+        else:
+            del self._entries[register]
+            del self._registers[bisect_left(self._registers, register)]
+        return True
+
+    def get(self, register: int) -> Sequence[_T]:
+        return self._entries.get(register, ())
+
+    def span(self, start: int, count: int) -> List[Tuple[int, Tuple[_T, ...]]]:
+        """Registri di ``[start, start + count)`` che hanno voci, in ordine crescente."""
+        entries = self._entries
+        if count == 1:
+            found = entries.get(start)
+            return [(start, found)] if found is not None else []
+        if count <= _PROBE_LIMIT:
+            return [
+                (register, entries[register])
+                for register in range(start, start + count)
+                if register in entries
+            ]
+        registers = self._registers
+        low = bisect_left(registers, start)
+        high = bisect_left(registers, start + count, low)
+        return [(register, entries[register]) for register in registers[low:high]]
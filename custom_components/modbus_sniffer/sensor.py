@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Mapping
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import voluptuous as vol
@@ -10,83 +11,65 @@ from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.exceptions import PlatformNotReady
 from homeassistant.helpers import config_validation as cv
-from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     ATTR_RAW_VALUE,
     ATTR_REGISTER,
+    ATTR_SNAPSHOT_AGE,
     ATTR_UNIT_ID,
-    CONF_CONNECTION_MODE,
+    CONF_BYTE_ORDER,
+    CONF_DATA_TYPE,
+    CONF_DEADBAND,
+    CONF_DEADBAND_PERCENT,
     CONF_DEVICE,
     CONF_DEVICE_CLASS,
     CONF_DEVICE_TYPE,
     CONF_FORCE_UPDATE,
     CONF_ICON,
+    CONF_MIN_INTERVAL,
     CONF_OFFSET,
     CONF_PRECISION,
     CONF_REGISTER,
     CONF_SCALE,
     CONF_SENSORS,
-    CONF_SOURCE_HOST,
     CONF_STATE_CLASS,
     CONF_STATE_MAP,
-    CONF_TCP_HOST,
-    CONF_TCP_PORT,
     CONF_UNIT,
     CONF_UNIT_ID,
-    CONF_UDP_PORT,
-    DATA_HUB,
+    CONF_WORD_ORDER,
     DATA_LISTENERS,
-    DEFAULT_CONNECTION_MODE,
+    DATA_TRANSFORMS,
+    DEFAULT_BYTE_ORDER,
+    DEFAULT_DATA_TYPE,
+    DEFAULT_DEADBAND,
+    DEFAULT_DEADBAND_PERCENT,
     DEFAULT_DEVICE_TYPE,
+    DEFAULT_MIN_INTERVAL,
     DEFAULT_OFFSET,
     DEFAULT_PRECISION,
     DEFAULT_SCALE,
-    DEFAULT_SOURCE_HOST,
-    DEFAULT_TCP_PORT,
-    DEFAULT_UDP_PORT,
-    DEVICE_TYPE_LABELS,
-    DOMAIN,
+    DEFAULT_WORD_ORDER,
     MODE_TCP,
-    MODE_UDP,
-    SIGNAL_REGISTER_UPDATE,
 )
-from .hub import ModbusSnifferHub
+from . import DEVICE_SCHEMA, LISTENER_SCHEMA, coerce_register, coerce_unit_id
+from .hub import (
+    ModbusSnifferHub,
+    async_acquire_hub,
+    async_release_hub,
+    ensure_component_data,
+    hub_device_info,
+    listener_config,
+    unique_id_prefix,
+)
+from .parser import LAYOUT_DATA_TYPES, ORDER_BIG, ORDER_LITTLE, RegisterLayout, register_layout
+from .transforms import Transform, TransformTable
 
 _LOGGER = logging.getLogger(__name__)
 
-
-def _coerce_register(value: Any) -> int:
-    if isinstance(value, str):
-        raw = value.strip()
-        base = 16 if raw.lower().startswith("0x") else 10
-        try:
-            value = int(raw, base)
-        except ValueError as err:
-            raise vol.Invalid(f"Valore registro non valido: {value}") from err
-    if not isinstance(value, int):
-        raise vol.Invalid(f"Tipo registro non supportato: {type(value)}")
-    if not 0 <= value <= 0xFFFF:
-        raise vol.Invalid("Il registro deve essere compreso fra 0 e 0xFFFF")
-    return value
-
-
-def _coerce_unit_id(value: Any) -> int:
-    if isinstance(value, str):
-        raw = value.strip()
-        base = 16 if raw.lower().startswith("0x") else 10
-        try:
-            value = int(raw, base)
-        except ValueError as err:
-            raise vol.Invalid(f"Unit ID non valido: {value}") from err
-    if not isinstance(value, int):
-        raise vol.Invalid("Unit ID deve essere un intero")
-    if not 0 <= value <= 0xFF:
-        raise vol.Invalid("Unit ID deve essere nell'intervallo 0-255")
-    return value
+# Tolleranza relativa sul confronto con la banda: 20.1 - 20.0 non supera 0.1.
+_DEADBAND_EPSILON = 1e-9
 
 
 def _coerce_state_map(value: Any) -> Dict[int, str]:
@@ -97,49 +80,39 @@ def _coerce_state_map(value: Any) -> Dict[int, str]:
     result: Dict[int, str] = {}
     for key, label in value.items():
         try:
-            key_int = _coerce_register(key)
+            key_int = coerce_register(key)
         except vol.Invalid:
-            key_int = _coerce_unit_id(key)
+            key_int = coerce_unit_id(key)
         result[key_int] = cv.string(label)
     return result
 
 
-def _coerce_identifiers(value: Any) -> Tuple[Tuple[str, str], ...]:
-    identifiers = cv.ensure_list(value)
-    result = []
-    for item in identifiers:
-        if not isinstance(item, str):
-            raise vol.Invalid("Gli identificatori devono essere stringhe")
-        result.append((DOMAIN, item))
-    return tuple(result)
-
-
-DEVICE_SCHEMA = vol.Schema(
-    {
-        vol.Optional("identifiers"): _coerce_identifiers,
-        vol.Optional("manufacturer"): cv.string,
-        vol.Optional("model"): cv.string,
-        vol.Optional("name"): cv.string,
-        vol.Optional("sw_version"): cv.string,
-        vol.Optional("via_device"): cv.string,
-    }
-)
-
-
 SENSOR_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_NAME): cv.string,
-        vol.Required(CONF_REGISTER): _coerce_register,
-        vol.Optional(CONF_UNIT_ID): _coerce_unit_id,
+        vol.Required(CONF_REGISTER): coerce_register,
+        vol.Optional(CONF_UNIT_ID): coerce_unit_id,
         vol.Optional(CONF_SCALE, default=DEFAULT_SCALE): vol.Coerce(float),
         vol.Optional(CONF_OFFSET, default=DEFAULT_OFFSET): vol.Coerce(float),
         vol.Optional(CONF_PRECISION, default=DEFAULT_PRECISION): vol.Any(None, vol.Coerce(int)),
+        vol.Optional(CONF_DATA_TYPE, default=DEFAULT_DATA_TYPE): vol.In(LAYOUT_DATA_TYPES),
+        vol.Optional(CONF_WORD_ORDER, default=DEFAULT_WORD_ORDER): vol.In([ORDER_BIG, ORDER_LITTLE]),
+        vol.Optional(CONF_BYTE_ORDER, default=DEFAULT_BYTE_ORDER): vol.In([ORDER_BIG, ORDER_LITTLE]),
+        vol.Optional(CONF_DEADBAND, default=DEFAULT_DEADBAND): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(CONF_DEADBAND_PERCENT, default=DEFAULT_DEADBAND_PERCENT): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
         vol.Optional(CONF_STATE_MAP): _coerce_state_map,
         vol.Optional(CONF_UNIT): cv.string,
         vol.Optional(CONF_DEVICE_CLASS): cv.string,
         vol.Optional(CONF_STATE_CLASS): cv.string,
         vol.Optional(CONF_ICON): cv.string,
         vol.Optional(CONF_FORCE_UPDATE, default=False): cv.boolean,
+        vol.Optional(CONF_MIN_INTERVAL, default=DEFAULT_MIN_INTERVAL): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
         vol.Optional(CONF_DEVICE): DEVICE_SCHEMA,
     }
 )
@@ -147,27 +120,12 @@ SENSOR_SCHEMA = vol.Schema(
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
-        vol.Optional(CONF_CONNECTION_MODE, default=DEFAULT_CONNECTION_MODE): vol.In(
-            [MODE_UDP, MODE_TCP]
-        ),
-        vol.Optional(CONF_SOURCE_HOST, default=DEFAULT_SOURCE_HOST): cv.string,
-        vol.Optional(CONF_UDP_PORT, default=DEFAULT_UDP_PORT): cv.port,
-        vol.Optional(CONF_TCP_HOST, default=""): cv.string,
-        vol.Optional(CONF_TCP_PORT, default=DEFAULT_TCP_PORT): cv.port,
-        vol.Optional(CONF_DEVICE_TYPE, default=DEFAULT_DEVICE_TYPE): vol.In(list(DEVICE_TYPE_LABELS)),
-        vol.Optional(CONF_NAME, default=""): cv.string,
+        **LISTENER_SCHEMA,
         vol.Required(CONF_SENSORS): vol.All(cv.ensure_list, [SENSOR_SCHEMA]),
     }
 )
 
 
-def _ensure_component_data(hass: HomeAssistant) -> Dict[str, Any]:
-    data = hass.data.setdefault(DOMAIN, {})
-    data.setdefault(DATA_HUB, {})
-    data.setdefault(DATA_LISTENERS, {})
-    return data
-
-
 async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
@@ -175,32 +133,24 @@ async def async_setup_platform(
     discovery_info=None,
 ):
     """Configura la piattaforma dei sensori Modbus Sniffer via YAML."""
-    component_data = _ensure_component_data(hass)
-    mode = config.get(CONF_CONNECTION_MODE, DEFAULT_CONNECTION_MODE)
-    if mode == MODE_TCP:
-        host = config.get(CONF_TCP_HOST, "").strip()
-        port = config.get(CONF_TCP_PORT, DEFAULT_TCP_PORT)
-        if not host:
-            _LOGGER.error(
-                "Configurazione Modbus Sniffer YAML: host TCP mancante per la modalità TCP"
-            )
-            return
-    else:
-        host = config.get(CONF_SOURCE_HOST, DEFAULT_SOURCE_HOST).strip()
-        port = config.get(CONF_UDP_PORT, DEFAULT_UDP_PORT)
-    instance_name = (config.get(CONF_NAME) or "").strip() or None
-    device_type = config.get(CONF_DEVICE_TYPE, DEFAULT_DEVICE_TYPE)
-    sensors_conf = config[CONF_SENSORS]
+    component_data = ensure_component_data(hass)
+    mode, host, port, hub_options = listener_config(config)
+    if mode == MODE_TCP and not host:
+        _LOGGER.error(
+            "Configurazione Modbus Sniffer YAML: host TCP mancante per la modalità TCP"
+        )
+        return
     await _async_setup_sensors(
         hass,
         mode,
         host,
         port,
-        sensors_conf,
+        config[CONF_SENSORS],
         component_data,
         async_add_entities,
-        instance_name=instance_name,
-        device_type=device_type,
+        instance_name=(config.get(CONF_NAME) or "").strip() or None,
+        device_type=config.get(CONF_DEVICE_TYPE, DEFAULT_DEVICE_TYPE),
+        hub_options=hub_options,
     )
 
 
@@ -210,22 +160,14 @@ async def async_setup_entry(
     async_add_entities,
 ):
     """Configura i sensori partendo da una config entry."""
-    component_data = _ensure_component_data(hass)
-    mode = entry.data.get(CONF_CONNECTION_MODE, DEFAULT_CONNECTION_MODE)
-    if mode == MODE_TCP:
-        host = entry.data.get(CONF_TCP_HOST, "").strip()
-        port = entry.data.get(CONF_TCP_PORT, DEFAULT_TCP_PORT)
-        if not host:
-            _LOGGER.error(
-                "Config entry Modbus Sniffer %s: host TCP mancante in modalità TCP",
-                entry.title,
-            )
-            return
-    else:
-        host = entry.data.get(CONF_SOURCE_HOST, DEFAULT_SOURCE_HOST).strip()
-        port = entry.data.get(CONF_UDP_PORT, DEFAULT_UDP_PORT)
-    instance_name = (entry.data.get(CONF_NAME) or "").strip() or None
-    device_type = entry.data.get(CONF_DEVICE_TYPE, DEFAULT_DEVICE_TYPE)
+    component_data = ensure_component_data(hass)
+    mode, host, port, hub_options = listener_config(entry.data)
+    if mode == MODE_TCP and not host:
+        _LOGGER.error(
+            "Config entry Modbus Sniffer %s: host TCP mancante in modalità TCP",
+            entry.title,
+        )
+        return
     sensors_conf: Iterable[dict] = entry.options.get(CONF_SENSORS, entry.data.get(CONF_SENSORS, []))
     if not sensors_conf:
         _LOGGER.warning(
@@ -243,9 +185,10 @@ async def async_setup_entry(
         sensors_conf,
         component_data,
         async_add_entities,
-        instance_name=instance_name,
-        device_type=device_type,
+        instance_name=(entry.data.get(CONF_NAME) or "").strip() or None,
+        device_type=entry.data.get(CONF_DEVICE_TYPE, DEFAULT_DEVICE_TYPE),
         entry_id=entry.entry_id,
+        hub_options=hub_options,
     )
 
 
@@ -261,26 +204,11 @@ async def _async_setup_sensors(
     instance_name: Optional[str] = None,
     device_type: Optional[str] = None,
     entry_id: Optional[str] = None,
+    hub_options: Mapping[str, Any],
 ) -> None:
-    hubs: Dict[Tuple[str, str, int], ModbusSnifferHub] = component_data[DATA_HUB]
+    hub, hub_key = await async_acquire_hub(hass, component_data, mode, host, port, hub_options)
     listeners: Dict[Tuple[str, str, int], int] = component_data[DATA_LISTENERS]
-    hub_key = (mode, host, int(port))
-
-    hub = hubs.get(hub_key)
-    if hub is None:
-        hub = ModbusSnifferHub(hass, mode, host, int(port))
-        try:
-            await hub.async_start()
-        except OSError as exc:
-            raise PlatformNotReady(
-                f"Impossibile avviare Modbus Sniffer {mode.upper()} su {host}:{port}"
-            ) from exc
-        hubs[hub_key] = hub
-        listeners[hub_key] = 0
-        if mode == MODE_UDP:
-            _LOGGER.info("Listener UDP Modbus Sniffer attivo su %s:%s", host, port)
-        else:
-            _LOGGER.info("Listener TCP Modbus Sniffer verso %s:%s avviato", host, port)
+    tables: Dict[Tuple[str, str, int], TransformTable] = component_data[DATA_TRANSFORMS]
 
     entities: List[ModbusSnifferSensor] = []
     for sensor_conf in sensors_conf:
@@ -298,6 +226,7 @@ async def _async_setup_sensors(
                 hub_key,
                 component_data,
                 dict(validated),
+                transforms=tables[hub_key],
                 instance_name=instance_name,
                 device_type=device_type,
                 entry_id=entry_id,
@@ -325,12 +254,15 @@ class ModbusSnifferSensor(SensorEntity):
         component_data: Dict[str, Any],
         config: dict,
         *,
+        transforms: TransformTable,
         instance_name: Optional[str] = None,
         device_type: Optional[str] = None,
         entry_id: Optional[str] = None,
     ) -> None:
         self._hass = hass
         self._hub = hub
+        self._transforms = transforms
+        self._transform: Optional[Transform] = None
         self._hub_key = hub_key
         self._component_data = component_data
         self._instance_name = instance_name
@@ -347,31 +279,38 @@ class ModbusSnifferSensor(SensorEntity):
         self._scale = config[CONF_SCALE]
         self._offset = config[CONF_OFFSET]
         self._precision = config[CONF_PRECISION]
+        data_type = config.get(CONF_DATA_TYPE, DEFAULT_DATA_TYPE)
+        byte_order = config.get(CONF_BYTE_ORDER, DEFAULT_BYTE_ORDER)
+        # Il valore grezzo uint16 big endian non richiede decodifica.
+        self._layout: Optional[RegisterLayout] = None
+        if data_type != DEFAULT_DATA_TYPE or byte_order != DEFAULT_BYTE_ORDER:
+            self._layout = register_layout(
+                data_type, config.get(CONF_WORD_ORDER, DEFAULT_WORD_ORDER), byte_order
+            )
+        self._deadband = config.get(CONF_DEADBAND, DEFAULT_DEADBAND)
+        self._deadband_ratio = config.get(CONF_DEADBAND_PERCENT, DEFAULT_DEADBAND_PERCENT) / 100
         self._state_map = config.get(CONF_STATE_MAP) or {}
         self._unit = config.get(CONF_UNIT)
         self._device_class = config.get(CONF_DEVICE_CLASS)
         self._state_class = config.get(CONF_STATE_CLASS)
         self._icon = config.get(CONF_ICON)
         self._force_update = config.get(CONF_FORCE_UPDATE, False)
+        self._min_interval = config.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL)
+        # Ultimo valore ricevuto durante l'intervallo minimo, scritto allo scadere.
+        self._pending: Optional[Tuple[int, Any]] = None
+        self._delivery_scheduled = False
+        self._last_write: Optional[float] = None
         self._raw_value: Optional[int] = None
         self._native_value: Any = None
+        self._snapshot_age: Optional[int] = None
         self._unsubscribe = None
-        device_conf = config.get(CONF_DEVICE) or {}
-        identifiers = device_conf.get("identifiers")
-        if identifiers:
-            ident_set = set(identifiers)
-        else:
-            default_identifier = entry_id or f"{self._mode}:{self._host}:{self._port}"
-            ident_set = {(DOMAIN, default_identifier)}
-        device_info = {"identifiers": ident_set}
-        for key in ("manufacturer", "model", "name", "sw_version", "via_device"):
-            if key in device_conf:
-                device_info[key] = device_conf[key]
-        if "name" not in device_info and instance_name:
-            device_info["name"] = instance_name
-        if "model" not in device_info and device_type:
-            device_info["model"] = DEVICE_TYPE_LABELS.get(device_type, device_type)
-        self._device_info = device_info
+        self._device_info = hub_device_info(
+            config,
+            hub_key,
+            instance_name=instance_name,
+            device_type=device_type,
+            entry_id=entry_id,
+        )
 
     @property
     def name(self) -> str:
@@ -380,13 +319,7 @@ class ModbusSnifferSensor(SensorEntity):
     @property
     def unique_id(self) -> str:
         uid_part = f"{self._unit_id:02X}" if self._unit_id is not None else "any"
-        host = self._host
-        port = self._port
-        if self._mode == MODE_UDP:
-            prefix = f"{DOMAIN}_{host}_{port}"
-        else:
-            prefix = f"{DOMAIN}_{self._mode}_{host}_{port}"
-        return f"{prefix}_{uid_part}_{self._register:04X}"
+        return f"{unique_id_prefix(self._hub_key)}_{uid_part}_{self._register:04X}"
 
     @property
     def device_info(self) -> dict:
@@ -425,52 +358,84 @@ class ModbusSnifferSensor(SensorEntity):
             attrs[ATTR_UNIT_ID] = self._unit_id
         if self._raw_value is not None:
             attrs[ATTR_RAW_VALUE] = self._raw_value
+        if self._snapshot_age is not None:
+            attrs[ATTR_SNAPSHOT_AGE] = self._snapshot_age
         return attrs
 
     async def async_added_to_hass(self) -> None:
-        self._unsubscribe = async_dispatcher_connect(
-            self._hass,
-            SIGNAL_REGISTER_UPDATE,
+        # Trasformazione e iscrizione sono condivise con gli altri sensori del hub
+        # configurati sullo stesso registro con gli stessi parametri.
+        self._transform, self._unsubscribe = self._transforms.add(
+            self._unit_id,
+            self._register,
             self._handle_register_update,
+            scale=self._scale,
+            offset=self._offset,
+            precision=self._precision,
+            state_map=self._state_map,
+            force_update=self._force_update,
+            layout=self._layout,
         )
-        existing = self._hub.get_register(self._unit_id, self._register)
+        existing = self._hub.get_sample(self._unit_id, self._register, self._layout)
         if existing is not None:
-            self._apply_new_value(existing)
+            if existing.restored:
+                # Valore dallo snapshot salvato: età in secondi fino al primo dato dal bus.
+                self._snapshot_age = int(self._hass.loop.time() - existing.updated_at)
+            self._apply_new_value(existing.value, self._transform(existing.value))
 
     async def async_will_remove_from_hass(self) -> None:
         if self._unsubscribe:
             self._unsubscribe()
             self._unsubscribe = None
-        listeners: Dict[Tuple[str, str, int], int] = self._component_data.get(DATA_LISTENERS, {})
-        hubs: Dict[Tuple[str, str, int], ModbusSnifferHub] = self._component_data.get(DATA_HUB, {})
-        count = listeners.get(self._hub_key)
-        if count is None:
-            return
-        count -= 1
-        if count <= 0:
-            listeners.pop(self._hub_key, None)
-            hub = hubs.pop(self._hub_key, None)
-            if hub:
-                await hub.async_stop()
-        else:
-            listeners[self._hub_key] = count
+        if self._delivery_scheduled:
+            self._hub.async_cancel_delivery(self._deliver_pending)
+            self._delivery_scheduled = False
+        await async_release_hub(self._component_data, self._hub_key)
 
     @callback
-    def _handle_register_update(self, unit_id: int, register: int, value: int) -> None:
-        if register != self._register:
+    def _handle_register_update(self, raw_value: int, native_value: Any) -> None:
+        # La tabella del hub invoca solo i sensori di questo registro/unit, con il
+        # valore già trasformato.
+        self._snapshot_age = None
+        if not self._min_interval or self._last_write is None:
+            self._apply_new_value(raw_value, native_value)
+            return
+        # Valori intermedi accorpati: resta solo l'ultimo, scritto allo scadere
+        # dell'intervallo minimo dal timer condiviso del hub.
+        self._pending = (raw_value, native_value)
+        if self._delivery_scheduled:
             return
-        if self._unit_id is not None and unit_id != self._unit_id:
+        due = self._last_write + self._min_interval
+        if self._hass.loop.time() >= due:
+            self._deliver_pending()
             return
-        self._apply_new_value(value)
+        self._delivery_scheduled = True
+        self._hub.async_schedule_delivery(self._deliver_pending, due)
 
     @callback
-    def _apply_new_value(self, raw_value: int) -> None:
+    def _deliver_pending(self) -> None:
+        self._delivery_scheduled = False
+        pending = self._pending
+        self._pending = None
+        if pending is not None:
+            self._apply_new_value(*pending)
+
+    @callback
+    def _apply_new_value(self, raw_value: int, native_value: Any) -> None:
+        if not self._state_map and self._within_deadband(native_value):
+            self._hub.record_deadband_skip()
+            return
+        self._last_write = self._hass.loop.time()
         self._raw_value = raw_value
-        if self._state_map:
-            self._native_value = self._state_map.get(raw_value, str(raw_value))
-        else:
-            scaled = raw_value * self._scale + self._offset
-            if self._precision is not None:
-                scaled = round(scaled, self._precision)
-            self._native_value = scaled
+        self._native_value = native_value
         self.async_write_ha_state()
+
+    def _within_deadband(self, value: float) -> bool:
+        """Vero se ``value`` non supera le bande rispetto all'ultimo stato scritto."""
+        previous = self._native_value
+        if previous is None or not (self._deadband or self._deadband_ratio):
+            return False
+        delta = abs(value - previous) - _DEADBAND_EPSILON * max(1.0, abs(previous))
+        if self._deadband and delta <= self._deadband:
+            return True
+        return bool(self._deadband_ratio) and delta <= abs(previous) * self._deadband_ratio
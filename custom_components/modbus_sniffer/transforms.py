@@ -0,0 +1,221 @@
+"""Trasformazioni precompilate dal valore grezzo del registro allo stato dei sensori."""
+from __future__ import annotations
+
+import logging
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .registers import BlockCallback, RegisterIndex
+
+if TYPE_CHECKING:
+    from .parser import RegisterLayout
+
+_LOGGER = logging.getLogger(__name__)
+
+Transform = Callable[[Union[int, float]], Any]
+# Riceve il valore grezzo (decodificato dal layout, se presente) e quello già trasformato.
+TransformTarget = Callable[[Union[int, float], Any], None]
+# Iscrive un consumatore ai blocchi del hub e restituisce la funzione di disiscrizione.
+SubscribeCallback = Callable[[BlockCallback], Callable[[], None]]
+
+_TransformKey = Tuple[float, float, Optional[int], Optional[FrozenSet[Tuple[int, str]]]]
+_GroupKey = Tuple[Optional[int], int, Optional["RegisterLayout"]]
+_EntryKey = Tuple[Optional[int], int, bool, Optional["RegisterLayout"], _TransformKey]
+
+
+def compile_transform(
+    scale: float,
+    offset: float,
+    precision: Optional[int],
+    state_map: Optional[Mapping[int, str]] = None,
+) -> Transform:
+    """Restituisce la funzione ``raw -> stato`` specializzata per i parametri del sensore.
+
+    Equivale a ``round(raw * scale + offset, precision)`` (o alla ricerca nello
+    ``state_map``), ma le operazioni neutre vengono eliminate in anticipo.
+    """
+    if state_map:
+        lookup = dict(state_map).get
+
+        def _mapped(raw: int) -> Any:
+            value = lookup(raw)
+            return str(raw) if value is None else value
+
+        return _mapped
+
+    if precision is None:
+        if scale == 1 and offset == 0:
+            return float
+        if offset == 0:
+
+            def _scaled(raw: int) -> float:
+                return raw * scale
+
+            return _scaled
+
+        def _linear(raw: int) -> float:
+            return raw * scale + offset
+
+        return _linear
+
+    if scale == 1 and offset == 0:
+
+        def _rounded(raw: int) -> float:
+            return round(float(raw), precision)
+
+        return _rounded
+
+    def _linear_rounded(raw: int) -> float:
+        return round(raw * scale + offset, precision)
+
+    return _linear_rounded
+
+
+class TransformEntry:
+    """Sensori dello stesso registro con la stessa trasformazione."""
+
+    __slots__ = ("transform", "force_update", "targets")
+
+    def __init__(self, transform: Transform, force_update: bool = False) -> None:
+        self.transform = transform
+        self.force_update = force_update
+        # Tuple sostituita a ogni modifica: si scorre senza copia durante la consegna.
+        self.targets: Tuple[TransformTarget, ...] = ()
+
+
+class _RegisterGroup:
+    """Voci con lo stesso registro iniziale, unit e layout: il valore si decodifica una volta."""
+
+    __slots__ = ("unit_id", "layout", "count", "entries")
+
+    def __init__(self, unit_id: Optional[int], layout: Optional["RegisterLayout"]) -> None:
+        self.unit_id = unit_id
+        self.layout = layout
+        self.count = 1 if layout is None else layout.count
+        self.entries: Tuple[TransformEntry, ...] = ()
+
+
+class TransformTable:
+    """Tabella delle trasformazioni dei sensori di un hub, indicizzata per registro.
+
+    La tabella riceve dal hub un blocco per frame e ne estrae i registri dei
+    sensori con l'indice ordinato: per ogni registro presente il valore è
+    ``values[register - start]``, decodificato una volta per layout e passato a
+    ogni trasformazione ``(unit_id, registro, force_update, layout,
+    trasformazione)`` una sola volta, qualunque sia il numero di sensori che la
+    condividono.
+    """
+
+    def __init__(self, subscribe: SubscribeCallback) -> None:
+        self._subscribe = subscribe
+        self._unsubscribe: Optional[Callable[[], None]] = None
+        self._index: RegisterIndex[_RegisterGroup] = RegisterIndex()
+        self._groups: Dict[_GroupKey, _RegisterGroup] = {}
+        self._entries: Dict[_EntryKey, TransformEntry] = {}
+        self._transforms: Dict[_TransformKey, Transform] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(
+        self,
+        unit_id: Optional[int],
+        register: int,
+        target: TransformTarget,
+        *,
+        scale: float,
+        offset: float,
+        precision: Optional[int],
+        state_map: Optional[Mapping[int, str]] = None,
+        force_update: bool = False,
+        layout: Optional["RegisterLayout"] = None,
+    ) -> Tuple[Transform, Callable[[], None]]:
+        """Aggiunge ``target`` e restituisce la trasformazione e la funzione di rimozione."""
+        transform_key: _TransformKey = (
+            scale,
+            offset,
+            precision,
+            frozenset(state_map.items()) if state_map else None,
+        )
+        transform = self._transforms.get(transform_key)
+        if transform is None:
+            transform = compile_transform(scale, offset, precision, state_map)
+            self._transforms[transform_key] = transform
+        group_key: _GroupKey = (unit_id, register, layout)
+        group = self._groups.get(group_key)
+        if group is None:
+            group = _RegisterGroup(unit_id, layout)
+            self._groups[group_key] = group
+            self._index.add(register, group)
+        key: _EntryKey = (unit_id, register, force_update, layout, transform_key)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = TransformEntry(transform, force_update)
+            self._entries[key] = entry
+            group.entries += (entry,)
+        entry.targets += (target,)
+        if self._unsubscribe is None:
+            self._unsubscribe = self._subscribe(self.handle_block)
+
+        def _remove() -> None:
+            if target not in entry.targets:
+                return
+            entry.targets = tuple(item for item in entry.targets if item is not target)
+            if entry.targets or self._entries.get(key) is not entry:
+                return
+            del self._entries[key]
+            group.entries = tuple(item for item in group.entries if item is not entry)
+            if group.entries:
+                return
+            del self._groups[group_key]
+            self._index.remove(register, group)
+            if not self._index and self._unsubscribe is not None:
+                self._unsubscribe()
+                self._unsubscribe = None
+
+        return transform, _remove
+
+    def handle_block(
+        self,
+        unit_id: int,
+        start: int,
+        values: Sequence[int],
+        forwarded: Optional[Sequence[bool]],
+    ) -> None:
+        """Aggiorna i sensori dei registri contenuti nel blocco che inizia a ``start``."""
+        length = len(values)
+        for register, groups in self._index.span(start, length):
+            offset = register - start
+            for group in groups:
+                if group.unit_id is not None and group.unit_id != unit_id:
+                    continue
+                end = offset + group.count
+                if end > length:
+                    # Solo una parte dei registri è nel frame: il valore resterebbe misto.
+                    continue
+                fresh = forwarded is None or any(forwarded[offset:end])
+                layout = group.layout
+                raw = values[offset] if layout is None else layout.decode(values, offset)
+                for entry in group.entries:
+                    if not (fresh or entry.force_update):
+                        continue
+                    try:
+                        value = entry.transform(raw)
+                        for target in entry.targets:
+                            target(raw, value)
+                    except Exception:  # pylint: disable=broad-except
+                        _LOGGER.exception(
+                            "Errore nella callback del registro unit=0x%02X reg=0x%04X",
+                            unit_id,
+                            register,
+                        )
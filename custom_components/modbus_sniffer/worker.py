@@ -0,0 +1,172 @@
+"""Thread opzionale per riassemblaggio e decodifica fuori dal loop di Home Assistant."""
+from __future__ import annotations
+
+import logging
+import threading
+from asyncio import AbstractEventLoop
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional, Sequence, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# (unit_id, registro iniziale, valori) estratti da un frame.
+RegisterBlock = Tuple[int, int, Sequence[int]]
+FrameHandler = Callable[[bytes, Any, float], Optional[RegisterBlock]]
+BatchCallback = Callable[[List[RegisterBlock]], None]
+
+DEFAULT_MAX_BATCH = 256
+
+_STOP = object()
+
+
+class DecodeWorker:
+    """Esegue riassemblaggio e decodifica in un thread dedicato.
+
+    Le sorgenti passate a :meth:`submit` (oggetti con ``reassembler``, ``frames``
+    e ``reset()``, passati anche a ``handle_frame``) appartengono al thread finché
+    il worker è attivo.
+    I blocchi di registri restituiti da ``handle_frame`` tornano al loop a
+    lotti: una sola ``call_soon_threadsafe`` per tutte le letture già in coda.
+    Con la coda piena ``drop_oldest`` scarta la lettura più vecchia ancora in
+    attesa, altrimenti quella appena arrivata.
+    """
+
+    def __init__(
+        self,
+        loop: AbstractEventLoop,
+        handle_frame: FrameHandler,
+        deliver: BatchCallback,
+        *,
+        max_pending: int,
+        drop_oldest: bool = True,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        name: str = "modbus_sniffer_decoder",
+    ) -> None:
+        self._loop = loop
+        self._handle_frame = handle_frame
+        self._deliver = deliver
+        self._max_pending = max_pending
+        self._drop_oldest = drop_oldest
+        self._max_batch = max_batch
+        self._name = name
+        # Letture e marcatori (reset, arresto) in ordine di arrivo.
+        self._items: Deque[Any] = deque()
+        self._ready = threading.Condition(threading.Lock())
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+        self.batches = 0
+
+    @property
+    def pending(self) -> int:
+        """Letture in attesa di essere decodificate."""
+        return len(self._items)
+
+    @property
+    def running(self) -> bool:
+        """Il thread di decodifica è ancora attivo."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Ferma il thread dopo aver consegnato le letture già accodate (bloccante)."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            # Il riferimento resta: un nuovo start() non avvia un secondo thread
+            # sulle stesse sorgenti mentre questo sta ancora decodificando.
+            _LOGGER.warning(
+                "Thread %s ancora attivo dopo %.1f s: %d letture in coda",
+                self._name,
+                timeout,
+                self.pending,
+            )
+            return
+        self._thread = None
+
+    def submit(self, source: Any, data: bytes, now: float) -> bool:
+        """Accoda una lettura; ``False`` se è stata scartata perché la coda era piena."""
+        with self._ready:
+            items = self._items
+            if len(items) >= self._max_pending:
+                self.dropped += 1
+                if not self._drop_oldest or not self._drop_oldest_reading():
+                    return False
+            items.append((source, data, now))
+            self._ready.notify()
+        return True
+
+    def reset(self, source: Any) -> None:
+        """Azzera lo stato della sorgente nel thread, in ordine con le letture accodate."""
+        self._put((source, None, 0.0))
+
+    def _put(self, item: Any) -> None:
+        with self._ready:
+            self._items.append(item)
+            self._ready.notify()
+
+    def _drop_oldest_reading(self) -> bool:
+        """Toglie dalla coda la lettura più vecchia; i marcatori restano al loro posto."""
+        items = self._items
+        for index, item in enumerate(items):
+            if item is not _STOP and item[1] is not None:
+                del items[index]
+                return True
+        return False
+
+    def _run(self) -> None:
+        ready = self._ready
+        items = self._items
+        while True:
+            with ready:
+                while not items:
+                    ready.wait()
+                taken = list(items)
+                items.clear()
+            batch: List[RegisterBlock] = []
+            for item in taken:
+                if item is _STOP:
+                    self._flush(batch)
+                    return
+                source, data, now = item
+                if data is None:
+                    source.reset()
+                else:
+                    self._decode(source, data, now, batch)
+                if len(batch) >= self._max_batch:
+                    if not self._flush(batch):
+                        return
+                    batch = []
+            if not self._flush(batch):
+                return
+
+    def _flush(self, batch: List[RegisterBlock]) -> bool:
+        """Consegna il lotto al loop; ``False`` se il loop è già chiuso."""
+        if not batch:
+            return True
+        self.batches += 1
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, batch)
+        except RuntimeError:
+            # Loop già chiuso: nessuno può più ricevere gli aggiornamenti.
+            return False
+        return True
+
+    def _decode(self, source: Any, data: bytes, now: float, batch: List[RegisterBlock]) -> None:
+        handle_frame = self._handle_frame
+        for frame in source.reassembler.feed(data, now):
+            source.frames += 1
+            try:
+                block = handle_frame(frame, source, now)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Errore nella decodifica del frame %s", frame.hex())
+                continue
+            if block is not None:
+                batch.append(block)
@@ -0,0 +1,307 @@
+"""Test del riassemblaggio dei frame Modbus RTU (``parser.py``, senza Home Assistant)."""
+from __future__ import annotations
+
+import importlib.util
+import math
+import sys
+import unittest
+from pathlib import Path
+
+PARSER_PATH = Path(__file__).resolve().parent.parent / "custom_components" / "modbus_sniffer" / "parser.py"
+
+
+def _load_parser():
+    name = "modbus_sniffer_parser"
+    cached = sys.modules.get(name)
+    if cached is not None:
+        return cached
+    spec = importlib.util.spec_from_file_location(name, PARSER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+parser = _load_parser()
+
+
+def rtu(hex_body: str) -> bytes:
+    """Frame RTU con il CRC calcolato sul corpo esadecimale indicato."""
+    body = bytes.fromhex(hex_body)
+    return body + parser.compute_crc(body).to_bytes(2, "little")
+
+
+READ_REQUEST = rtu("0B 03 01 5E 00 01")
+READ_RESPONSE = rtu("0B 03 02 00 91")
+WRITE_SINGLE = rtu("0B 06 00 05 00 C8")
+
+
+class FrameReassemblerTest(unittest.TestCase):
+    def test_frame_split_across_reads(self) -> None:
+        reassembler = parser.FrameReassembler()
+        self.assertEqual(list(reassembler.feed(READ_RESPONSE[:4], 0.0)), [])
+        self.assertEqual(reassembler.pending, 4)
+        frames = list(reassembler.feed(READ_RESPONSE[4:] + WRITE_SINGLE, 0.01))
+        self.assertEqual(frames, [READ_RESPONSE, WRITE_SINGLE])
+        self.assertEqual(reassembler.pending, 0)
+        self.assertEqual(reassembler.discarded, 0)
+
+    def test_garbage_header_does_not_hold_back_later_frames(self) -> None:
+        # "0B 03 F0" dichiara 240 byte di dati: i frame successivi sono già completi.
+        reassembler = parser.FrameReassembler()
+        frames = list(reassembler.feed(bytes.fromhex("0B 03 F0") + READ_REQUEST + READ_RESPONSE, 0.0))
+        self.assertEqual(frames, [READ_REQUEST, READ_RESPONSE])
+        self.assertEqual(reassembler.discarded, 3)
+        self.assertEqual(reassembler.pending, 0)
+
+    def test_garbage_header_at_end_of_read(self) -> None:
+        reassembler = parser.FrameReassembler()
+        frames = list(reassembler.feed(READ_REQUEST + bytes.fromhex("0B 03 F0 00"), 0.0))
+        self.assertEqual(frames, [READ_REQUEST])
+        self.assertEqual(reassembler.pending, 4)
+        frames = list(reassembler.feed(READ_RESPONSE + WRITE_SINGLE, 0.01))
+        self.assertEqual(frames, [READ_RESPONSE, WRITE_SINGLE])
+        self.assertEqual(reassembler.pending, 0)
+
+    def test_wait_is_bounded_in_time(self) -> None:
+        reassembler = parser.FrameReassembler(max_wait=0.5)
+        self.assertEqual(list(reassembler.feed(bytes.fromhex("0B 03 F0 00 11"), 0.0)), [])
+        self.assertEqual(list(reassembler.feed(b"\x0B", 0.2)), [])
+        self.assertEqual(reassembler.pending, 6)
+        self.assertEqual(list(reassembler.feed(READ_REQUEST, 1.0)), [READ_REQUEST])
+        self.assertEqual(reassembler.pending, 0)
+        self.assertEqual(reassembler.discarded, 6)
+
+
+class PredictedLengthTest(unittest.TestCase):
+    """Lunghezze delle risposte previste dal ``BusState`` a partire dalle richieste."""
+
+    def _reassembler(self):
+        bus = parser.BusState()
+        return bus, parser.FrameReassembler(bus=bus)
+
+    def _feed(self, bus, reassembler, data: bytes, now: float):
+        frames = []
+        for frame in reassembler.feed(data, now):
+            bus.observe(frame, now)
+            frames.append(frame)
+        return frames
+
+    def test_request_predicts_response_length(self) -> None:
+        bus = parser.BusState()
+        self.assertIsNone(bus.expected_length(0x0B, 3))
+        self.assertIsNone(bus.observe(READ_REQUEST, 0.0))
+        self.assertEqual(bus.expected_length(0x0B, 3), 7)
+        self.assertEqual(bus.expected_length(0x0B, 0x83), 5)
+        self.assertIsNone(bus.expected_length(0x0C, 3))
+        request = bus.observe(READ_RESPONSE, 0.1)
+        self.assertIsNotNone(request)
+        self.assertEqual((request.start_addr, request.quantity), (0x015E, 1))
+        self.assertIsNone(bus.expected_length(0x0B, 3))
+
+    def test_response_of_unexpected_length_is_not_matched(self) -> None:
+        bus = parser.BusState()
+        bus.observe(READ_REQUEST, 0.0)
+        self.assertIsNone(bus.observe(rtu("0B 03 04 00 01 00 02"), 0.1))
+        self.assertEqual(bus.expected_length(0x0B, 3), 7)
+
+    def test_pending_request_expires(self) -> None:
+        bus = parser.BusState(timeout=1.0)
+        bus.observe(READ_REQUEST, 0.0)
+        self.assertIsNone(bus.observe(READ_RESPONSE, 2.0))
+
+    def test_split_response_uses_predicted_length(self) -> None:
+        bus, reassembler = self._reassembler()
+        self.assertEqual(self._feed(bus, reassembler, READ_REQUEST, 0.0), [READ_REQUEST])
+        self.assertEqual(self._feed(bus, reassembler, READ_RESPONSE[:5], 0.01), [])
+        self.assertEqual(self._feed(bus, reassembler, READ_RESPONSE[5:], 0.02), [READ_RESPONSE])
+        self.assertIsNone(bus.expected_length(0x0B, 3))
+
+    def test_corrupted_byte_count_falls_back_to_crc_scan(self) -> None:
+        # Risposta attesa di 7 byte con il byte count alterato (0x02 -> 0xF2): il
+        # resto dei 245 byte dichiarati non deve essere atteso.
+        bus, reassembler = self._reassembler()
+        self._feed(bus, reassembler, READ_REQUEST, 0.0)
+        corrupted = bytearray(READ_RESPONSE)
+        corrupted[2] = 0xF2
+        self.assertEqual(self._feed(bus, reassembler, bytes(corrupted) + WRITE_SINGLE[:4], 0.01), [])
+        # In attesa resta solo il frame successivo, non l'header alterato.
+        self.assertEqual(reassembler.pending, 4)
+        self.assertEqual(self._feed(bus, reassembler, WRITE_SINGLE[4:], 0.02), [WRITE_SINGLE])
+
+    def test_split_request_still_awaited_while_response_pending(self) -> None:
+        # Il master ripete la richiesta: la risposta prevista (7 byte) non torna,
+        # ma la forma corta di 8 byte resta in attesa dell'ultimo byte.
+        bus, reassembler = self._reassembler()
+        self._feed(bus, reassembler, READ_REQUEST, 0.0)
+        self.assertEqual(self._feed(bus, reassembler, READ_REQUEST[:7], 0.5), [])
+        self.assertEqual(reassembler.pending, 7)
+        self.assertEqual(self._feed(bus, reassembler, READ_REQUEST[7:], 0.51), [READ_REQUEST])
+
+    def test_split_modbus_frames_with_bus(self) -> None:
+        bus = parser.BusState()
+        frames, leftover = parser.split_modbus_frames(READ_REQUEST + READ_RESPONSE + b"\x0B", bus=bus)
+        self.assertEqual(frames, [READ_REQUEST, READ_RESPONSE])
+        self.assertEqual(leftover, b"\x0B")
+        self.assertIsNone(bus.expected_length(0x0B, 3))
+
+
+class BatchSplitTest(unittest.TestCase):
+    """Split e verifica dei CRC in blocco (NumPy se installato, altrimenti il fallback)."""
+
+    DATAGRAMS = [
+        READ_REQUEST + READ_RESPONSE,
+        bytes.fromhex("0B 03 F0") + WRITE_SINGLE + b"\x00",
+        b"",
+        READ_RESPONSE[:5],
+        rtu("0B 86 03"),
+        WRITE_SINGLE[1:] + READ_REQUEST,
+    ]
+
+    def test_split_matches_scalar_split(self) -> None:
+        expected = [parser.split_modbus_frames(data)[0] for data in self.DATAGRAMS]
+        self.assertEqual(parser.split_frames_batch(self.DATAGRAMS), expected)
+
+    def test_validate_frames_batch(self) -> None:
+        corrupted = READ_RESPONSE[:-1] + bytes([READ_RESPONSE[-1] ^ 0xFF])
+        frames = [READ_REQUEST, corrupted, b"\x0B\x03", WRITE_SINGLE]
+        self.assertEqual(list(parser.validate_frames_batch(frames)), [True, False, False, True])
+
+
+class BitReadDecodeTest(unittest.TestCase):
+    """FC01/FC02: la risposta con 3 byte di dati è lunga quanto una richiesta."""
+
+    REQUEST = rtu("0B 01 00 10 00 18")
+    RESPONSE = rtu("0B 01 03 05 00 81")
+
+    def test_eight_byte_response(self) -> None:
+        decoded = parser.decode_frame(self.RESPONSE)
+        self.assertEqual(decoded.kind, parser.FRAME_READ_RESPONSE)
+        self.assertEqual(len(decoded.values), 24)
+        self.assertEqual(decoded.values[:3], [1, 0, 1])
+        self.assertEqual(decoded.values[23], 1)
+
+    def test_request(self) -> None:
+        decoded = parser.decode_frame(self.REQUEST)
+        self.assertEqual(decoded.kind, parser.FRAME_READ_REQUEST)
+        self.assertEqual((decoded.address, decoded.quantity), (0x0010, 24))
+
+    def test_bus_matches_eight_byte_response(self) -> None:
+        bus = parser.BusState()
+        self.assertIsNone(bus.observe(self.REQUEST, 0.0))
+        self.assertEqual(bus.expected_length(0x0B, 1), 8)
+        request = bus.observe(self.RESPONSE, 0.1)
+        self.assertEqual((request.start_addr, request.quantity), (0x0010, 24))
+
+    def test_bus_treats_unmatched_ambiguous_frame_as_request(self) -> None:
+        # Richiesta all'indirizzo 0x0302: il primo byte dell'indirizzo vale 3.
+        bus = parser.BusState()
+        self.assertIsNone(bus.observe(rtu("0B 02 03 02 00 08"), 0.0))
+        self.assertEqual(bus.expected_length(0x0B, 2), 6)
+        request = bus.observe(rtu("0B 02 01 FF"), 0.1)
+        self.assertEqual((request.start_addr, request.quantity), (0x0302, 8))
+
+
+class FrameDeduplicatorTest(unittest.TestCase):
+    # Due letture di registri diversi con la stessa risposta, come nel log registrato.
+    FIRST_REQUEST = rtu("0B 03 01 5E 00 01")
+    SECOND_REQUEST = rtu("0B 03 01 58 00 01")
+    RESPONSE = rtu("0B 03 02 00 00")
+
+    def _check_all(self, frames, *, with_bus: bool):
+        bus = parser.BusState() if with_bus else None
+        dedup = parser.FrameDeduplicator()
+        results = []
+        for index, frame in enumerate(frames):
+            now = index * 0.01
+            request = bus.observe(frame, now) if bus is not None else None
+            results.append(dedup.check(frame, now, request=request))
+        return results, dedup
+
+    def test_identical_responses_to_different_requests(self) -> None:
+        frames = [self.FIRST_REQUEST, self.RESPONSE, self.SECOND_REQUEST, self.RESPONSE]
+        for with_bus in (True, False):
+            results, dedup = self._check_all(frames, with_bus=with_bus)
+            self.assertEqual(results, [None] * 4)
+            self.assertEqual(dedup.duplicates, 0)
+
+    def test_repeated_request_response_pair(self) -> None:
+        frames = [self.FIRST_REQUEST, self.RESPONSE] * 2
+        for with_bus in (True, False):
+            results, _ = self._check_all(frames, with_bus=with_bus)
+            self.assertEqual(results, [None, None, parser.DEDUP_DUPLICATE, parser.DEDUP_DUPLICATE])
+
+    def test_write_single_echo(self) -> None:
+        results, dedup = self._check_all([WRITE_SINGLE, WRITE_SINGLE, WRITE_SINGLE], with_bus=True)
+        self.assertEqual(results, [None, parser.DEDUP_ECHO, parser.DEDUP_DUPLICATE])
+        self.assertEqual((dedup.echoes, dedup.duplicates), (1, 1))
+
+    def test_window_expires(self) -> None:
+        dedup = parser.FrameDeduplicator(window=0.5)
+        self.assertIsNone(dedup.check(READ_REQUEST, 0.0))
+        self.assertIsNone(dedup.check(READ_REQUEST, 1.0))
+
+
+
+class RegisterLayoutTest(unittest.TestCase):
+    BIG = parser.ORDER_BIG
+    LITTLE = parser.ORDER_LITTLE
+
+    def _decode(self, data_type, words, word_order=BIG, byte_order=BIG):
+        return parser.register_layout(data_type, word_order, byte_order).decode(words)
+
+    def test_16_bit(self) -> None:
+        self.assertEqual(self._decode("uint16", [0xFFFF]), 0xFFFF)
+        self.assertEqual(self._decode("int16", [0x0091]), 145)
+        self.assertEqual(self._decode("int16", [0xFFFF]), -1)
+        self.assertEqual(self._decode("int16", [0x8000]), -32768)
+        self.assertEqual(self._decode("int16", [0x3412], byte_order=self.LITTLE), 0x1234)
+        self.assertEqual(self._decode("int16", [0xF6FF], byte_order=self.LITTLE), -10)
+
+    def test_uint32_orders(self) -> None:
+        # 0x12345678 con tutte le combinazioni di ordine delle parole e dei byte.
+        cases = {
+            (self.BIG, self.BIG): [0x1234, 0x5678],
+            (self.LITTLE, self.BIG): [0x5678, 0x1234],
+            (self.BIG, self.LITTLE): [0x3412, 0x7856],
+            (self.LITTLE, self.LITTLE): [0x7856, 0x3412],
+        }
+        for (word_order, byte_order), words in cases.items():
+            with self.subTest(word_order=word_order, byte_order=byte_order):
+                self.assertEqual(self._decode("uint32", words, word_order, byte_order), 0x12345678)
+
+    def test_int32_negative(self) -> None:
+        self.assertEqual(self._decode("int32", [0xFFFF, 0xFFFE]), -2)
+        self.assertEqual(self._decode("int32", [0xFFFE, 0xFFFF], word_order=self.LITTLE), -2)
+        self.assertEqual(self._decode("int32", [0x8000, 0x0000]), -(2**31))
+        self.assertEqual(self._decode("uint32", [0xFFFF, 0xFFFE]), 0xFFFFFFFE)
+
+    def test_float32(self) -> None:
+        # 12.5 = 0x41480000, -1.5 = 0xBFC00000
+        self.assertEqual(self._decode("float32", [0x4148, 0x0000]), 12.5)
+        self.assertEqual(self._decode("float32", [0x0000, 0x4148], word_order=self.LITTLE), 12.5)
+        self.assertEqual(self._decode("float32", [0x4841, 0x0000], byte_order=self.LITTLE), 12.5)
+        self.assertEqual(self._decode("float32", [0xBFC0, 0x0000]), -1.5)
+
+    def test_float32_special_values(self) -> None:
+        self.assertTrue(math.isnan(self._decode("float32", [0x7FC0, 0x0000])))
+        self.assertEqual(self._decode("float32", [0x7F80, 0x0000]), math.inf)
+        self.assertEqual(self._decode("float32", [0xFF80, 0x0000]), -math.inf)
+        self.assertEqual(self._decode("float32", [0x0000, 0x7F80], word_order=self.LITTLE), math.inf)
+
+    def test_offset_in_block(self) -> None:
+        layout = parser.register_layout("int32")
+        self.assertEqual(layout.count, 2)
+        self.assertEqual(layout.decode([1, 2, 0xFFFF, 0xFFFE, 3], 2), -2)
+
+    def test_layouts_are_shared(self) -> None:
+        self.assertIs(parser.register_layout("float32"), parser.register_layout("float32"))
+        self.assertIsNot(
+            parser.register_layout("float32"), parser.register_layout("float32", self.LITTLE)
+        )
+        # L'ordine delle parole non conta per i valori a 16 bit.
+        self.assertIs(parser.register_layout("int16", self.LITTLE), parser.register_layout("int16"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+"""Test dell'archivio dei registri (``registers.py``, senza Home Assistant)."""
+from __future__ import annotations
+
+import importlib.util
+import math
+import sys
+import unittest
+from pathlib import Path
+
+REGISTERS_PATH = (
+    Path(__file__).resolve().parent.parent / "custom_components" / "modbus_sniffer" / "registers.py"
+)
+
+
+def _load_registers():
+    name = "modbus_sniffer_registers"
+    cached = sys.modules.get(name)
+    if cached is not None:
+        return cached
+    spec = importlib.util.spec_from_file_location(name, REGISTERS_PATH)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+registers = _load_registers()
+
+
+class UnitRegistersTest(unittest.TestCase):
+    def test_set_has_get(self) -> None:
+        unit = registers.UnitRegisters(11)
+        self.assertFalse(unit.has(0x3F))
+        self.assertIsNone(unit.get(0x3F))
+        self.assertIsNone(unit.updated_at(0x3F))
+        unit.set(0x3F, 0, 5.0)
+        self.assertTrue(unit.has(0x3F))
+        self.assertEqual(unit.get(0x3F), 0)
+        self.assertEqual(unit.updated_at(0x3F), 5.0)
+        unit.set(0x3F, 0xFFFF, 6.0)
+        self.assertEqual(unit.get(0x3F), 0xFFFF)
+        self.assertEqual(unit.count, 1)
+        self.assertFalse(unit.has(0x3E))
+        self.assertFalse(unit.has(0x40))
+
+    def test_pages_allocated_on_first_write(self) -> None:
+        unit = registers.UnitRegisters(11, track_forwarded=True)
+        self.assertEqual(unit.pages, 0)
+        unit.set(0x0001, 1, 1.0)
+        unit.set(0x00FF, 2, 1.0)
+        self.assertEqual(unit.pages, 1)
+        unit.set(0xFFFF, 3, 1.0)
+        self.assertEqual(unit.pages, 2)
+        self.assertEqual(list(unit.registers()), [0x0001, 0x00FF, 0xFFFF])
+
+    def test_forwarded_at_only_when_tracked(self) -> None:
+        tracked = registers.UnitRegisters(1, track_forwarded=True)
+        tracked.set(7, 1, 2.0)
+        self.assertEqual(tracked.forwarded_at(7), -math.inf)
+        tracked.set(7, 1, 3.0, forwarded=True)
+        self.assertEqual(tracked.forwarded_at(7), 3.0)
+        plain = registers.UnitRegisters(1)
+        plain.set(7, 1, 3.0, forwarded=True)
+        self.assertEqual(plain.forwarded_at(7), -math.inf)
+
+    def test_snapshot(self) -> None:
+        unit = registers.UnitRegisters(11)
+        unit.set(0x0300, 20, 2.0)
+        unit.set(0x0004, 10, 1.0)
+        self.assertEqual(unit.snapshot(), {0x0004: (10, 1.0), 0x0300: (20, 2.0)})
+
+
+class RegisterStoreTest(unittest.TestCase):
+    def test_units_created_on_demand(self) -> None:
+        store = registers.RegisterStore()
+        self.assertIsNone(store.lookup(11))
+        self.assertIsNone(store.get(11, 4))
+        store.unit(11).set(4, 355, 1.0)
+        self.assertIs(store.lookup(11), store.unit(11))
+        self.assertEqual(store.get(11, 4), 355)
+        self.assertIsNone(store.get(12, 4))
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.snapshot(), {11: {4: (355, 1.0)}})
+
+    def test_clear(self) -> None:
+        store = registers.RegisterStore()
+        store.unit(11).set(4, 355, 1.0)
+        store.latest_unit[4] = 11
+        store.clear()
+        self.assertIsNone(store.lookup(11))
+        self.assertIsNone(store.latest(4))
+        self.assertEqual(len(store), 0)
+
+
+class LatestUnitIndexTest(unittest.TestCase):
+    def _write(self, store, unit_id: int, register: int, value: int, now: float) -> None:
+        # Come il hub: chi scrive nell'archivio aggiorna l'indice.
+        store.unit(unit_id).set(register, value, now)
+        store.latest_unit[register] = unit_id
+
+    def test_unseen_register(self) -> None:
+        store = registers.RegisterStore()
+        self.assertIsNone(store.latest(4))
+        self.assertEqual(store.latest_unit[4], -1)
+
+    def test_follows_last_writer(self) -> None:
+        store = registers.RegisterStore()
+        self._write(store, 11, 4, 355, 1.0)
+        self._write(store, 12, 4, 100, 2.0)
+        self.assertEqual(store.latest(4).unit_id, 12)
+        self._write(store, 11, 4, 356, 3.0)
+        latest = store.latest(4)
+        self.assertEqual(latest.unit_id, 11)
+        self.assertEqual(latest.get(4), 356)
+
+    def test_registers_are_independent(self) -> None:
+        store = registers.RegisterStore()
+        self._write(store, 11, 4, 1, 1.0)
+        self._write(store, 12, 5, 2, 2.0)
+        self.assertEqual(store.latest(4).unit_id, 11)
+        self.assertEqual(store.latest(5).unit_id, 12)
+        self.assertIsNone(store.latest(6))
+
+    def test_unit_ids_up_to_255(self) -> None:
+        store = registers.RegisterStore()
+        self._write(store, 255, 0xFFFF, 7, 1.0)
+        self.assertEqual(store.latest(0xFFFF).unit_id, 255)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+"""Test delle trasformazioni compilate e della tabella dei sensori (``transforms.py``)."""
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+import unittest
+from pathlib import Path
+
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "modbus_sniffer"
+# Package registrato senza eseguire ``__init__.py``, che richiede Home Assistant.
+PACKAGE_NAME = "modbus_sniffer"
+
+
+def _load(name: str):
+    if PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(PACKAGE_NAME)
+        package.__path__ = [str(PACKAGE_DIR)]
+        sys.modules[PACKAGE_NAME] = package
+    return importlib.import_module(f"{PACKAGE_NAME}.{name}")
+
+
+transforms = _load("transforms")
+parser = _load("parser")
+
+
+class _Blocks:
+    """Consegna dei blocchi con la stessa forma del hub."""
+
+    def __init__(self) -> None:
+        self.subscribers = []
+
+    def subscribe(self, deliver):
+        self.subscribers.append(deliver)
+        return lambda: self.subscribers.remove(deliver)
+
+    def deliver(self, unit_id, start, values, forwarded=None) -> None:
+        for deliver in list(self.subscribers):
+            deliver(unit_id, start, values, forwarded)
+
+
+class CompileTransformTest(unittest.TestCase):
+    def test_identity(self) -> None:
+        transform = transforms.compile_transform(1, 0, None)
+        self.assertEqual(transform(145), 145.0)
+        self.assertIsInstance(transform(145), float)
+
+    def test_scale_and_offset(self) -> None:
+        self.assertEqual(transforms.compile_transform(0.5, 0, None)(145), 72.5)
+        self.assertEqual(transforms.compile_transform(2, -50, None)(145), 240)
+
+    def test_precision_rounding(self) -> None:
+        self.assertEqual(transforms.compile_transform(0.1, 0, 1)(145), 14.5)
+        self.assertEqual(transforms.compile_transform(0.1, -50, 1)(755), 25.5)
+        self.assertEqual(transforms.compile_transform(0.01, 0, 2)(1), 0.01)
+        self.assertEqual(transforms.compile_transform(1, 0, 0)(7), 7)
+        self.assertEqual(transforms.compile_transform(0.001, 0, 1)(1234), 1.2)
+
+    def test_matches_reference_formula(self) -> None:
+        for scale, offset, precision in ((0.1, 0, 1), (0.1, -50, 1), (0.01, 0, 2), (3, 1.5, None)):
+            transform = transforms.compile_transform(scale, offset, precision)
+            for raw in (0, 1, 145, 999, 0xFFFF):
+                expected = raw * scale + offset
+                if precision is not None:
+                    expected = round(expected, precision)
+                self.assertEqual(transform(raw), expected)
+
+    def test_state_map(self) -> None:
+        transform = transforms.compile_transform(0.1, 0, 1, {0: "Spento", 1: "Acceso"})
+        self.assertEqual(transform(0), "Spento")
+        self.assertEqual(transform(1), "Acceso")
+        # Valori non mappati: il grezzo come stringa, senza scala.
+        self.assertEqual(transform(7), "7")
+
+
+class TransformTableTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.blocks = _Blocks()
+        self.table = transforms.TransformTable(self.blocks.subscribe)
+
+    def _add(self, unit_id, register, **options):
+        received = []
+        params = {"scale": 1, "offset": 0, "precision": None}
+        params.update(options)
+        _, remove = self.table.add(
+            unit_id, register, lambda raw, value: received.append((raw, value)), **params
+        )
+        return received, remove
+
+    def test_sensors_with_same_transform_share_entry(self) -> None:
+        first, _ = self._add(11, 4, scale=0.1, precision=1)
+        second, _ = self._add(11, 4, scale=0.1, precision=1)
+        other, _ = self._add(11, 4, scale=0.01, precision=2)
+        self.assertEqual(len(self.table), 2)
+        self.assertEqual(len(self.blocks.subscribers), 1)
+        self.blocks.deliver(11, 3, [1, 145, 2])
+        self.assertEqual(first, [(145, 14.5)])
+        self.assertEqual(second, [(145, 14.5)])
+        self.assertEqual(other, [(145, 1.45)])
+
+    def test_removal(self) -> None:
+        first, remove_first = self._add(11, 4)
+        second, remove_second = self._add(11, 4)
+        remove_first()
+        remove_first()
+        self.assertEqual(len(self.table), 1)
+        self.blocks.deliver(11, 4, [1])
+        self.assertEqual((first, second), ([], [(1, 1.0)]))
+        remove_second()
+        self.assertEqual(len(self.table), 0)
+        # Senza sensori la tabella non riceve più blocchi dal hub.
+        self.assertEqual(self.blocks.subscribers, [])
+        self._add(11, 4)
+        self.assertEqual(len(self.blocks.subscribers), 1)
+
+    def test_registers_picked_from_block(self) -> None:
+        low, _ = self._add(11, 0x10)
+        high, _ = self._add(11, 0x7C)
+        outside, _ = self._add(11, 0x7D)
+        values = list(range(100, 225))
+        self.blocks.deliver(11, 0x00, values)
+        self.assertEqual(low, [(116, 116.0)])
+        self.assertEqual(high, [(224, 224.0)])
+        self.assertEqual(outside, [])
+
+    def test_unit_filter(self) -> None:
+        targeted, _ = self._add(11, 4)
+        wildcard, _ = self._add(None, 4)
+        self.blocks.deliver(12, 4, [7])
+        self.assertEqual(targeted, [])
+        self.assertEqual(wildcard, [(7, 7.0)])
+
+    def test_layout_needs_whole_value_in_block(self) -> None:
+        received, _ = self._add(11, 4, layout=parser.register_layout("int32"))
+        self.blocks.deliver(11, 3, [0, 0xFFFF])
+        self.assertEqual(received, [])
+        self.blocks.deliver(11, 4, [0xFFFF, 0xFFFE])
+        self.assertEqual(received, [(-2, -2.0)])
+
+    def test_change_only_and_force_update(self) -> None:
+        plain, _ = self._add(11, 4)
+        forced, _ = self._add(11, 4, force_update=True)
+        self.blocks.deliver(11, 4, [5, 6], [False, True])
+        self.assertEqual(plain, [])
+        self.assertEqual(forced, [(5, 5.0)])
+
+    def test_failing_sensor_does_not_stop_others(self) -> None:
+        def _fail(raw, value):
+            raise RuntimeError("sensore")
+
+        self.table.add(11, 4, _fail, scale=2, offset=0, precision=None)
+        received, _ = self._add(11, 4)
+        with self.assertLogs(transforms.__name__, "ERROR"):
+            self.blocks.deliver(11, 4, [3])
+        self.assertEqual(received, [(3, 3.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
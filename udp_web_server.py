@@ -8,6 +8,7 @@ import argparse
 import html
 import json
 import socket
+import struct
 import threading
 import time
 from collections import Counter, deque
@@ -15,10 +16,11 @@ from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from queue import SimpleQueue
 from pathlib import Path
-from typing import Deque, Iterable, List, Optional, Tuple
+from typing import Callable, Deque, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 from urllib.parse import parse_qs, urlparse
-from itertools import count
+from functools import lru_cache
+from itertools import chain, count
 
 UDP_BUFFER_SIZE = 2048
 MESSAGE_HISTORY = 2
@@ -88,16 +90,109 @@ def make_raw_field(label: str, data: bytes) -> dict:
     }
 
 
-def compute_crc(data: bytes) -> int:
-    crc = 0xFFFF
-    for byte in data:
-        crc ^= byte
+def _build_crc_table() -> Tuple[int, ...]:
+    table: List[int] = []
+    for byte in range(256):
+        crc = byte
         for _ in range(8):
             if crc & 1:
                 crc = (crc >> 1) ^ 0xA001
             else:
                 crc >>= 1
-    return crc & 0xFFFF
+        table.append(crc)
+    return tuple(table)
+
+
+CRC_TABLE: Tuple[int, ...] = _build_crc_table()
+
+
+class CrcState:
+    """Stato CRC Modbus riprendibile, estendibile un byte alla volta."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: int = 0xFFFF) -> None:
+        self.value = value
+
+    def update_byte(self, byte: int) -> int:
+        crc = self.value
+        crc = (crc >> 8) ^ CRC_TABLE[(crc ^ byte) & 0xFF]
+        self.value = crc
+        return crc
+
+    def update(self, data: Iterable[int]) -> int:
+        crc = self.value
+        table = CRC_TABLE
+        for byte in data:
+            crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+        self.value = crc
+        return crc
+
+    def copy(self) -> "CrcState":
+        return CrcState(self.value)
+
+    def matches(self, low: int, high: int) -> bool:
+        return self.value == (low | (high << 8))
+
+
+def compute_crc(data: bytes) -> int:
+    crc = 0xFFFF
+    table = CRC_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def _crc_ok(frame: bytes) -> bool:
+    length = len(frame)
+    if length < 4:
+        return False
+    return compute_crc(frame[:-2]) == frame[length - 2] | (frame[length - 1] << 8)
+
+
+@lru_cache(maxsize=None)
+def _numpy_backend():
+    # NumPy è opzionale e viene importato solo dalle verifiche in blocco.
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np, np.array(CRC_TABLE, dtype=np.uint16)
+
+
+def _batch_crc_ok(np, table, data, starts, lengths):
+    # Candidati per lunghezza decrescente: a ogni colonna quelli attivi sono un prefisso.
+    order = np.argsort(-lengths, kind="stable")
+    starts = starts[order]
+    bodies = lengths[order] - 2
+    crc = np.full(len(starts), 0xFFFF, dtype=np.uint16)
+    columns = np.arange(int(bodies[0]))
+    active = len(bodies) - np.searchsorted(bodies[::-1], columns, side="right")
+    for column, count_active in enumerate(active.tolist()):
+        head = crc[:count_active]
+        crc[:count_active] = (head >> 8) ^ table[(head ^ data[starts[:count_active] + column]) & 0xFF]
+    ends = starts + bodies
+    received = data[ends].astype(np.uint16) | (data[ends + 1].astype(np.uint16) << 8)
+    result = np.empty(len(starts), dtype=bool)
+    result[order] = crc == received
+    return result
+
+
+def validate_frames_batch(frames: List[bytes]):
+    # Con NumPy il CRC è calcolato per colonne su tutti i frame insieme.
+    backend = _numpy_backend()
+    if backend is None:
+        return [_crc_ok(frame) for frame in frames]
+    np, table = backend
+    lengths = np.fromiter((len(frame) for frame in frames), dtype=np.int64, count=len(frames))
+    result = np.zeros(len(frames), dtype=bool)
+    valid = lengths >= 4
+    if not valid.any():
+        return result
+    data = np.frombuffer(b"".join(frames), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    result[valid] = _batch_crc_ok(np, table, data, starts[valid], lengths[valid])
+    return result
 
 
 def append_packet_log(timestamp: str, data: bytes) -> None:
@@ -151,13 +246,33 @@ def read_packet_log(max_lines: Optional[int] = None) -> List[Tuple[str, bytes]]:
     return entries
 
 
-def extract_fc03_reads(entries: Iterable[Tuple[str, bytes]]) -> List[dict]:
-    rows: List[dict] = []
+def split_log_entries(entries: Iterable[Tuple[str, bytes]]) -> List[Tuple[str, List[bytes]]]:
+    """Suddivide le voci del log in frame Modbus.
+
+    I datagrammi che non contengono frame riconoscibili vengono riverificati in
+    blocco e mantenuti interi solo se il loro CRC è valido.
+    """
+    split_entries: List[Tuple[str, List[bytes]]] = []
+    unsplit: List[int] = []
     for timestamp, data in entries:
         if not data:
             continue
         frames, _ = split_modbus_frames(data)
-        frame_list = frames if frames else [data]
+        if not frames:
+            unsplit.append(len(split_entries))
+            frames = [data]
+        split_entries.append((timestamp, frames))
+    if unsplit:
+        checks = validate_frames_batch([split_entries[idx][1][0] for idx in unsplit])
+        for idx, crc_ok in zip(unsplit, checks):
+            if not crc_ok:
+                split_entries[idx] = (split_entries[idx][0], [])
+    return split_entries
+
+
+def extract_fc03_reads(entries: Iterable[Tuple[str, bytes]]) -> List[dict]:
+    rows: List[dict] = []
+    for timestamp, frame_list in split_log_entries(entries):
         pending_request: Optional[tuple[int, int]] = None
         for frame in frame_list:
             if len(frame) < 3:
@@ -219,11 +334,7 @@ def extract_fc03_reads(entries: Iterable[Tuple[str, bytes]]) -> List[dict]:
 
 def extract_fc06_writes(entries: Iterable[Tuple[str, bytes]]) -> List[dict]:
     rows: List[dict] = []
-    for timestamp, data in entries:
-        if not data:
-            continue
-        frames, _ = split_modbus_frames(data)
-        frame_list = frames if frames else [data]
+    for timestamp, frame_list in split_log_entries(entries):
         pending: Optional[Tuple[int, int]] = None
         for frame in frame_list:
             if len(frame) < 3:
@@ -322,77 +433,468 @@ def prepare_history_filters(query: dict[str, list[str]]) -> dict:
     }
 
 
-def _candidate_frame_lengths(func: Optional[int], max_len: int) -> List[int]:
-    lengths: set[int] = set()
-    if func is None:
-        return list(range(4, max_len + 1))
-
-    if func in (1, 2):
-        lengths.add(8)
-        for byte_count in range(1, min(252, max_len - 4)):
-            candidate = 5 + byte_count
-            if candidate <= max_len:
-                lengths.add(candidate)
-    elif func in (3, 4):
-        lengths.add(8)
-        max_bc = min(2 * 125, max_len - 5)
-        for byte_count in range(2, max_bc + 1, 2):
-            candidate = 5 + byte_count
-            if candidate <= max_len:
-                lengths.add(candidate)
-    elif func in (5, 6):
-        lengths.add(8)
-    elif func == 15:
-        lengths.add(8)
-        max_bc = min(246, max_len - 9)
-        for byte_count in range(1, max_bc + 1):
-            candidate = 9 + byte_count
-            if candidate <= max_len:
-                lengths.add(candidate)
-    elif func == 16:
-        lengths.add(8)
-        max_bc = min(2 * 123, max_len - 9)
-        for byte_count in range(2, max_bc + 1, 2):
-            candidate = 9 + byte_count
-            if candidate <= max_len:
-                lengths.add(candidate)
-    elif func & 0x80:
-        lengths.add(5)
-
-    if not lengths:
-        lengths.update(range(4, max_len + 1))
-
-    return sorted(length for length in lengths if 4 <= length <= max_len)
-
-
-def split_modbus_frames(data: bytes) -> Tuple[List[bytes], bytes]:
+MIN_RTU_FRAME_LENGTH = 4
+MAX_RTU_FRAME_LENGTH = 256
+DEFAULT_MAX_WAIT = 1.0
+
+
+def rtu_silence(baudrate: int, chars: float = 3.5) -> float:
+    """Durata in secondi del silenzio di ``chars`` caratteri fra due frame RTU."""
+    if baudrate > 19200:
+        return 0.00175 * chars / 3.5
+    return chars * 11 / baudrate
+
+
+_BYTE_COUNT_OFFSETS = {1: 2, 2: 2, 3: 2, 4: 2, 15: 6, 16: 6}
+_FIXED_FRAME_LENGTHS = {5: (8,), 6: (8,)}
+_EXCEPTION_FRAME_LENGTHS = (5,)
+
+
+def _build_length_table() -> dict[Tuple[int, int], Tuple[int, ...]]:
+    table: dict[Tuple[int, int], Tuple[int, ...]] = {}
+    for func, offset in _BYTE_COUNT_OFFSETS.items():
+        header = offset + 1
+        for byte_count in range(256):
+            lengths = {8}
+            if func in (1, 2, 15):
+                valid = byte_count >= 1
+            else:
+                valid = byte_count >= 2 and byte_count % 2 == 0
+            if valid and header + byte_count + 2 <= MAX_RTU_FRAME_LENGTH:
+                lengths.add(header + byte_count + 2)
+            table[(func, byte_count)] = tuple(sorted(lengths))
+    return table
+
+
+_LENGTH_TABLE = _build_length_table()
+_SCAN_LENGTHS = tuple(
+    tuple(range(MIN_RTU_FRAME_LENGTH, available + 1))
+    for available in range(MAX_RTU_FRAME_LENGTH + 1)
+)
+
+
+def _frame_lengths(data, idx: int, available: int) -> Optional[Tuple[int, ...]]:
+    func = data[idx + 1]
+    if func & 0x80:
+        return _EXCEPTION_FRAME_LENGTHS
+    fixed = _FIXED_FRAME_LENGTHS.get(func)
+    if fixed is not None:
+        return fixed
+    offset = _BYTE_COUNT_OFFSETS.get(func)
+    if offset is None:
+        return None
+    if offset >= available:
+        return _FIXED_FRAME_LENGTHS[6]
+    return _LENGTH_TABLE[(func, data[idx + offset])]
+
+
+def _match_each(data, idx: int, lengths, available: int) -> int:
+    with memoryview(data) as view:
+        for length in lengths:
+            if length > available:
+                break
+            end = idx + length
+            if compute_crc(view[idx : end - 2]) == data[end - 2] | (data[end - 1] << 8):
+                return length
+    return 0
+
+
+def _match_rolling(
+    data,
+    idx: int,
+    lengths,
+    available: int,
+    *,
+    checked: int = 0,
+    state: Optional[CrcState] = None,
+    folded: int = 0,
+) -> Tuple[int, int]:
+    # Un solo CRC progressivo verifica tutte le lunghezze candidate dell'offset.
+    crc = state.value if state is not None else 0xFFFF
+    table = CRC_TABLE
+    pos = idx + folded
+    for length in lengths:
+        if length > available:
+            break
+        if length <= checked:
+            continue
+        end = idx + length - 2
+        while pos < end:
+            crc = (crc >> 8) ^ table[(crc ^ data[pos]) & 0xFF]
+            pos += 1
+        if crc == data[end] | (data[end + 1] << 8):
+            return length, pos - idx
+    if state is not None:
+        state.value = crc
+    return 0, pos - idx
+
+
+def _find_complete_frame(data, start: int, end: int, limit: int) -> Tuple[int, int]:
+    # Primo frame già completo (lunghezza dall'header e CRC valido) a partire da ``start``.
+    idx = start
+    while idx + MIN_RTU_FRAME_LENGTH <= end:
+        available = min(limit, end - idx)
+        lengths = _frame_lengths(data, idx, available)
+        if lengths is not None:
+            length, _ = _match_rolling(data, idx, lengths, available)
+            if length:
+                return idx, length
+        idx += 1
+    return -1, 0
+
+
+def split_modbus_frames(data: bytes, *, rolling: bool = True) -> Tuple[List[bytes], bytes]:
     frames: List[bytes] = []
     idx = 0
     n = len(data)
-    while idx + 4 <= n:
-        func = data[idx + 1] if idx + 1 < n else None
-        max_len = min(256, n - idx)
-        candidates = _candidate_frame_lengths(func, max_len)
-        found = False
-        for length in candidates:
-            if idx + length > n:
-                continue
-            frame = data[idx : idx + length]
-            if len(frame) < 4:
-                continue
-            calc_crc = compute_crc(frame[:-2])
-            frame_crc = int.from_bytes(frame[-2:], "little")
-            if calc_crc == frame_crc:
-                frames.append(frame)
-                idx += length
-                found = True
-                break
-        if not found:
+    while idx + MIN_RTU_FRAME_LENGTH <= n:
+        available = min(MAX_RTU_FRAME_LENGTH, n - idx)
+        lengths = _frame_lengths(data, idx, available)
+        if lengths is None:
+            lengths = _SCAN_LENGTHS[available]
+        if rolling:
+            matched, _ = _match_rolling(data, idx, lengths, available)
+        else:
+            matched = _match_each(data, idx, lengths, available)
+        if matched:
+            frames.append(bytes(data[idx : idx + matched]))
+            idx += matched
+        else:
             idx += 1
-    leftover = data[idx:]
+    leftover = bytes(data[idx:])
     return frames, leftover
 
 
+@lru_cache(maxsize=None)
+def _numpy_length_tables():
+    # ``_frame_lengths`` come tabelle: offset del byte count e lunghezze per (funzione, byte count).
+    np, _ = _numpy_backend()
+    count_offsets = np.zeros(256, dtype=np.int64)
+    lengths = np.zeros((2, 256, 256), dtype=np.int64)
+    for func in range(256):
+        if func & 0x80:
+            lengths[0, func, :] = _EXCEPTION_FRAME_LENGTHS[0]
+        elif func in _FIXED_FRAME_LENGTHS:
+            lengths[0, func, :] = _FIXED_FRAME_LENGTHS[func][0]
+    for (func, byte_count), candidates in _LENGTH_TABLE.items():
+        count_offsets[func] = _BYTE_COUNT_OFFSETS[func]
+        for slot, length in enumerate(candidates):
+            lengths[slot, func, byte_count] = length
+    return count_offsets, lengths
+
+
+def split_frames_batch(datagrams: List[bytes]) -> List[List[bytes]]:
+    """Divide molti datagrammi in frame verificando in blocco i CRC dei candidati.
+
+    Le lunghezze candidate di ogni offset vengono dall'header, come in
+    ``split_modbus_frames``; i frame validi sono poi scelti da sinistra a destra.
+    Gli offset con funzione sconosciuta non propongono candidati.
+    """
+    backend = _numpy_backend()
+    if backend is None:
+        return [split_modbus_frames(data)[0] for data in datagrams]
+    np, table = backend
+    count_offsets, length_table = _numpy_length_tables()
+    joined = b"".join(datagrams)
+    total = len(joined)
+    data = np.frombuffer(joined + bytes(8), dtype=np.uint8)
+    sizes = np.fromiter((len(d) for d in datagrams), dtype=np.int64, count=len(datagrams))
+    ends = np.cumsum(sizes)
+    positions = np.arange(total)
+    available = np.minimum(np.repeat(ends, sizes) - positions, MAX_RTU_FRAME_LENGTH)
+    funcs = data[1 : total + 1]
+    byte_counts = data[positions + count_offsets[funcs]]
+    starts = np.concatenate((positions, positions))
+    lengths = np.concatenate((length_table[0, funcs, byte_counts], length_table[1, funcs, byte_counts]))
+    keep = (lengths >= MIN_RTU_FRAME_LENGTH) & (lengths <= np.concatenate((available, available)))
+    starts = starts[keep]
+    lengths = lengths[keep]
+    frames: List[List[bytes]] = [[] for _ in datagrams]
+    if not len(starts):
+        return frames
+    valid = _batch_crc_ok(np, table, data, starts, lengths)
+    order = np.lexsort((lengths[valid], starts[valid]))
+    starts = starts[valid][order]
+    lengths = lengths[valid][order]
+    owners = np.searchsorted(ends, starts, side="right")
+    first = ends - sizes
+    current = -1
+    free = 0
+    for start, length, owner in zip(starts.tolist(), lengths.tolist(), owners.tolist()):
+        if owner != current:
+            current = owner
+            free = int(first[owner])
+        if start < free:
+            continue
+        frames[owner].append(joined[start : start + length])
+        free = start + length
+    return frames
+
+
+class FrameReassembler:
+    """Ricostruisce i frame Modbus RTU da uno stream, mantenendo i frame parziali.
+
+    Con ``silence`` una pausa fra due letture più lunga della soglia chiude il
+    segmento in attesa: il CRC conferma soltanto i frame delimitati dal tempo.
+    Un frame incompleto non trattiene quelli già completi che lo seguono e viene
+    atteso al più ``max_wait`` secondi.
+
+    Con ``keep_discarded`` i byte scartati restano disponibili in
+    :meth:`take_discarded`, per mostrare uno stream che non contiene frame validi.
+    """
+
+    def __init__(
+        self,
+        max_frame_length: int = MAX_RTU_FRAME_LENGTH,
+        *,
+        silence: Optional[float] = None,
+        max_wait: Optional[float] = DEFAULT_MAX_WAIT,
+        keep_discarded: bool = False,
+    ) -> None:
+        self._max_frame_length = max_frame_length
+        self._discarded_bytes: Optional[bytearray] = bytearray() if keep_discarded else None
+        self._max_wait = max_wait
+        self._waiting_since: Optional[float] = None
+        self._now = 0.0
+        self._silence = silence
+        self._last_arrival: Optional[float] = None
+        self._buffer = bytearray()
+        self._pos = 0
+        self._checked = 0
+        self._crc = CrcState()
+        self._folded = 0
+        self.discarded = 0
+        self.boundaries = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer) - self._pos
+
+    def feed(self, data: bytes, now: Optional[float] = None) -> Iterator[bytes]:
+        if now is None:
+            now = time.monotonic()
+        self._now = now
+        closed: List[bytes] = []
+        if self._silence is not None:
+            last = self._last_arrival
+            self._last_arrival = now
+            if last is not None and now - last > self._silence and self.pending:
+                closed = self._close_segment()
+        waiting_since = self._waiting_since
+        if (
+            waiting_since is not None
+            and self._max_wait is not None
+            and now - waiting_since > self._max_wait
+        ):
+            closed.extend(self._flush())
+        self._compact()
+        self._buffer += data
+        if closed:
+            return chain(closed, self._drain())
+        return self._drain()
+
+    def reset(self) -> bytes:
+        leftover = bytes(self._buffer[self._pos :])
+        self._buffer.clear()
+        self._pos = 0
+        self._last_arrival = None
+        self._restart_scan()
+        return leftover
+
+    def take_discarded(self) -> bytes:
+        """Restituisce e azzera i byte scartati dall'ultima chiamata."""
+        kept = self._discarded_bytes
+        if not kept:
+            return b""
+        data = bytes(kept)
+        kept.clear()
+        return data
+
+    def _discard(self, start: int, end: int) -> None:
+        self.discarded += end - start
+        if self._discarded_bytes is not None:
+            self._discarded_bytes += self._buffer[start:end]
+
+    def _close_segment(self) -> List[bytes]:
+        self.boundaries += 1
+        return self._flush()
+
+    def _flush(self) -> List[bytes]:
+        frames: List[bytes] = []
+        while True:
+            frame = self._next_frame(final=True)
+            if frame is None:
+                break
+            frames.append(frame)
+        self._compact()
+        return frames
+
+    def _restart_scan(self) -> None:
+        self._checked = 0
+        self._crc.value = 0xFFFF
+        self._folded = 0
+        self._waiting_since = None
+
+    def _compact(self) -> None:
+        if self._pos:
+            del self._buffer[: self._pos]
+            self._pos = 0
+
+    def _drain(self) -> Iterator[bytes]:
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                break
+            yield frame
+        self._compact()
+
+    def _next_frame(self, final: bool = False) -> Optional[bytes]:
+        buf = self._buffer
+        n = len(buf)
+        idx = self._pos
+        limit = self._max_frame_length
+        timed = self._silence is not None
+        while idx + MIN_RTU_FRAME_LENGTH <= n:
+            available = min(limit, n - idx)
+            lengths = _frame_lengths(buf, idx, available)
+            if lengths is None and timed:
+                # La fine del frame la stabilisce la pausa sul bus.
+                if not final:
+                    self._pos = idx
+                    return None
+                if n - idx <= limit:
+                    frame = bytes(buf[idx:n])
+                    if _crc_ok(frame):
+                        self._pos = n
+                        self._restart_scan()
+                        return frame
+                self._discard(idx, idx + 1)
+                idx += 1
+                self._restart_scan()
+                continue
+            if lengths is None:
+                lengths = _SCAN_LENGTHS[available]
+                incomplete = False
+            else:
+                incomplete = not final and any(available < length <= limit for length in lengths)
+            length, self._folded = _match_rolling(
+                buf,
+                idx,
+                lengths,
+                available,
+                checked=self._checked,
+                state=self._crc,
+                folded=self._folded,
+            )
+            if length:
+                self._pos = idx + length
+                self._restart_scan()
+                return bytes(buf[idx : idx + length])
+            if incomplete:
+                # Un frame già completo più avanti vuol dire che l'header era rumore.
+                resync, length = _find_complete_frame(buf, idx + 1, n, limit)
+                if length:
+                    self._discard(idx, resync)
+                    self._pos = resync + length
+                    self._restart_scan()
+                    return bytes(buf[resync : resync + length])
+                self._pos = idx
+                self._checked = available
+                if self._waiting_since is None:
+                    self._waiting_since = self._now
+                return None
+            self._discard(idx, idx + 1)
+            idx += 1
+            self._restart_scan()
+        if final and idx < n:
+            self._discard(idx, n)
+            idx = n
+            self._restart_scan()
+        self._pos = idx
+        return None
+
+
+DEFAULT_DEDUP_WINDOW = 0.5
+
+DEDUP_ECHO = "echo"
+DEDUP_DUPLICATE = "duplicate"
+
+_ECHO_FUNCTIONS = frozenset((5, 6))
+
+
+def _is_read_response(frame: bytes) -> bool:
+    func = frame[1]
+    if func in (1, 2, 23):
+        return len(frame) == 5 + frame[2]
+    return func in (3, 4) and len(frame) != 8
+
+
+class FrameDeduplicator:
+    """Riconosce i frame identici ripetuti entro una finestra temporale.
+
+    Una copia identica di una FC05/FC06 vista subito dopo l'originale è l'eco
+    dello slave; ogni altra ripetizione nella finestra è un duplicato. Le
+    risposte di lettura non contengono l'indirizzo: sono confrontate insieme al
+    frame che le precede (la richiesta), così la stessa risposta a richieste
+    diverse non viene scartata.
+    """
+
+    def __init__(self, window: float = DEFAULT_DEDUP_WINDOW, max_entries: int = 256) -> None:
+        self.window = window
+        self._max_entries = max_entries
+        self._seen: dict[object, Tuple[float, int]] = {}
+        self._previous = b""
+        self.echoes = 0
+        self.duplicates = 0
+
+    @property
+    def suppressed(self) -> int:
+        return self.echoes + self.duplicates
+
+    def reset(self) -> None:
+        self._seen.clear()
+        self._previous = b""
+
+    def check(self, frame: bytes, now: Optional[float] = None) -> Optional[str]:
+        """Restituisce ``None`` per un frame nuovo, altrimenti il tipo di ripetizione."""
+        if self.window <= 0:
+            return None
+        if now is None:
+            now = time.monotonic()
+        self._purge(now)
+        data = bytes(frame)
+        preceding = self._previous
+        self._previous = data
+        key: object = (preceding, data) if _is_read_response(data) else data
+        previous = self._seen.pop(key, None)
+        if previous is None:
+            if len(self._seen) >= self._max_entries:
+                del self._seen[next(iter(self._seen))]
+            self._seen[key] = (now, 1)
+            return None
+        copies = previous[1] + 1
+        self._seen[key] = (now, copies)
+        if copies == 2 and data[1] in _ECHO_FUNCTIONS:
+            self.echoes += 1
+            return DEDUP_ECHO
+        self.duplicates += 1
+        return DEDUP_DUPLICATE
+
+    def _purge(self, now: float) -> None:
+        seen = self._seen
+        while seen:
+            key = next(iter(seen))
+            if now - seen[key][0] <= self.window:
+                break
+            del seen[key]
+
+
+frame_dedup = FrameDeduplicator()
+
+# Byte dello stream TCP non riconducibili a frame validi (es. baudrate errato).
+tcp_stream_stats = {"discarded_bytes": 0, "raw_payloads": 0}
+
+
 def extract_coils(data: bytes, quantity: Optional[int] = None) -> List[int]:
     coils: List[int] = []
     for byte in data:
@@ -403,6 +905,175 @@ def extract_coils(data: bytes, quantity: Optional[int] = None) -> List[int]:
     return coils
 
 
+_U16_PAIR = struct.Struct(">HH")
+_U16_PAIR_COUNT = struct.Struct(">HHB")
+
+# Ogni decoder riceve (fc, prefisso del sommario, payload) e restituisce
+# (fields, notes, summary, frame_type).
+PayloadDecoder = Callable[[int, str, bytes], Tuple[List[dict], List[str], str, str]]
+PAYLOAD_DECODERS: dict[int, PayloadDecoder] = {}
+
+
+def register_payload_decoder(function_code: int, decoder: PayloadDecoder) -> None:
+    PAYLOAD_DECODERS[function_code] = decoder
+
+
+def _decode_read(fc: int, summary_prefix: str, payload: bytes) -> Tuple[List[dict], List[str], str, str]:
+    fields: List[dict] = []
+    notes: List[str] = []
+    summary = ""
+    frame_type = "unknown"
+    length = len(payload)
+    # Con FC01/FC02 anche una risposta con 3 byte di dati ha payload di 4 byte:
+    # la distingue il byte count coerente con la lunghezza.
+    is_response = length != 4 or (fc in (1, 2) and payload[0] == length - 1)
+    if length >= 1 and is_response:
+        byte_count = payload[0]
+        fields.append(make_field("Byte Count", byte_count, size=1))
+        data_bytes = payload[1:]
+        if byte_count != len(data_bytes):
+            notes.append("Byte count non coerente con la lunghezza dei dati.")
+        if byte_count > len(data_bytes):
+            byte_count = len(data_bytes)
+        data_portion = data_bytes[:byte_count]
+        extra = data_bytes[byte_count:]
+        frame_type = "response"
+        summary = f"Risposta {summary_prefix}: {byte_count} byte dati"
+        if fc in (3, 4):
+            pairs = len(data_portion) // 2
+            register_values = list(struct.unpack_from(f">{pairs}H", data_portion))
+            for idx, value in enumerate(register_values):
+                fields.append(make_field(f"Registro {idx + 1}", value))
+            if len(data_portion) % 2:
+                fields.append(make_raw_field(f"Dato incompleto {pairs + 1}", data_portion[-1:]))
+            if register_values:
+                quantity = len(register_values)
+                notes.append(
+                    "Valori registri: "
+                    + ", ".join(str(val) for val in register_values[:12])
+                    + ("…" if len(register_values) > 12 else "")
+                )
+                notes.append(f"Registri letti: {quantity}")
+        else:
+            if data_portion:
+                coils = extract_coils(data_portion, None)
+                on_count = sum(coils)
+                total = len(coils)
+                fields.append(make_raw_field("Coils/Data", data_portion))
+                preview = ", ".join(
+                    f"{idx}:{'ON' if state else 'OFF'}" for idx, state in enumerate(coils[:16])
+                )
+                if preview:
+                    notes.append(
+                        f"Coil attive: {on_count}/{total}" + (f" — {preview}" if preview else "")
+                    )
+            if extra:
+                fields.append(make_raw_field("Dati extra", extra))
+    elif length >= 4:
+        start_addr, quantity = _U16_PAIR.unpack_from(payload)
+        fields.append(make_field("Start Address", start_addr))
+        fields.append(make_field("Quantity", quantity))
+        frame_type = "request"
+        summary = f"Richiesta {summary_prefix}: start {start_addr}, qty {quantity}"
+        extra = payload[4:]
+        if extra:
+            fields.append(make_raw_field("Dati aggiuntivi", extra))
+            notes.append("Sono presenti byte aggiuntivi oltre ai campi standard della richiesta.")
+    elif payload:
+        fields.append(make_raw_field("Payload", payload))
+        summary = f"{summary_prefix}: dati grezzi ({length} byte)"
+    return fields, notes, summary, frame_type
+
+
+def _decode_write_single(fc: int, summary_prefix: str, payload: bytes) -> Tuple[List[dict], List[str], str, str]:
+    fields: List[dict] = []
+    summary = ""
+    frame_type = "unknown"
+    if len(payload) >= 4:
+        address, value = _U16_PAIR.unpack_from(payload)
+        fields.append(make_field("Address", address))
+        fields.append(make_field("Value", value))
+        frame_type = "request/response"
+        if fc == 5:
+            if value == 0xFF00:
+                status = "ON"
+            elif value == 0x0000:
+                status = "OFF"
+            else:
+                status = f"valore 0x{value:04X}"
+            summary = f"{summary_prefix}: coil {address} -> {status}"
+        else:
+            summary = f"{summary_prefix}: registro {address} = {value}"
+    elif payload:
+        fields.append(make_raw_field("Payload", payload))
+    return fields, [], summary, frame_type
+
+
+def _decode_write_multiple(fc: int, summary_prefix: str, payload: bytes) -> Tuple[List[dict], List[str], str, str]:
+    fields: List[dict] = []
+    notes: List[str] = []
+    summary = ""
+    frame_type = "unknown"
+    length = len(payload)
+    if length == 4:
+        start_addr, quantity = _U16_PAIR.unpack_from(payload)
+        fields.append(make_field("Start Address", start_addr))
+        fields.append(make_field("Quantity", quantity))
+        frame_type = "response"
+        summary = f"Risposta {summary_prefix}: start {start_addr}, qty {quantity}"
+    elif length >= 5:
+        start_addr, quantity, byte_count = _U16_PAIR_COUNT.unpack_from(payload)
+        fields.append(make_field("Start Address", start_addr))
+        fields.append(make_field("Quantity", quantity))
+        fields.append(make_field("Byte Count", byte_count, size=1))
+        values = payload[5 : 5 + byte_count]
+        extra = payload[5 + byte_count :]
+        frame_type = "request"
+        summary = (
+            f"Richiesta {summary_prefix}: start {start_addr}, qty {quantity}, "
+            f"{byte_count} byte"
+        )
+        if fc == 15:
+            if values:
+                fields.append(make_raw_field("Values", values))
+                coils = extract_coils(values, quantity)
+                if coils:
+                    notes.append(
+                        "Valori coil: "
+                        + ", ".join(
+                            f"{start_addr + idx}:{'ON' if state else 'OFF'}"
+                            for idx, state in enumerate(coils[:16])
+                        )
+                        + ("…" if len(coils) > 16 else "")
+                    )
+        else:
+            pairs = len(values) // 2
+            for idx, reg_value in enumerate(struct.unpack_from(f">{pairs}H", values)):
+                fields.append(make_field(f"Registro {idx}", reg_value))
+            if len(values) % 2:
+                fields.append(make_raw_field(f"Dato incompleto {pairs}", values[-1:]))
+        if len(values) < byte_count:
+            notes.append("Byte count maggiore dei dati disponibili.")
+        if extra:
+            fields.append(make_raw_field("Dati extra", extra))
+    elif payload:
+        fields.append(make_raw_field("Payload", payload))
+    return fields, notes, summary, frame_type
+
+
+for _function_code, _decoder in (
+    (1, _decode_read),
+    (2, _decode_read),
+    (3, _decode_read),
+    (4, _decode_read),
+    (5, _decode_write_single),
+    (6, _decode_write_single),
+    (15, _decode_write_multiple),
+    (16, _decode_write_multiple),
+):
+    register_payload_decoder(_function_code, _decoder)
+
+
 def decode_modbus_payload(function_code: Optional[int], payload: bytes) -> dict:
     fields: List[dict] = []
     notes: List[str] = []
@@ -424,7 +1095,6 @@ def decode_modbus_payload(function_code: Optional[int], payload: bytes) -> dict:
 
     fc = function_code & 0x7F
     is_exception = function_code & 0x80 == 0x80
-    length = len(payload)
     function_label = MODBUS_FUNCTION_NAMES.get(fc)
 
     if is_exception:
@@ -449,164 +1119,12 @@ def decode_modbus_payload(function_code: Optional[int], payload: bytes) -> dict:
 
     summary_prefix = function_label or f"Funzione 0x{fc:02X}"
 
-    if fc in (1, 2, 3, 4):
-        if length != 4 and length >= 1:
-            byte_count = payload[0]
-            fields.append(make_field("Byte Count", byte_count, size=1))
-            data_bytes = payload[1:]
-            if byte_count != len(data_bytes):
-                notes.append("Byte count non coerente con la lunghezza dei dati.")
-            if byte_count > len(data_bytes):
-                byte_count = len(data_bytes)
-            data_portion = data_bytes[:byte_count]
-            extra = data_bytes[byte_count:]
-            frame_type = "response"
-            summary = f"Risposta {summary_prefix}: {byte_count} byte dati"
-            if fc in (3, 4):
-                register_values: List[int] = []
-                for idx in range(0, len(data_portion), 2):
-                    chunk = data_portion[idx : idx + 2]
-                    if len(chunk) == 2:
-                        value = int.from_bytes(chunk, "big")
-                        register_values.append(value)
-                        fields.append(make_field(f"Registro {idx // 2 + 1}", value))
-                    elif chunk:
-                        fields.append(make_raw_field(f"Dato incompleto {idx // 2 + 1}", chunk))
-                if register_values:
-                    quantity = len(register_values)
-                    notes.append(
-                        "Valori registri: "
-                        + ", ".join(str(val) for val in register_values[:12])
-                        + ("…" if len(register_values) > 12 else "")
-                    )
-                    notes.append(f"Registri letti: {quantity}")
-            else:
-                if data_portion:
-                    coils = extract_coils(data_portion, None)
-                    on_count = sum(coils)
-                    total = len(coils)
-                    fields.append(make_raw_field("Coils/Data", data_portion))
-                    preview = ", ".join(
-                        f"{idx}:{'ON' if state else 'OFF'}" for idx, state in enumerate(coils[:16])
-                    )
-                    if preview:
-                        notes.append(
-                            f"Coil attive: {on_count}/{total}" + (f" — {preview}" if preview else "")
-                        )
-                if extra:
-                    fields.append(make_raw_field("Dati extra", extra))
-        elif length >= 4:
-            start_addr = int.from_bytes(payload[0:2], "big")
-            quantity = int.from_bytes(payload[2:4], "big")
-            fields.append(make_field("Start Address", start_addr))
-            fields.append(make_field("Quantity", quantity))
-            frame_type = "request"
-            summary = f"Richiesta {summary_prefix}: start {start_addr}, qty {quantity}"
-            extra = payload[4:]
-            if extra:
-                fields.append(make_raw_field("Dati aggiuntivi", extra))
-                notes.append("Sono presenti byte aggiuntivi oltre ai campi standard della richiesta.")
-        elif payload:
-            fields.append(make_raw_field("Payload", payload))
-            summary = f"{summary_prefix}: dati grezzi ({length} byte)"
-    elif fc in (5, 6):
-        if length >= 4:
-            address = int.from_bytes(payload[0:2], "big")
-            value = int.from_bytes(payload[2:4], "big")
-            fields.append(make_field("Address", address))
-            fields.append(make_field("Value", value))
-            frame_type = "request/response"
-            if fc == 5:
-                if value == 0xFF00:
-                    status = "ON"
-                elif value == 0x0000:
-                    status = "OFF"
-                else:
-                    status = f"valore 0x{value:04X}"
-                summary = f"{summary_prefix}: coil {address} -> {status}"
-            else:
-                summary = f"{summary_prefix}: registro {address} = {value}"
-        elif payload:
-            fields.append(make_raw_field("Payload", payload))
-    elif fc == 15:
-        if length == 4:
-            start_addr = int.from_bytes(payload[0:2], "big")
-            quantity = int.from_bytes(payload[2:4], "big")
-            fields.append(make_field("Start Address", start_addr))
-            fields.append(make_field("Quantity", quantity))
-            frame_type = "response"
-            summary = f"Risposta {summary_prefix}: start {start_addr}, qty {quantity}"
-        elif length >= 5:
-            start_addr = int.from_bytes(payload[0:2], "big")
-            quantity = int.from_bytes(payload[2:4], "big")
-            byte_count = payload[4]
-            fields.append(make_field("Start Address", start_addr))
-            fields.append(make_field("Quantity", quantity))
-            fields.append(make_field("Byte Count", byte_count, size=1))
-            values = payload[5 : 5 + byte_count]
-            extra = payload[5 + byte_count :]
-            frame_type = "request"
-            summary = (
-                f"Richiesta {summary_prefix}: start {start_addr}, qty {quantity}, "
-                f"{byte_count} byte"
-            )
-            if values:
-                fields.append(make_raw_field("Values", values))
-                coils = extract_coils(values, quantity)
-                if coils:
-                    notes.append(
-                        "Valori coil: "
-                        + ", ".join(
-                            f"{start_addr + idx}:{'ON' if state else 'OFF'}"
-                            for idx, state in enumerate(coils[:16])
-                        )
-                        + ("…" if len(coils) > 16 else "")
-                    )
-            if len(values) < byte_count:
-                notes.append("Byte count maggiore dei dati disponibili.")
-            if extra:
-                fields.append(make_raw_field("Dati extra", extra))
-        elif payload:
-            fields.append(make_raw_field("Payload", payload))
-    elif fc == 16:
-        if length == 4:
-            start_addr = int.from_bytes(payload[0:2], "big")
-            quantity = int.from_bytes(payload[2:4], "big")
-            fields.append(make_field("Start Address", start_addr))
-            fields.append(make_field("Quantity", quantity))
-            frame_type = "response"
-            summary = f"Risposta {summary_prefix}: start {start_addr}, qty {quantity}"
-        elif length >= 5:
-            start_addr = int.from_bytes(payload[0:2], "big")
-            quantity = int.from_bytes(payload[2:4], "big")
-            byte_count = payload[4]
-            fields.append(make_field("Start Address", start_addr))
-            fields.append(make_field("Quantity", quantity))
-            fields.append(make_field("Byte Count", byte_count, size=1))
-            values = payload[5 : 5 + byte_count]
-            extra = payload[5 + byte_count :]
-            frame_type = "request"
-            summary = (
-                f"Richiesta {summary_prefix}: start {start_addr}, qty {quantity}, "
-                f"{byte_count} byte"
-            )
-            for idx in range(0, len(values), 2):
-                chunk = values[idx : idx + 2]
-                if len(chunk) == 2:
-                    reg_value = int.from_bytes(chunk, "big")
-                    fields.append(make_field(f"Registro {idx // 2}", reg_value))
-                elif chunk:
-                    fields.append(make_raw_field(f"Dato incompleto {idx // 2}", chunk))
-            if len(values) < byte_count:
-                notes.append("Byte count maggiore dei dati disponibili.")
-            if extra:
-                fields.append(make_raw_field("Dati extra", extra))
-        elif payload:
-            fields.append(make_raw_field("Payload", payload))
-    else:
-        if payload:
-            fields.append(make_raw_field("Payload", payload))
-            summary = f"{summary_prefix}: {length} byte"
+    decoder = PAYLOAD_DECODERS.get(fc)
+    if decoder is not None:
+        fields, notes, summary, frame_type = decoder(fc, summary_prefix, payload)
+    elif payload:
+        fields.append(make_raw_field("Payload", payload))
+        summary = f"{summary_prefix}: {len(payload)} byte"
 
     return {
         "fields": fields,
@@ -778,6 +1296,8 @@ class UdpToWebHandler(BaseHTTPRequestHandler):
             self._serve_history_fc03(query)
         elif path == "/history-06":
             self._serve_history_fc06(query)
+        elif path == "/stats":
+            self._serve_stats()
         else:
             self.send_error(HTTPStatus.NOT_FOUND, "Risorsa non trovata")
 
@@ -823,6 +1343,24 @@ class UdpToWebHandler(BaseHTTPRequestHandler):
         self.wfile.write(message)
         self.wfile.flush()
 
+    def _serve_stats(self) -> None:
+        body = json.dumps(
+            {
+                "dedup": {
+                    "window": frame_dedup.window,
+                    "echoes": frame_dedup.echoes,
+                    "duplicates": frame_dedup.duplicates,
+                    "suppressed": frame_dedup.suppressed,
+                },
+                "tcp": dict(tcp_stream_stats),
+            }
+        ).encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
     def _serve_log_download(self) -> None:
         if PACKET_LOG_PATH is None or not PACKET_LOG_PATH.exists():
             self.send_error(HTTPStatus.NOT_FOUND, "File di log non disponibile")
@@ -1293,6 +1831,14 @@ def process_incoming_payload(data: bytes, addr: Tuple[str, int]) -> None:
     append_packet_log(timestamp, data)
 
     frames, leftover = split_modbus_frames(data)
+    suppressed = 0
+    if frames:
+        now = time.monotonic()
+        unique_frames = [frame for frame in frames if frame_dedup.check(frame, now) is None]
+        suppressed = len(frames) - len(unique_frames)
+        if not unique_frames:
+            return
+        frames = unique_frames
     has_split = bool(frames)
     raw_frames = frames if has_split else [data]
 
@@ -1437,6 +1983,9 @@ def process_incoming_payload(data: bytes, addr: Tuple[str, int]) -> None:
         calculated_crc_int = None
         is_exception = any(info["is_exception"] for info in frame_infos)
 
+    if suppressed:
+        payload_notes = payload_notes + [f"Frame ripetuti soppressi: {suppressed}"]
+
     frames_payload = [
         {
             "index": info["index"],
@@ -1476,6 +2025,7 @@ def process_incoming_payload(data: bytes, addr: Tuple[str, int]) -> None:
         "crc_calc": crc_calc_str,
         "crc_value": crc_value_str,
         "frames": frames_payload,
+        "suppressed": suppressed,
     }
 
     pdu_repr = message["pdu"] or ""
@@ -1554,8 +2104,10 @@ def tcp_client_listener(
     port: int,
     buffer_size: int,
     reconnect_delay: float = 2.0,
+    baudrate: int = 0,
 ) -> None:
     remote_addr = (host, port)
+    silence = rtu_silence(baudrate) if baudrate else None
 
     while True:
         try:
@@ -1574,41 +2126,79 @@ def tcp_client_listener(
                 remote_repr = f"{host}:{port}"
 
             print(f"Client TCP connesso a {remote_repr}")
-            buffer = bytearray()
+            reassembler = FrameReassembler(silence=silence, keep_discarded=True)
+            unparsed = bytearray()
 
             while True:
                 try:
                     chunk = sock.recv(buffer_size)
+                    arrival = time.monotonic()
                 except (OSError, TimeoutError) as exc:
                     print(f"Errore durante la ricezione dal server TCP {remote_repr}: {exc}")
                     break
 
                 if not chunk:
-                    if buffer:
-                        process_incoming_payload(bytes(buffer), peer)
-                        buffer.clear()
+                    discarded = reassembler.take_discarded()
+                    tcp_stream_stats["discarded_bytes"] += len(discarded)
+                    unparsed += discarded
+                    unparsed += reassembler.reset()
+                    if unparsed:
+                        process_incoming_payload(bytes(unparsed), peer)
                     print(f"Connessione TCP chiusa da {remote_repr}. Riprovo tra {reconnect_delay}s...")
                     break
 
-                buffer.extend(chunk)
+                frames = list(reassembler.feed(chunk, arrival))
+                if frames:
+                    process_incoming_payload(b"".join(frames), peer)
+                discarded = reassembler.take_discarded()
+                if discarded:
+                    tcp_stream_stats["discarded_bytes"] += len(discarded)
+                    unparsed += discarded
+                    if len(unparsed) > buffer_size * 4:
+                        # Byte che non formano frame: mostrati grezzi per la diagnosi del bus.
+                        tcp_stream_stats["raw_payloads"] += 1
+                        process_incoming_payload(bytes(unparsed), peer)
+                        unparsed.clear()
 
-                while buffer:
-                    data_bytes = bytes(buffer)
-                    frames, leftover = split_modbus_frames(data_bytes)
-                    processed_length = len(data_bytes) - len(leftover)
+        time.sleep(reconnect_delay)
 
-                    if processed_length > 0:
-                        payload = data_bytes[:processed_length]
-                        process_incoming_payload(payload, peer)
-                        buffer = bytearray(leftover)
-                        continue
 
-                    if len(buffer) > buffer_size * 4:
-                        process_incoming_payload(bytes(buffer), peer)
-                        buffer.clear()
-                    break
+def analyze_packet_log(entries: List[Tuple[str, bytes]]) -> dict:
+    started = time.perf_counter()
+    # Un solo passaggio: i CRC di tutti i candidati vengono verificati in blocco,
+    # senza uno split frame per frame preliminare.
+    split = split_frames_batch([data for _, data in entries if data])
+    frames = [frame for frame_list in split for frame in frame_list]
+    functions: Counter[str] = Counter()
+    for frame in frames:
+        func = frame[1]
+        label = MODBUS_FUNCTION_NAMES.get(func & 0x7F, f"Funzione 0x{func & 0x7F:02X}")
+        if func & 0x80:
+            label = f"Eccezione {label}"
+        functions[label] += 1
+    return {
+        "datagrams": len(entries),
+        "bytes": sum(len(data) for _, data in entries),
+        "frames": len(frames),
+        "discarded_datagrams": sum(1 for frame_list in split if not frame_list),
+        "functions": functions,
+        "elapsed": time.perf_counter() - started,
+    }
 
-        time.sleep(reconnect_delay)
+
+def run_log_analysis(path: Path) -> None:
+    global PACKET_LOG_PATH
+    PACKET_LOG_PATH = path
+    entries = read_packet_log()
+    report = analyze_packet_log(entries)
+    numpy_state = "attivo" if _numpy_backend() is not None else "non disponibile"
+    print(f"Analisi di {path} (NumPy {numpy_state})")
+    print(f"Datagrammi: {report['datagrams']} ({report['bytes']} byte)")
+    print(f"Frame validi: {report['frames']}")
+    print(f"Datagrammi senza frame validi: {report['discarded_datagrams']}")
+    for label, total in report["functions"].most_common():
+        print(f"  {label}: {total}")
+    print(f"Tempo di analisi: {report['elapsed']:.3f}s")
 
 
 def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
@@ -1639,6 +2229,12 @@ def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         default=2.0,
         help="Secondi da attendere prima di ritentare la connessione TCP",
     )
+    parser.add_argument(
+        "--rtu-baudrate",
+        type=int,
+        default=0,
+        help="Baudrate del bus RTU: in TCP le pause fra le letture delimitano i frame (0 disattiva)",
+    )
     parser.add_argument("--http-host", default="0.0.0.0", help="Host per il server HTTP")
     parser.add_argument("--http-port", type=int, default=8080, help="Porta per il server HTTP")
     parser.add_argument(
@@ -1658,16 +2254,33 @@ def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
         default="packets_log.csv",
         help="Percorso del file CSV (timestamp,payload_hex) per memorizzare i pacchetti",
     )
+    parser.add_argument(
+        "--dedup-window",
+        type=float,
+        default=DEFAULT_DEDUP_WINDOW,
+        help="Secondi entro cui un frame identico è considerato eco/duplicato (0 disattiva)",
+    )
+    parser.add_argument(
+        "--analyze-log",
+        default=None,
+        metavar="CSV",
+        help="Analizza offline un log CSV già registrato, stampa un riepilogo ed esce",
+    )
     return parser.parse_args(argv)
 
 
 def main() -> None:
     args = parse_args()
 
+    if args.analyze_log:
+        run_log_analysis(Path(args.analyze_log).expanduser())
+        return
+
     global UDP_BUFFER_SIZE, message_history, PACKET_LOG_PATH
     UDP_BUFFER_SIZE = args.buffer_size
 
     message_history = deque(maxlen=args.history)
+    frame_dedup.window = args.dedup_window
 
     if args.packet_log:
         packet_path = Path(args.packet_log).expanduser()
@@ -1697,6 +2310,7 @@ def main() -> None:
             args.tcp_port,
             args.buffer_size,
             args.tcp_reconnect_delay,
+            args.rtu_baudrate,
         )
 
     listener_thread = threading.Thread(